@@ -0,0 +1,95 @@
+"""Adapters giving the four shop implementations one shape for the benchmark worker.
+
+Each implementation lives in its own import root (two of them are packages
+called ``hexshop``), so the runner benchmarks each one in a separate
+interpreter with only that root on ``sys.path``.
+"""
+from __future__ import annotations
+from dataclasses import dataclass, field
+from importlib import import_module
+from typing import Callable, Dict
+import json, os, threading
+
+def _load(path: str):
+    module, _, name = path.partition(":")
+    return getattr(import_module(module), name)
+
+@dataclass
+class RepoSpec:
+    factory: Callable[[str], object]
+    # bulk-load orders without going through save (file adapters would be O(n^2) otherwise)
+    seed: Callable[[object, list], None] = lambda repo, orders: [repo.save(o) for o in orders]
+    # largest store size worth running by default
+    max_size: int = 10 ** 6
+
+@dataclass
+class Impl:
+    root: str
+    order: str
+    money: str
+    product_id: str
+    discounts: str
+    repos: Dict[str, RepoSpec] = field(default_factory=dict)
+
+    def load(self):
+        return _load(self.order), _load(self.money), _load(self.product_id), _load(self.discounts)()
+
+def _class_repo(path: str) -> RepoSpec:
+    return RepoSpec(factory=lambda tmp: _load(path)())
+
+def _file_repo(tmp: str):
+    return _load("hexshop.infrastructure.persistence.file_order_repository:FileOrderRepository")(
+        os.path.join(tmp, "orders.json"))
+
+def _seed_file(repo, orders) -> None:
+    to_dict = _load("hexshop.infrastructure.persistence.file_order_repository:_order_to_dict")
+    data = {}
+    for o in orders:
+        o.version = 1
+        data[str(o.id)] = to_dict(o)
+    with open(repo.path, "w") as f:
+        json.dump(data, f)
+
+def _socket_repo(tmp: str):
+    server_cls = _load("hexshop.infrastructure.persistence.socket_order_repository:OrderStoreServer")
+    client_cls = _load("hexshop.infrastructure.persistence.socket_order_repository:SocketOrderRepository")
+    path = os.path.join(tmp, "orders.sock")
+    server = server_cls(path)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = client_cls(path)
+    client.server = server
+    return client
+
+def _seed_socket(repo, orders) -> None:
+    for o in orders:
+        repo.server.repo.save(o)
+
+IMPLS: Dict[str, Impl] = {
+    "main": Impl(
+        root=".", order="main:Order", money="main:Money", product_id="main:ProductId",
+        discounts="main:DiscountService", repos={"in_memory": _class_repo("main:OrderRepository")},
+    ),
+    "dddshop": Impl(
+        root="dddshop", order="dddshop.orders.models:Order", money="dddshop.value_objects:Money",
+        product_id="dddshop.value_objects:ProductId", discounts="dddshop.services.discounts:DiscountService",
+        repos={"in_memory": _class_repo("dddshop.orders.repository:OrderRepository")},
+    ),
+    "hexshop_hexagonal": Impl(
+        root="hexshop_hexagonal", order="hexshop.domain.orders.models:Order",
+        money="hexshop.domain.value_objects:Money", product_id="hexshop.domain.value_objects:ProductId",
+        discounts="hexshop.domain.services.discounts:DiscountService",
+        repos={"in_memory": _class_repo(
+            "hexshop.infrastructure.persistence.in_memory_order_repository:InMemoryOrderRepository")},
+    ),
+    "hexshop_hexagonal_http_and_file": Impl(
+        root="hexshop_hexagonal_http_and_file", order="hexshop.domain.orders.models:Order",
+        money="hexshop.domain.value_objects:Money", product_id="hexshop.domain.value_objects:ProductId",
+        discounts="hexshop.domain.services.discounts:DiscountService",
+        repos={
+            "in_memory": _class_repo(
+                "hexshop.infrastructure.persistence.in_memory_order_repository:InMemoryOrderRepository"),
+            "file": RepoSpec(_file_repo, _seed_file, max_size=10 ** 5),
+            "socket": RepoSpec(_socket_repo, _seed_socket),
+        },
+    ),
+}
@@ -0,0 +1,211 @@
+"""Benchmark the domain model and every order repository across all four implementations.
+
+    python benchmarks/run.py run --out head.json            # everything, 1e3..1e6 orders
+    python benchmarks/run.py run --impl dddshop --sizes 1000 10000 --lines 1 100
+    python benchmarks/run.py compare base.json head.json    # exit 1 on p50 regressions
+
+Each implementation runs in its own interpreter (see impls.py). Every
+measurement is time-boxed: it stops after ``--ops`` samples or ``--budget``
+seconds, whichever comes first, but always takes at least three samples.
+"""
+from __future__ import annotations
+import argparse, gc, json, os, platform, random, subprocess, sys, tempfile, time, uuid
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(HERE)
+DEFAULT_SIZES = [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6]
+DEFAULT_LINES = [1, 10, 100, 1000, 10000]
+MIN_SAMPLES = 3
+
+def _measure(op: Callable[[object], None], setup: Callable[[], object], ops: int, budget: float) -> Dict[str, float]:
+    samples: List[float] = []
+    deadline = time.perf_counter() + budget
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        while len(samples) < ops and (len(samples) < MIN_SAMPLES or time.perf_counter() < deadline):
+            state = setup()
+            start = time.perf_counter()
+            op(state)
+            samples.append(time.perf_counter() - start)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    samples.sort()
+    n = len(samples)
+    return {
+        "ops": n,
+        "mean_s": sum(samples) / n,
+        "p50_s": samples[n // 2],
+        "p99_s": samples[min(n - 1, int(n * 0.99))],
+        "min_s": samples[0],
+    }
+
+def _worker(args) -> List[dict]:
+    sys.path.insert(0, HERE)
+    from impls import IMPLS
+    impl = IMPLS[args.impl]
+    Order, Money, ProductId, discounts = impl.load()
+    rng = random.Random(42)
+    results: List[dict] = []
+
+    def record(target: str, params: dict, stats: dict) -> None:
+        results.append({"impl": args.impl, "target": target, "params": params, **stats})
+        print(f"  {args.impl:<32} {target:<38} {json.dumps(params):<24} p50={stats['p50_s'] * 1e6:>12.1f}us",
+              file=sys.stderr)
+
+    def order_with(lines: int, customer_id: Optional[uuid.UUID] = None):
+        o = Order.new(customer_id or uuid.uuid4())
+        for n in range(lines):
+            o.add_item(ProductId(f"SKU-{n % 500}"), Money(100 + n % 900), 1 + n % 3)
+        return o
+
+    def nothing():
+        return None
+
+    for lines in args.lines:
+        p = {"lines": lines}
+        record("order.add_item (whole order)", p, _measure(lambda _: order_with(lines), nothing, args.ops, args.budget))
+        built = order_with(lines)
+        record("order.total", p, _measure(lambda o: o.total(), lambda: built, args.ops, args.budget))
+        record("order.submit", p, _measure(lambda o: o.submit(), lambda: order_with(lines), args.ops, args.budget))
+        record("discounts.discounted_total", p,
+               _measure(lambda o: discounts.discounted_total(o, 10, 2000), lambda: built, args.ops, args.budget))
+        customer = uuid.uuid4()
+        others = [order_with(1, customer) for _ in range(lines)]
+        record("discounts.maybe_apply_bulk_bonus", {"customer_orders": lines},
+               _measure(lambda o: discounts.maybe_apply_bulk_bonus(o, others),
+                        lambda: order_with(1, customer), args.ops, args.budget))
+        del built, others
+
+    for repo_name, spec in impl.repos.items():
+        if args.repos and repo_name not in args.repos:
+            continue
+        for size in args.sizes:
+            p = {"repo": repo_name, "store_size": size}
+            if size > spec.max_size and not args.no_size_caps:
+                print(f"  {args.impl:<32} {repo_name} skipped at {size} orders (max_size={spec.max_size})",
+                      file=sys.stderr)
+                continue
+            with tempfile.TemporaryDirectory() as tmp:
+                repo = spec.factory(tmp)
+                customers = [uuid.uuid4() for _ in range(max(1, size // 10))]
+                seeded = [order_with(1, customers[i % len(customers)]) for i in range(size)]
+                spec.seed(repo, seeded)
+                ids = [o.id for o in seeded]
+                del seeded
+                gc.collect()
+                record("repo.save (new order)", p,
+                       _measure(repo.save, lambda: order_with(1, rng.choice(customers)), args.ops, args.budget))
+                record("repo.get", p, _measure(repo.get, lambda: rng.choice(ids), args.ops, args.budget))
+                record("repo.by_customer", p,
+                       _measure(repo.by_customer, lambda: rng.choice(customers), args.ops, args.budget))
+                server = getattr(repo, "server", None)
+                if server is not None:
+                    server.shutdown()
+                    server.server_close()
+                del repo, ids, customers
+                gc.collect()
+    return results
+
+def _git_revision() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True)
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+def _run(args) -> int:
+    sys.path.insert(0, HERE)
+    from impls import IMPLS
+    impls = args.impl or list(IMPLS)
+    results: List[dict] = []
+    for name in impls:
+        root = os.path.join(REPO_ROOT, IMPLS[name].root)
+        env = dict(os.environ, PYTHONPATH=root)
+        cmd = [sys.executable, os.path.abspath(__file__), "_worker", "--impl", name,
+               "--ops", str(args.ops), "--budget", str(args.budget),
+               "--sizes", *map(str, args.sizes), "--lines", *map(str, args.lines)]
+        if args.repos:
+            cmd += ["--repos", *args.repos]
+        if args.no_size_caps:
+            cmd.append("--no-size-caps")
+        print(f"== {name}", file=sys.stderr)
+        proc = subprocess.run(cmd, cwd=root, env=env, stdout=subprocess.PIPE, text=True)
+        if proc.returncode != 0:
+            print(f"benchmark worker for {name} failed", file=sys.stderr)
+            return proc.returncode
+        results.extend(json.loads(proc.stdout))
+    report = {
+        "meta": {
+            "revision": _git_revision(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "ops": args.ops, "budget_s": args.budget, "sizes": args.sizes, "lines": args.lines,
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+    return 0
+
+def _key(r: dict) -> str:
+    return f"{r['impl']} | {r['target']} | {json.dumps(r['params'], sort_keys=True)}"
+
+def _compare(args) -> int:
+    with open(args.base) as f:
+        base = {_key(r): r for r in json.load(f)["results"]}
+    with open(args.head) as f:
+        head_report = json.load(f)
+    regressions = 0
+    print(f"{'change':>8}  {'base p50':>12}  {'head p50':>12}  benchmark")
+    for r in head_report["results"]:
+        b = base.get(_key(r))
+        if b is None:
+            continue
+        change = r["p50_s"] / b["p50_s"] - 1 if b["p50_s"] else 0.0
+        flag = ""
+        if change > args.threshold:
+            regressions += 1
+            flag = "  REGRESSION"
+        elif change < -args.threshold:
+            flag = "  faster"
+        print(f"{change:>+8.1%}  {b['p50_s'] * 1e6:>10.1f}us  {r['p50_s'] * 1e6:>10.1f}us  {_key(r)}{flag}")
+    print(f"{regressions} regression(s) beyond {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name in ("run", "_worker"):
+        p = sub.add_parser(name)
+        p.add_argument("--impl", nargs="*" if name == "run" else None, required=name == "_worker")
+        p.add_argument("--sizes", type=lambda s: int(float(s)), nargs="+", default=DEFAULT_SIZES)
+        p.add_argument("--lines", type=int, nargs="+", default=DEFAULT_LINES)
+        p.add_argument("--repos", nargs="*", help="only these repository adapters (e.g. in_memory file)")
+        p.add_argument("--ops", type=int, default=200)
+        p.add_argument("--budget", type=float, default=2.0, help="seconds per measurement")
+        p.add_argument("--no-size-caps", action="store_true", help="run slow adapters at every store size")
+        if name == "run":
+            p.add_argument("--out", help="write JSON here instead of stdout")
+    p = sub.add_parser("compare")
+    p.add_argument("base")
+    p.add_argument("head")
+    p.add_argument("--threshold", type=float, default=0.10, help="relative p50 change to flag (default 0.10)")
+    args = parser.parse_args(argv)
+    if args.command == "_worker":
+        json.dump(_worker(args), sys.stdout)
+        return 0
+    if args.command == "compare":
+        return _compare(args)
+    return _run(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
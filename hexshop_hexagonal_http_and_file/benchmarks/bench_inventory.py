@@ -0,0 +1,70 @@
+"""Reservations per second when many threads check out the same few products at once.
+
+    python benchmarks/bench_inventory.py [--threads 64] [--per-thread 200] [--skus 1]
+
+Compares one lock per product (``shards=1``) with sharded counters for the
+in-memory inventory, and one transaction per reservation (``max_batch=1``) with
+group-committed batches for SQLite.
+"""
+from __future__ import annotations
+import argparse, os, sys, tempfile, threading, time, uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from hexshop.domain.inventory.ports import InventoryPort
+from hexshop.domain.value_objects import ProductId
+from hexshop.infrastructure.persistence.in_memory_inventory import InMemoryInventory
+from hexshop.infrastructure.persistence.sqlite_inventory import SqliteInventory
+
+def _run(inventory: InventoryPort, threads: int, per_thread: int, skus: int) -> tuple:
+    products = [ProductId(f"HOT-{n}") for n in range(skus)]
+    inventory.restock({p: threads * per_thread for p in products})
+    latencies: list = []
+    start = threading.Barrier(threads + 1)
+
+    def shopper(n: int) -> None:
+        mine = []
+        start.wait()
+        for i in range(per_thread):
+            order_id = uuid.uuid4()
+            t0 = time.perf_counter()
+            inventory.reserve(order_id, {products[(n + i) % skus]: 1})
+            inventory.commit(order_id)
+            mine.append(time.perf_counter() - t0)
+        latencies.extend(mine)
+    workers = [threading.Thread(target=shopper, args=(n,)) for n in range(threads)]
+    for w in workers:
+        w.start()
+    start.wait()
+    t0 = time.perf_counter()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - t0
+    latencies.sort()
+    left = sum(inventory.available(p) for p in products)
+    assert left == (threads * per_thread) * skus - threads * per_thread, "oversold or lost stock"
+    return len(latencies) / elapsed, latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99)]
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=64)
+    parser.add_argument("--per-thread", type=int, default=200)
+    parser.add_argument("--skus", type=int, default=1)
+    args = parser.parse_args()
+    print(f"{args.threads} threads x {args.per_thread} reserve+commit on {args.skus} SKU(s)")
+    print(f"{'adapter':<28}{'ops/s':>12}{'p50 ms':>10}{'p99 ms':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        cases = [
+            ("memory, shards=1", lambda: InMemoryInventory(shards=1)),
+            ("memory, shards=16", lambda: InMemoryInventory(shards=16)),
+            ("sqlite, max_batch=1", lambda: SqliteInventory(os.path.join(tmp, "one.db"), max_batch=1)),
+            ("sqlite, max_batch=256", lambda: SqliteInventory(os.path.join(tmp, "batched.db"), max_batch=256)),
+        ]
+        for label, make in cases:
+            inventory = make()
+            rate, p50, p99 = _run(inventory, args.threads, args.per_thread, args.skus)
+            print(f"{label:<28}{rate:>12,.0f}{p50 * 1000:>10.3f}{p99 * 1000:>10.3f}")
+            getattr(inventory, "close", lambda: None)()
+
+if __name__ == "__main__":
+    main()
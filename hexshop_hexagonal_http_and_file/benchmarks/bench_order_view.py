@@ -0,0 +1,70 @@
+"""Compare GET /orders/{id} serialization: the old dict + jsonable_encoder path vs order_view_bytes.
+
+    python benchmarks/bench_order_view.py [--lines 10 1000 10000] [--runs 200]
+"""
+from __future__ import annotations
+import argparse, json, os, sys, time, uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from hexshop.domain.orders.models import Order
+from hexshop.domain.value_objects import Money, ProductId
+from hexshop.infrastructure.http import serializers
+from hexshop.infrastructure.http.serializers import order_view_bytes
+
+def _legacy(o: Order) -> bytes:
+    from fastapi.encoders import jsonable_encoder
+    body = {
+        "id": str(o.id),
+        "customer_id": str(o.customer_id),
+        "is_submitted": o.is_submitted(),
+        "items": [
+            {"product_id": it.product_id.value, "unit_price_pence": it.unit_price.amount, "qty": it.quantity}
+            for it in o.items()
+        ],
+        "total_pence": o.total().amount,
+    }
+    # what JSONResponse.render does after FastAPI encodes the return value
+    return json.dumps(jsonable_encoder(body), ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+def _stdlib_only(o: Order) -> bytes:
+    saved, serializers.orjson = serializers.orjson, None
+    try:
+        return order_view_bytes(o)
+    finally:
+        serializers.orjson = saved
+
+def _order(lines: int) -> Order:
+    o = Order.new(uuid.uuid4())
+    for n in range(lines):
+        o.add_item(ProductId(f"SKU-{n}"), Money(100 + n), 1 + n % 5)
+    return o
+
+def _percentiles(fn, o: Order, runs: int):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(o)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return samples[len(samples) // 2], samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lines", type=int, nargs="+", default=[10, 1000, 10000])
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    candidates = {"legacy": _legacy, "stdlib": _stdlib_only}
+    if serializers.orjson is not None:
+        candidates["orjson"] = order_view_bytes
+    print(f"{'lines':>7} {'variant':>8} {'p50 ms':>10} {'p99 ms':>10}")
+    for lines in args.lines:
+        o = _order(lines)
+        assert json.loads(_legacy(o)) == json.loads(order_view_bytes(o))
+        for name, fn in candidates.items():
+            p50, p99 = _percentiles(fn, o, args.runs)
+            print(f"{lines:>7} {name:>8} {p50 * 1e3:>10.3f} {p99 * 1e3:>10.3f}")
+
+if __name__ == "__main__":
+    main()
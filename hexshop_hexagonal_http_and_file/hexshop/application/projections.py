@@ -0,0 +1,90 @@
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+import uuid
+from ..domain.orders.models import Order
+from ..domain.orders.ports import OrderFilter, OrderKey, OrderRepositoryPort
+
+STATUSES = ("open", "submitted")
+
+@dataclass(frozen=True)
+class OrderSummary:
+    """Denormalized read model of one order: enough for listings and dashboards without the lines."""
+    id: uuid.UUID
+    customer_id: uuid.UUID
+    is_submitted: bool
+    line_count: int
+    total_pence: int
+    created_at: datetime
+    updated_at: datetime
+    version: int
+
+    @property
+    def status(self) -> str:
+        return "submitted" if self.is_submitted else "open"
+
+    @property
+    def key(self) -> OrderKey:
+        return (self.created_at, self.id)
+
+    @staticmethod
+    def of(order: Order) -> "OrderSummary":
+        lines = total = 0
+        for it in order.iter_items():
+            lines += 1
+            total += it.unit_price.amount * it.quantity
+        return OrderSummary(order.id, order.customer_id, order.is_submitted(), lines, total,
+                            order.created_at, order.updated_at, order.version)
+
+@dataclass
+class SummaryPage:
+    summaries: List[OrderSummary]
+    next_key: Optional[OrderKey] = None
+
+@dataclass(frozen=True)
+class StatusTotals:
+    orders: int = 0
+    lines: int = 0
+    total_pence: int = 0
+
+    def plus(self, s: OrderSummary, sign: int = 1) -> "StatusTotals":
+        return StatusTotals(self.orders + sign, self.lines + sign * s.line_count, self.total_pence + sign * s.total_pence)
+
+Dashboard = Dict[str, StatusTotals]  # status -> totals
+
+class OrderSummaryStorePort(ABC):
+    """Where summaries live. ``upsert`` ignores a summary older than the stored one, so
+    commits that race past each other cannot roll a summary back."""
+    @abstractmethod
+    def upsert(self, summary: OrderSummary) -> None: ...
+    @abstractmethod
+    def get(self, order_id: uuid.UUID) -> Optional[OrderSummary]: ...
+    @abstractmethod
+    def list_for_customer(
+        self, customer_id: uuid.UUID, filter: OrderFilter = OrderFilter(),
+        after: Optional[OrderKey] = None, limit: int = 50,
+    ) -> SummaryPage: ...
+    @abstractmethod
+    def dashboard(self) -> Dashboard: ...
+    @abstractmethod
+    def remove(self, order_ids: Iterable[uuid.UUID]) -> None: ...
+    @abstractmethod
+    def replace_all(self, summaries: Iterable[OrderSummary]) -> int:
+        """Drops every summary and loads ``summaries`` instead; returns how many were loaded."""
+
+class OrderSummaryProjection:
+    """Keeps a summary store in step with the orders ``CheckoutService`` commits."""
+    def __init__(self, store: OrderSummaryStorePort):
+        self.store = store
+
+    def apply(self, order: Order) -> None:
+        self.store.upsert(OrderSummary.of(order))
+
+    def forget(self, orders: Iterable[Order]) -> None:
+        """Drops the summaries of orders the repository no longer holds (e.g. expired carts)."""
+        self.store.remove(o.id for o in orders)
+
+    def rebuild(self, repo: OrderRepositoryPort) -> int:
+        return self.store.replace_all(OrderSummary.of(o) for o in repo.iter_all())
@@ -0,0 +1,75 @@
+from __future__ import annotations
+from collections import deque
+from typing import Callable, Deque, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+import threading, time
+
+V = TypeVar("V")
+
+class _Call:
+    __slots__ = ("done", "result", "error", "expires")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.expires = 0.0
+
+class SingleFlight(Generic[V]):
+    """Concurrent calls for the same key share one execution and its outcome.
+
+    The first caller for a key runs ``fn``. Anyone asking for the same key
+    while it runs waits for it and gets the same result, or the same
+    exception. Once it completes, the next call runs ``fn`` afresh. With
+    ``ttl`` set, a successful result is instead reused for that many seconds,
+    trading freshness for fewer runs. ``coalesced`` counts the calls that did
+    not run ``fn`` themselves, and ``on_coalesced`` is called for each one.
+    """
+    def __init__(
+        self, ttl: float = 0.0, on_coalesced: Optional[Callable[[], None]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = ttl
+        self.on_coalesced = on_coalesced
+        self.coalesced = 0
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._expiring: Deque[Tuple[float, Hashable, _Call]] = deque()  # completed results kept for ttl, oldest first
+
+    def do(self, key: Hashable, fn: Callable[[], V]) -> V:
+        with self._lock:
+            self._forget_expired()
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.coalesced += 1
+        if not leader:
+            if self.on_coalesced is not None:
+                self.on_coalesced()
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                if self.ttl > 0 and call.error is None:
+                    call.expires = self._clock() + self.ttl
+                    self._expiring.append((call.expires, key, call))
+                else:
+                    del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def _forget_expired(self) -> None:
+        now = self._clock()
+        while self._expiring and self._expiring[0][0] <= now:
+            _, key, call = self._expiring.popleft()
+            if self._calls.get(key) is call:
+                del self._calls[key]
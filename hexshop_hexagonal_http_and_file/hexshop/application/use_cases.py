@@ -1,41 +1,150 @@
 from __future__ import annotations
 import uuid
+from typing import Dict, List, Optional, Sequence, Tuple
+from ..domain.catalog.ports import ProductCatalogPort, UnknownProductError
 from ..domain.entities import Customer
-from ..domain.orders.models import Order
-from ..domain.orders.ports import OrderRepositoryPort
+from ..domain.orders.models import Order, OrderItem
+from ..domain.orders.ports import OrderRepositoryPort, ConcurrencyError, EventPublisherPort
 from ..domain.value_objects import ProductId, Money
 from ..domain.services.discounts import DiscountService
+from ..domain.services.inventory import InventoryService
+from .projections import OrderSummaryProjection
+from .single_flight import SingleFlight
+
+# product id, unit price in pence (ignored when there is a catalog), quantity
+Line = Tuple[str, Optional[int], int]
 
 class CheckoutService:
-    def __init__(self, repo: OrderRepositoryPort, discounts: DiscountService):
+    """Order use cases. With a ``catalog``, unit prices come from it and client-sent prices are ignored.
+    With ``inventory``, adding lines reserves their stock (before the order is even loaded, so a sold-out
+    product fails fast), removing lines releases it and submitting commits it. With ``reads``, the read-only
+    queries (``read_order``, ``order_version``, previews) for the same order share one repository call while
+    it is in flight."""
+    def __init__(
+        self, repo: OrderRepositoryPort, discounts: DiscountService, events: Optional[EventPublisherPort] = None,
+        projection: Optional[OrderSummaryProjection] = None, catalog: Optional[ProductCatalogPort] = None,
+        inventory: Optional[InventoryService] = None, reads: Optional[SingleFlight] = None,
+    ):
         self.repo = repo
         self.discounts = discounts
+        self.events = events
+        self.projection = projection
+        self.catalog = catalog
+        self.inventory = inventory
+        self.reads = reads
 
-    def start_order_with_item(self, customer: Customer, product_id: str, unit_price_pence: int, quantity: int) -> uuid.UUID:
+    def start_order_with_item(
+        self, customer: Customer, product_id: str, unit_price_pence: Optional[int], quantity: int,
+    ) -> uuid.UUID:
+        (item,) = self._items([(product_id, unit_price_pence, quantity)])
         order = Order.new(customer.id)
-        order.add_item(ProductId(product_id), Money(unit_price_pence), quantity)
-        others = self.repo.by_customer(customer.id)
-        self.discounts.maybe_apply_bulk_bonus(order, others)
-        self.repo.save(order)
+        reserved = self._reserve(order.id, [item])
+        try:
+            order.add_item(item.product_id, item.unit_price, item.quantity)
+            others = self.repo.by_customer(customer.id)
+            self.discounts.maybe_apply_bulk_bonus(order, others)
+            self.repo.save(order)
+        except BaseException:
+            self._unreserve(order.id, reserved)
+            raise
+        self._after_save(order)
         return order.id
 
-    def add_item(self, order_id: uuid.UUID, product_id: str, unit_price_pence: int, quantity: int) -> None:
-        order = self._get_or_raise(order_id)
-        order.add_item(ProductId(product_id), Money(unit_price_pence), quantity)
+    def add_item(
+        self, order_id: uuid.UUID, product_id: str, unit_price_pence: Optional[int], quantity: int,
+        expected_version: Optional[int] = None,
+    ) -> int:
+        """Returns the order's new version."""
+        return self.add_items(order_id, [(product_id, unit_price_pence, quantity)], expected_version)
+
+    def add_items(self, order_id: uuid.UUID, lines: Sequence[Line], expected_version: Optional[int] = None) -> int:
+        """Adds every line in one save, pricing them with one catalog lookup; returns the order's new version."""
+        # every line is priced and checked before any stock is held or the order changes
+        items = self._items(lines)
+        reserved = self._reserve(order_id, items)
+        try:
+            order = self._get_or_raise(order_id, expected_version)
+            for item in items:
+                order.add_item(item.product_id, item.unit_price, item.quantity)
+            self.repo.save(order)
+        except BaseException:
+            # the lines were not stored, so nothing holds what this call reserved
+            self._unreserve(order_id, reserved)
+            raise
+        # once saved, the reservation belongs to the order, even if what follows fails
+        self._after_save(order)
+        return order.version
+
+    def remove_item(self, order_id: uuid.UUID, product_id: str, expected_version: Optional[int] = None) -> int:
+        order = self._get_or_raise(order_id, expected_version)
+        held = InventoryService.held_for(order, ProductId(product_id))
+        order.remove_item(ProductId(product_id))
         self.repo.save(order)
+        self._unreserve(order.id, held)
+        self._after_save(order)
+        return order.version
 
     def preview_total_with_discount(self, order_id: uuid.UUID, threshold_pence: int, discount_pct: int):
-        order = self._get_or_raise(order_id)
+        order = self.read_order(order_id)
+        if not order:
+            raise ValueError("Order not found")
         return DiscountService.discounted_total(order, discount_pct, threshold_pence)
 
-    def submit(self, order_id: uuid.UUID):
-        order = self._get_or_raise(order_id)
+    def read_order(self, order_id: uuid.UUID) -> Optional[Order]:
+        """The order for display; it may be shared with concurrent readers, so it must not be changed."""
+        if self.reads is None:
+            return self.repo.get(order_id)
+        return self.reads.do(("order", order_id), lambda: self.repo.get(order_id))
+
+    def order_version(self, order_id: uuid.UUID) -> Optional[int]:
+        if self.reads is None:
+            return self.repo.version_of(order_id)
+        return self.reads.do(("version", order_id), lambda: self.repo.version_of(order_id))
+
+    def submit(self, order_id: uuid.UUID, expected_version: Optional[int] = None):
+        order = self._get_or_raise(order_id, expected_version)
         order.submit()
         self.repo.save(order)
+        if self.inventory is not None:
+            self.inventory.commit(order)
+        self._after_save(order)
         return order.total()
 
-    def _get_or_raise(self, order_id: uuid.UUID):
+    def _items(self, lines: Sequence[Line]) -> List[OrderItem]:
+        ids = [ProductId(product_id) for product_id, _, _ in lines]
+        if self.catalog is None:
+            if any(price is None for _, price, _ in lines):
+                raise ValueError("unit_price_pence is required")
+            prices = [Money(price) for _, price, _ in lines]
+        else:
+            found = self.catalog.get_prices(ids)
+            for p in ids:
+                if p not in found:
+                    raise UnknownProductError(f"Unknown product {p.value!r}")
+            prices = [found[p] for p in ids]
+        return [OrderItem(p, price, quantity) for p, price, (_, _, quantity) in zip(ids, prices, lines)]
+
+    def _reserve(self, order_id: uuid.UUID, items: Sequence[OrderItem]) -> Dict[ProductId, int]:
+        if self.inventory is None:
+            return {}
+        return self.inventory.reserve_lines(order_id, [(it.product_id, it.quantity) for it in items])
+
+    def _unreserve(self, order_id: uuid.UUID, quantities: Dict[ProductId, int]) -> None:
+        if self.inventory is not None:
+            self.inventory.release(order_id, quantities)
+
+    def _after_save(self, order: Order) -> None:
+        if self.projection is not None:
+            self.projection.apply(order)
+        # always drain, so orders kept in memory don't accumulate events
+        events = order.pull_events()
+        if self.events is not None and events:
+            self.events.publish(events)
+
+    def _get_or_raise(self, order_id: uuid.UUID, expected_version: Optional[int] = None):
         order = self.repo.get(order_id)
         if not order:
             raise ValueError("Order not found")
+        if expected_version is not None and order.version != expected_version:
+            raise ConcurrencyError("Order version does not match")
         return order
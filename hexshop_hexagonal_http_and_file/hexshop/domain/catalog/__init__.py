@@ -0,0 +1,2 @@
+from .ports import ProductCatalogPort, UnknownProductError
+__all__ = ["ProductCatalogPort","UnknownProductError"]
@@ -0,0 +1,18 @@
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, Mapping, Optional
+from ..value_objects import Money, ProductId
+
+class UnknownProductError(ValueError):
+    """The catalog has no price for the product."""
+
+class ProductCatalogPort(ABC):
+    """Where the shop's own prices come from; orders never take a price from the client when one is configured."""
+    @abstractmethod
+    def get_prices(self, product_ids: Iterable[ProductId]) -> Dict[ProductId, Money]:
+        """Prices of the known products among ``product_ids``; unknown ones are left out."""
+    @abstractmethod
+    def set_prices(self, prices: Mapping[ProductId, Money]) -> None: ...
+
+    def get_price(self, product_id: ProductId) -> Optional[Money]:
+        return self.get_prices((product_id,)).get(product_id)
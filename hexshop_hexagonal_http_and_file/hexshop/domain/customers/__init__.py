@@ -0,0 +1,2 @@
+from .ports import CustomerRepositoryPort, DuplicateEmailError, email_key
+__all__ = ["CustomerRepositoryPort","DuplicateEmailError","email_key"]
@@ -0,0 +1,22 @@
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, Optional
+import uuid
+from ..entities import Customer
+
+class DuplicateEmailError(ValueError):
+    """Another customer is already registered with this email."""
+
+def email_key(email: str) -> str:
+    """Emails are unique case-insensitively."""
+    return email.strip().lower()
+
+class CustomerRepositoryPort(ABC):
+    @abstractmethod
+    def save(self, customer: Customer) -> None: ...
+    @abstractmethod
+    def get(self, customer_id: uuid.UUID) -> Optional[Customer]: ...
+    @abstractmethod
+    def get_by_email(self, email: str) -> Optional[Customer]: ...
+    @abstractmethod
+    def get_many(self, customer_ids: Iterable[uuid.UUID]) -> Dict[uuid.UUID, Customer]: ...
@@ -1,6 +1,7 @@
 from __future__ import annotations
 from dataclasses import dataclass
 import uuid
+from .ids import new_id
 from .value_objects import Email
 
 @dataclass
@@ -11,4 +12,4 @@ class Customer:
 
     @staticmethod
     def new(name: str, email: str) -> "Customer":
-        return Customer(id=uuid.uuid4(), name=name, email=Email(email))
+        return Customer(id=new_id(), name=name, email=Email(email))
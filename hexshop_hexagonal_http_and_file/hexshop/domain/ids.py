@@ -0,0 +1,46 @@
+from __future__ import annotations
+from typing import Callable, Dict, Union
+import os, threading, time, uuid
+
+IdGenerator = Callable[[], uuid.UUID]
+
+_lock = threading.Lock()
+_last_ms = 0
+_seq = 0
+
+def uuid7() -> uuid.UUID:
+    """A time-ordered UUID (version 7): 48 bits of Unix milliseconds, a 12-bit counter, then 62 random bits.
+
+    The counter restarts at a random value below 2048 each millisecond and counts up
+    within it, so ids from this process sort in creation order even when made in the
+    same millisecond or while the wall clock steps back.
+    """
+    global _last_ms, _seq
+    with _lock:
+        ms = time.time_ns() // 1_000_000
+        if ms > _last_ms:
+            _last_ms, _seq = ms, int.from_bytes(os.urandom(2), "big") & 0x7FF
+        else:
+            _seq += 1
+            if _seq > 0xFFF:  # counter spent: borrow the next millisecond
+                _last_ms, _seq = _last_ms + 1, 0
+        ms, seq = _last_ms, _seq
+    rand = int.from_bytes(os.urandom(8), "big") & ((1 << 62) - 1)
+    return uuid.UUID(int=(ms << 80) | (0x7 << 76) | (seq << 64) | (0b10 << 62) | rand)
+
+GENERATORS: Dict[str, IdGenerator] = {"uuid4": uuid.uuid4, "uuid7": uuid7}
+
+_generator: IdGenerator = uuid.uuid4
+
+def new_id() -> uuid.UUID:
+    """Id for a new aggregate, from the generator set by :func:`use_id_generator` (random v4 by default)."""
+    return _generator()
+
+def use_id_generator(generator: Union[str, IdGenerator]) -> None:
+    """Sets how ``Order.new`` and ``Customer.new`` make ids: a name from ``GENERATORS`` or a callable."""
+    global _generator
+    if isinstance(generator, str):
+        if generator not in GENERATORS:
+            raise ValueError(f"unknown id generator {generator!r} ({', '.join(GENERATORS)})")
+        generator = GENERATORS[generator]
+    _generator = generator
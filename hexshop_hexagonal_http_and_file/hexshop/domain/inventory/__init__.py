@@ -0,0 +1,2 @@
+from .ports import InventoryPort, InsufficientStockError
+__all__ = ["InventoryPort","InsufficientStockError"]
@@ -0,0 +1,35 @@
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from typing import Mapping, Optional
+import uuid
+from ..value_objects import ProductId
+
+class InsufficientStockError(ValueError):
+    """Not enough unreserved stock is left for the product."""
+
+class InventoryPort(ABC):
+    """Stock levels and the reservations orders hold against them.
+
+    Only products that have been stocked are tracked; anything else can be
+    ordered without limit. ``reserve`` is all-or-nothing across the products
+    it is given. Reserved stock stays out of ``available`` until the order
+    ``commit``s it (it has been sold) or gives it back through ``release`` or
+    ``cancel``.
+    """
+    @abstractmethod
+    def reserve(self, order_id: uuid.UUID, quantities: Mapping[ProductId, int]) -> None: ...
+    @abstractmethod
+    def release(self, order_id: uuid.UUID, quantities: Mapping[ProductId, int]) -> None:
+        """Gives back up to ``quantities`` of what the order holds."""
+    @abstractmethod
+    def cancel(self, order_id: uuid.UUID) -> None:
+        """Gives back everything the order holds."""
+    @abstractmethod
+    def commit(self, order_id: uuid.UUID) -> None:
+        """The order was placed: what it holds is sold and no longer reserved."""
+    @abstractmethod
+    def available(self, product_id: ProductId) -> Optional[int]:
+        """Unreserved stock, or ``None`` for an untracked product."""
+    @abstractmethod
+    def restock(self, levels: Mapping[ProductId, int]) -> None:
+        """Adds stock, starting to track products seen for the first time."""
@@ -1,3 +1,7 @@
 from .models import Order, OrderItem
-from .ports import OrderRepositoryPort
-__all__ = ["Order","OrderItem","OrderRepositoryPort"]
+from .events import OrderEvent, ItemAdded, ItemRemoved, OrderSubmitted
+from .ports import OrderRepositoryPort, ConcurrencyError, OrderFilter, OrderPage, OrderKey, EventPublisherPort
+__all__ = [
+    "Order","OrderItem","OrderEvent","ItemAdded","ItemRemoved","OrderSubmitted",
+    "OrderRepositoryPort","ConcurrencyError","OrderFilter","OrderPage","OrderKey","EventPublisherPort",
+]
@@ -0,0 +1,30 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+import uuid
+from ..value_objects import Money, ProductId
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+@dataclass(frozen=True)
+class OrderEvent:
+    order_id: uuid.UUID
+    customer_id: uuid.UUID
+
+@dataclass(frozen=True)
+class ItemAdded(OrderEvent):
+    product_id: ProductId
+    unit_price: Money
+    quantity: int
+    occurred_at: datetime = field(default_factory=utcnow)
+
+@dataclass(frozen=True)
+class ItemRemoved(OrderEvent):
+    product_id: ProductId
+    occurred_at: datetime = field(default_factory=utcnow)
+
+@dataclass(frozen=True)
+class OrderSubmitted(OrderEvent):
+    total: Money
+    occurred_at: datetime = field(default_factory=utcnow)
@@ -1,8 +1,11 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
-from typing import List
+from datetime import datetime
+from typing import Iterator, List, Optional
 import uuid
+from ..ids import new_id
 from ..value_objects import Money, ProductId, ensure_same_currency
+from .events import OrderEvent, ItemAdded, ItemRemoved, OrderSubmitted, utcnow
 
 @dataclass(frozen=True)
 class OrderItem:
@@ -20,22 +23,38 @@ class Order:
     customer_id: uuid.UUID
     _items: List[OrderItem] = field(default_factory=list)
     _is_submitted: bool = False
+    version: int = 0
+    created_at: datetime = field(default_factory=utcnow)
+    updated_at: Optional[datetime] = None
+    _events: List[OrderEvent] = field(default_factory=list, repr=False, compare=False)
+
+    def __post_init__(self):
+        if self.updated_at is None:
+            self.updated_at = self.created_at
 
     @staticmethod
     def new(customer_id: uuid.UUID) -> "Order":
-        return Order(id=uuid.uuid4(), customer_id=customer_id)
+        return Order(id=new_id(), customer_id=customer_id)
 
     def add_item(self, product_id: ProductId, unit_price: Money, quantity: int) -> None:
         self._assert_not_submitted()
         self._items.append(OrderItem(product_id, unit_price, quantity))
+        self._record(ItemAdded(self.id, self.customer_id, product_id, unit_price, quantity))
 
     def remove_item(self, product_id: ProductId) -> None:
         self._assert_not_submitted()
-        self._items = [i for i in self._items if i.product_id != product_id]
+        kept = [i for i in self._items if i.product_id != product_id]
+        if len(kept) != len(self._items):
+            self._record(ItemRemoved(self.id, self.customer_id, product_id))
+        self._items = kept
 
     def items(self) -> List[OrderItem]:
         return list(self._items)
 
+    def iter_items(self) -> Iterator[OrderItem]:
+        # read-only walk over the lines without the copy items() makes
+        return iter(self._items)
+
     def total(self) -> Money:
         total = Money(0, "GBP")
         for i in self._items:
@@ -48,10 +67,20 @@ class Order:
         if not self._items:
             raise ValueError("Cannot submit an empty order")
         self._is_submitted = True
+        self._record(OrderSubmitted(self.id, self.customer_id, self.total()))
 
     def is_submitted(self) -> bool:
         return self._is_submitted
 
+    def pull_events(self) -> List[OrderEvent]:
+        """Hands over the events recorded since the last call."""
+        events, self._events = self._events, []
+        return events
+
+    def _record(self, event: OrderEvent) -> None:
+        self._events.append(event)
+        self.updated_at = event.occurred_at
+
     def _assert_not_submitted(self):
         if self._is_submitted:
             raise ValueError("Order is already submitted and cannot be modified")
@@ -1,13 +1,111 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, Iterator, List, Literal, Optional, Sequence, Tuple
 import uuid
 from .models import Order
+from ..value_objects import ProductId
+from .events import OrderEvent
+
+# Stable keyset sort key for listings: (created_at, id). Listings run newest first.
+OrderKey = Tuple[datetime, uuid.UUID]
+
+def order_key(order: Order) -> OrderKey:
+    return (order.created_at, order.id)
+
+@dataclass(frozen=True)
+class OrderFilter:
+    status: Optional[Literal["open", "submitted"]] = None
+    min_total_pence: Optional[int] = None
+    max_total_pence: Optional[int] = None
+
+    def accepts(self, is_submitted: bool, total_pence: int) -> bool:
+        if self.status == "open" and is_submitted:
+            return False
+        if self.status == "submitted" and not is_submitted:
+            return False
+        if self.min_total_pence is not None and total_pence < self.min_total_pence:
+            return False
+        if self.max_total_pence is not None and total_pence > self.max_total_pence:
+            return False
+        return True
+
+@dataclass
+class OrderPage:
+    orders: List[Order]
+    next_key: Optional[OrderKey] = None
+
+def page_of(orders_newest_first: Iterable[Order], filter: OrderFilter, limit: int) -> OrderPage:
+    """Takes up to ``limit`` matching orders, peeking one further to know whether a next page exists."""
+    out: List[Order] = []
+    for o in orders_newest_first:
+        if not filter.accepts(o.is_submitted(), o.total().amount):
+            continue
+        if len(out) == limit:
+            return OrderPage(out, order_key(out[-1]))
+        out.append(o)
+    return OrderPage(out)
+
+class ConcurrencyError(ValueError):
+    """The order was changed by someone else since the caller read it."""
 
 class OrderRepositoryPort(ABC):
+    """Orders carry a version; ``save`` rejects stale writes and bumps it."""
     @abstractmethod
     def save(self, order: Order) -> None: ...
     @abstractmethod
     def get(self, order_id: uuid.UUID) -> Optional[Order]: ...
     @abstractmethod
     def by_customer(self, customer_id: uuid.UUID) -> List[Order]: ...
+    @abstractmethod
+    def iter_all(self) -> Iterator[Order]: ...
+
+    def save_many(self, orders: Iterable[Order]) -> None:
+        # Adapters override this to write a batch in one round trip / transaction.
+        for o in orders:
+            self.save(o)
+
+    def version_of(self, order_id: uuid.UUID) -> Optional[int]:
+        # Adapters override this when they can answer without hydrating the order.
+        order = self.get(order_id)
+        return order.version if order else None
+
+    def list_for_customer(
+        self, customer_id: uuid.UUID, filter: OrderFilter = OrderFilter(),
+        after: Optional[OrderKey] = None, limit: int = 50,
+    ) -> OrderPage:
+        """One page of a customer's orders, newest first, strictly older than ``after``."""
+        orders = sorted(self.by_customer(customer_id), key=order_key, reverse=True)
+        if after is not None:
+            orders = [o for o in orders if order_key(o) < after]
+        return page_of(orders, filter, limit)
+
+    def list_for_product(
+        self, product_id: ProductId, filter: OrderFilter = OrderFilter(),
+        after: Optional[OrderKey] = None, limit: int = 50,
+    ) -> OrderPage:
+        """One page of the orders with a line for ``product_id``, newest first, strictly older than ``after``."""
+        # Adapters override this with a product index; this fallback scans every order.
+        orders = sorted(
+            (o for o in self.iter_all()
+             if (after is None or order_key(o) < after) and any(it.product_id == product_id for it in o.iter_items())),
+            key=order_key, reverse=True)
+        return page_of(orders, filter, limit)
+
+    def list_created_between(
+        self, start: datetime, end: datetime, filter: OrderFilter = OrderFilter(),
+        after: Optional[OrderKey] = None, limit: int = 50,
+    ) -> OrderPage:
+        """One page of the orders created in ``[start, end)``, newest first, strictly older than ``after``."""
+        # Adapters override this with a range scan over an index in creation order.
+        orders = sorted(
+            (o for o in self.iter_all()
+             if start <= o.created_at < end and (after is None or order_key(o) < after)),
+            key=order_key, reverse=True)
+        return page_of(orders, filter, limit)
+
+class EventPublisherPort(ABC):
+    """Where the application hands domain events once the change that raised them is saved."""
+    @abstractmethod
+    def publish(self, events: Sequence[OrderEvent]) -> None: ...
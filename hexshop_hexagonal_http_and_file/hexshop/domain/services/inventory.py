@@ -0,0 +1,35 @@
+from __future__ import annotations
+from typing import Dict, Iterable, Tuple
+import uuid
+from ..inventory.ports import InventoryPort
+from ..orders.models import Order
+from ..value_objects import ProductId
+
+class InventoryService:
+    """Keeps an order's stock reservations in step with its lines."""
+    def __init__(self, inventory: InventoryPort):
+        self.inventory = inventory
+
+    def reserve_lines(self, order_id: uuid.UUID, lines: Iterable[Tuple[ProductId, int]]) -> Dict[ProductId, int]:
+        """Reserves every line in one call (lines for the same product are summed); returns what was reserved."""
+        wanted: Dict[ProductId, int] = {}
+        for product_id, quantity in lines:
+            wanted[product_id] = wanted.get(product_id, 0) + quantity
+        self.inventory.reserve(order_id, wanted)
+        return wanted
+
+    def release(self, order_id: uuid.UUID, quantities: Dict[ProductId, int]) -> None:
+        if quantities:
+            self.inventory.release(order_id, quantities)
+
+    @staticmethod
+    def held_for(order: Order, product_id: ProductId) -> Dict[ProductId, int]:
+        """What ``order``'s lines for ``product_id`` hold, for releasing when they are removed."""
+        quantity = sum(it.quantity for it in order.iter_items() if it.product_id == product_id)
+        return {product_id: quantity} if quantity else {}
+
+    def commit(self, order: Order) -> None:
+        self.inventory.commit(order.id)
+
+    def cancel(self, order_id: uuid.UUID) -> None:
+        self.inventory.cancel(order_id)
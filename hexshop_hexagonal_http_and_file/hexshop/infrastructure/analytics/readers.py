@@ -0,0 +1,114 @@
+"""Streaming readers over stored order records, split into byte/row ranges for parallel scans.
+
+A partition is ``(kind, path, start, end)``; each reader yields the raw record
+dicts that *start* inside its range, so the partitions of one source cover every
+record exactly once. A ``file`` source includes its archive segments, one
+partition each.
+"""
+from __future__ import annotations
+from typing import Iterator, List, Tuple
+import json, os, re, sqlite3
+from ..persistence.order_archive import OrderArchive, archive_dir_for, iter_segment
+
+Partition = Tuple[str, str, int, int]
+KINDS = ("file", "ndjson", "sqlite")
+
+_BLOCK = 1 << 20
+_decoder = json.JSONDecoder()
+# a top-level key of the file repository's JSON object: the order id, followed by the record
+_RECORD_KEY = re.compile(r'"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}"\s*:\s*\{')
+
+def partitions(kind: str, path: str, parts: int) -> List[Partition]:
+    if kind not in KINDS:
+        raise ValueError(f"cannot scan {kind!r} sources ({', '.join(KINDS)})")
+    if kind == "sqlite":
+        conn = sqlite3.connect(path)
+        try:
+            lo, hi = conn.execute("SELECT min(rowid), max(rowid) FROM orders").fetchone()
+        finally:
+            conn.close()
+        if lo is None:
+            return []
+        lo, hi = lo, hi + 1
+    else:
+        lo, hi = 0, os.path.getsize(path)
+    step = max((hi - lo + parts - 1) // parts, 1)
+    out = [(kind, path, s, min(s + step, hi)) for s in range(lo, hi, step)]
+    if kind == "file" and os.path.isdir(archive_dir_for(path)):
+        out += [("segment", seg, 0, 0) for seg in OrderArchive(archive_dir_for(path)).segment_paths()]
+    return out
+
+def read_partition(p: Partition) -> Iterator[dict]:
+    kind, path, start, end = p
+    if kind == "file":
+        return _file_records(path, start, end)
+    if kind == "ndjson":
+        return _ndjson_records(path, start, end)
+    if kind == "segment":
+        return iter_segment(path)
+    return _sqlite_records(path, start, end)
+
+def _file_records(path: str, start: int, end: int) -> Iterator[dict]:
+    # The repository writes with json.dumps' default ensure_ascii, so character
+    # offsets in the decoded text equal byte offsets in the file.
+    with open(path, "rb") as f:
+        f.seek(start)
+        buf, base, eof = "", start, False
+
+        def more() -> bool:
+            nonlocal buf, eof
+            block = f.read(_BLOCK)
+            eof = not block
+            buf += block.decode("ascii")
+            return not eof
+
+        pos = 0
+        while True:
+            m = _RECORD_KEY.search(buf, pos)
+            if m is None:
+                if eof:
+                    return
+                # keep a tail in case a key straddles the block boundary
+                keep = max(len(buf) - 64, pos)
+                buf, base, pos = buf[keep:], base + keep, 0
+                more()
+                continue
+            if base + m.start() >= end:
+                return
+            value_at = m.end() - 1
+            while True:
+                try:
+                    record, pos = _decoder.raw_decode(buf, value_at)
+                    break
+                except json.JSONDecodeError:
+                    if not more():
+                        raise
+            yield record
+            if pos > _BLOCK:
+                buf, base, pos = buf[pos:], base + pos, 0
+
+def _ndjson_records(path: str, start: int, end: int) -> Iterator[dict]:
+    with open(path, "rb") as f:
+        if start:
+            # a line belongs to the partition its first byte falls in
+            f.seek(start - 1)
+            f.readline()
+        while f.tell() < end:
+            line = f.readline()
+            if not line:
+                return
+            if line.strip():
+                yield json.loads(line)
+
+def _sqlite_records(path: str, start: int, end: int) -> Iterator[dict]:
+    conn = sqlite3.connect(path)
+    try:
+        cursor = conn.execute("SELECT body FROM orders WHERE rowid >= ? AND rowid < ?", (start, end))
+        while True:
+            rows = cursor.fetchmany(1000)
+            if not rows:
+                return
+            for (body,) in rows:
+                yield json.loads(body)
+    finally:
+        conn.close()
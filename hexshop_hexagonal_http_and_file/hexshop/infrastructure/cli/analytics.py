@@ -0,0 +1,57 @@
+"""Sales analytics over an order store.
+
+    python -m hexshop.infrastructure.cli.analytics file:./orders.json
+    python -m hexshop.infrastructure.cli.analytics sqlite:./orders.db --by product,day --format json
+    python -m hexshop.infrastructure.cli.analytics ndjson:./orders.ndjson --include-open --workers 8
+
+Stored records are read directly and are never loaded as ``Order`` objects. Each
+``--workers`` process scans a slice of the file or table, and the partial totals
+are merged at the end. Product, customer and day figures count submitted orders
+only, unless ``--include-open`` is given. The status breakdown always counts
+every order.
+"""
+from __future__ import annotations
+from typing import List, Optional
+import argparse, csv, json, os, sys, time
+from ..analytics.readers import KINDS
+from ..analytics.sales import DIMENSIONS, sales_report
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="hexshop-analytics", description=__doc__.splitlines()[0])
+    parser.add_argument("source", help=f"{'|'.join(KINDS)}:PATH")
+    parser.add_argument("--by", default=",".join(DIMENSIONS), help="comma-separated dimensions to print")
+    parser.add_argument("--format", choices=("csv", "json"), default="csv")
+    parser.add_argument("--include-open", action="store_true", help="count open orders in product/customer/day")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="scanning processes (0 scans in-process)")
+    parser.add_argument("--out", default="-")
+    args = parser.parse_args(argv)
+
+    kind, _, path = args.source.partition(":")
+    dimensions = [d for d in args.by.split(",") if d]
+    unknown = set(dimensions) - set(DIMENSIONS)
+    if unknown or not path:
+        parser.error(f"unknown dimension(s) {sorted(unknown)}" if unknown else "source must be KIND:PATH")
+    statuses = ("open", "submitted") if args.include_open else ("submitted",)
+
+    started = time.perf_counter()
+    try:
+        report = sales_report(kind, path, args.workers, statuses)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    elapsed = time.perf_counter() - started
+    print(f"scanned {report.records} orders in {elapsed:.2f}s", file=sys.stderr)
+
+    with (sys.stdout if args.out == "-" else open(args.out, "w", newline="")) as out:
+        if args.format == "json":
+            json.dump({"orders_scanned": report.records, **{f"by_{d}": report.rows(d) for d in dimensions}}, out, indent=2)
+            out.write("\n")
+        else:
+            writer = csv.writer(out)
+            writer.writerow(("dimension", "key", "currency", "orders", "units", "revenue_pence"))
+            for d in dimensions:
+                for row in report.rows(d):
+                    writer.writerow((d, row["key"], row["currency"], row["orders"], row["units"], row["revenue_pence"]))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
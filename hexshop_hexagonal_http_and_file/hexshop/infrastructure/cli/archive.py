@@ -0,0 +1,49 @@
+"""Moves old submitted orders out of a live orders file into compressed archive segments.
+
+    python -m hexshop.infrastructure.cli.archive ./orders.json --older-than-days 30
+    python -m hexshop.infrastructure.cli.archive ./orders.json --before 2025-01-01 --codec lzma
+
+Segments go to ``<file>.archive/``, where ``FileOrderRepository`` finds them. Orders
+stay readable by id, and exports and analytics include them. Customer
+listings are served from the order summaries, which keep every order.
+It refuses to run while a write-behind server owns the file, since that
+process would write the archived orders back.
+"""
+from __future__ import annotations
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+import argparse, os, sys, time
+from ..persistence.file_order_repository import FileOrderRepository
+from ..persistence.order_archive import CODECS, OrderArchive, archive_dir_for
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="hexshop-archive", description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="live orders file (REPO_FILE)")
+    when = parser.add_mutually_exclusive_group(required=True)
+    when.add_argument("--older-than-days", type=float, help="archive orders last changed this long ago")
+    when.add_argument("--before", type=datetime.fromisoformat, help="archive orders last changed before this time")
+    parser.add_argument("--codec", choices=sorted(CODECS), default="gzip")
+    parser.add_argument("--block-records", type=int, default=256, help="records per compressed block")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.path):
+        raise SystemExit(f"{args.path} does not exist")
+    if args.before is not None:
+        cutoff = args.before if args.before.tzinfo else args.before.replace(tzinfo=timezone.utc)
+    else:
+        cutoff = datetime.now(timezone.utc) - timedelta(days=args.older_than_days)
+    archive = OrderArchive(archive_dir_for(args.path), args.codec, args.block_records)
+    repo = FileOrderRepository(args.path, archive=archive)
+    started = time.perf_counter()
+    before_size = os.path.getsize(args.path)
+    try:
+        moved = repo.archive_submitted(cutoff)
+    except RuntimeError as e:
+        raise SystemExit(str(e))
+    print(f"archived {moved} orders in {time.perf_counter() - started:.2f}s; "
+          f"{args.path}: {before_size:,} -> {os.path.getsize(args.path):,} bytes; "
+          f"{len(archive)} orders archived in total")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
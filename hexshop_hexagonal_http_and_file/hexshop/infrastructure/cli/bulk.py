@@ -0,0 +1,294 @@
+"""Bulk import, export and migration of orders between files and repositories.
+
+    python -m hexshop.infrastructure.cli.bulk import orders.ndjson --to sqlite:./orders.db
+    python -m hexshop.infrastructure.cli.bulk import orders.csv --to file:./orders.json --workers 8
+    python -m hexshop.infrastructure.cli.bulk export --from sqlite:./orders.db --out orders.csv
+    python -m hexshop.infrastructure.cli.bulk migrate --from file:./orders.json --to sqlite:./orders.db
+    python -m hexshop.infrastructure.cli.bulk reshard --from file:./orders.json --to sharded:4:file:./orders-{}.json
+
+Input is read in chunks of ``--chunk-size`` records. A process pool decodes and
+validates each chunk into ``Order`` objects, and the results are written with one
+``save_many`` call per chunk. At most two chunks per worker are in flight, so
+memory stays bounded however large the input is.
+
+CSV has one row per order line, and the rows of an order must be contiguous.
+An order with no lines is a single row with the product columns left empty.
+Saving counts as a write, so every imported order is stored at its version plus one.
+
+``reshard`` is a migration into a sharded layout, and the way to change the
+shard count: copy to a new set of shards, then point the servers at them.
+"""
+from __future__ import annotations
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from itertools import groupby, islice
+from typing import Deque, Iterable, Iterator, List, Optional, TextIO, Tuple
+import argparse, csv, json, os, sys, time
+from ...domain.orders.models import Order
+from ...domain.orders.ports import ConcurrencyError, OrderRepositoryPort
+from ..persistence.factory import SPECS, open_order_repository
+from ..persistence.file_order_repository import _order_from_dict, _order_to_dict
+from ..persistence.sharded_order_repository import ShardedOrderRepository
+
+CSV_FIELDS = ("order_id", "customer_id", "created_at", "is_submitted", "version",
+              "product_id", "unit_price_pence", "currency", "quantity")
+MAX_REPORTED_ERRORS = 20
+
+def _format_of(path: str, fmt: Optional[str]) -> str:
+    if fmt:
+        return fmt
+    return "csv" if path.endswith(".csv") else "ndjson"
+
+# --- decoding (runs in the worker processes) ---
+
+def _record_from_rows(rows: List[dict]) -> dict:
+    first = rows[0]
+    return {
+        "id": first["order_id"],
+        "customer_id": first["customer_id"],
+        "created_at": first.get("created_at") or None,
+        "is_submitted": (first.get("is_submitted") or "").lower() in ("1", "true"),
+        "version": int(first.get("version") or 0),
+        "items": [
+            {"product_id": r["product_id"],
+             "unit_price": {"amount": int(r["unit_price_pence"]), "currency": r.get("currency") or "GBP"},
+             "quantity": int(r["quantity"])}
+            for r in rows if r.get("product_id")
+        ],
+    }
+
+def _decode(fmt: str, unit) -> Order:
+    if fmt == "ndjson":
+        unit = json.loads(unit)
+    elif fmt == "csv":
+        unit = _record_from_rows(unit)
+    return _order_from_dict(unit)
+
+def decode_chunk(fmt: str, start: int, units: list) -> Tuple[List[Order], List[str]]:
+    """Decodes one chunk; a bad record is reported by its position and does not sink the chunk."""
+    orders: List[Order] = []
+    errors: List[str] = []
+    for n, unit in enumerate(units, start):
+        try:
+            orders.append(_decode(fmt, unit))
+        except (ValueError, KeyError, TypeError) as e:
+            errors.append(f"record {n}: {type(e).__name__}: {e}")
+    return orders, errors
+
+# --- reading ---
+
+def _units(fmt: str, stream: TextIO) -> Iterator:
+    if fmt == "ndjson":
+        return (line for line in stream if line.strip())
+    if fmt == "csv":
+        return (list(rows) for _, rows in groupby(csv.DictReader(stream), key=lambda r: r["order_id"]))
+    raise ValueError(f"unknown format {fmt!r} (ndjson, csv)")
+
+def _records_of(repo: OrderRepositoryPort) -> Iterator[dict]:
+    iter_records = getattr(repo, "iter_records", None)
+    if iter_records is not None:
+        return iter_records()
+    return (_order_to_dict(o) for o in repo.iter_all())
+
+def _chunks(units: Iterable, size: int) -> Iterator[Tuple[int, list]]:
+    it, start = iter(units), 1
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield start, chunk
+        start += len(chunk)
+
+class _InProcess(Executor):
+    """Runs "submitted" work inline; ``--workers 0``, handy for debugging and tests."""
+    def submit(self, fn, *args, **kwargs):
+        f: Future = Future()
+        try:
+            f.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            f.set_exception(e)
+        return f
+
+# --- progress ---
+
+class Progress:
+    def __init__(self, label: str, out: TextIO = sys.stderr, interval: float = 1.0):
+        self.label, self.out, self.interval = label, out, interval
+        self.records = self.written = self.errors = self.conflicts = 0
+        self.started = self._last_at = time.perf_counter()
+        self._last_records = 0
+
+    def add(self, records: int, written: int = 0, errors: int = 0, conflicts: int = 0) -> None:
+        self.records += records
+        self.written += written
+        self.errors += errors
+        self.conflicts += conflicts
+        now = time.perf_counter()
+        if now - self._last_at >= self.interval:
+            rate = (self.records - self._last_records) / (now - self._last_at)
+            print(f"{self.label}: {self.records} records, {rate:,.0f}/s, "
+                  f"{self.errors} invalid, {self.conflicts} conflicts", file=self.out, flush=True)
+            self._last_at, self._last_records = now, self.records
+
+    def summary(self) -> dict:
+        elapsed = time.perf_counter() - self.started
+        return {
+            "records": self.records, "written": self.written, "invalid": self.errors,
+            "conflicts": self.conflicts, "seconds": round(elapsed, 3),
+            "records_per_second": round(self.records / elapsed, 1) if elapsed else 0.0,
+        }
+
+# --- writing ---
+
+def _write_batch(repo: OrderRepositoryPort, orders: List[Order]) -> Tuple[int, List[str]]:
+    try:
+        repo.save_many(orders)
+        return len(orders), []
+    except ConcurrencyError:
+        pass
+    # a conflict fails the whole batch; retry one by one to find the culprits
+    written, conflicts = 0, []
+    for o in orders:
+        try:
+            repo.save(o)
+            written += 1
+        except ConcurrencyError:
+            conflicts.append(f"order {o.id}: already stored at another version")
+    return written, conflicts
+
+def load(units: Iterable, fmt: str, target: OrderRepositoryPort, progress: Progress,
+         workers: int = 0, chunk_size: int = 1000) -> List[str]:
+    """Decodes ``units`` in parallel and writes them to ``target``; returns the first problems seen."""
+    problems: List[str] = []
+    pool: Executor = ProcessPoolExecutor(workers) if workers > 0 else _InProcess()
+    in_flight: Deque[Tuple[int, Future]] = deque()
+
+    def drain_one() -> None:
+        count, fut = in_flight.popleft()
+        orders, errors = fut.result()
+        written, conflicts = _write_batch(target, orders) if orders else (0, [])
+        problems.extend((errors + conflicts)[:MAX_REPORTED_ERRORS - len(problems)])
+        progress.add(count, written, len(errors), len(conflicts))
+
+    with pool:
+        for start, chunk in _chunks(units, chunk_size):
+            in_flight.append((len(chunk), pool.submit(decode_chunk, fmt, start, chunk)))
+            if len(in_flight) >= max(2 * workers, 1):
+                drain_one()
+        while in_flight:
+            drain_one()
+    return problems
+
+def dump(records: Iterable[dict], fmt: str, out: TextIO, progress: Progress) -> None:
+    if fmt == "ndjson":
+        for d in records:
+            out.write(json.dumps(d, separators=(",", ":")))
+            out.write("\n")
+            progress.add(1, 1)
+        return
+    if fmt != "csv":
+        raise ValueError(f"unknown format {fmt!r} (ndjson, csv)")
+    writer = csv.writer(out)
+    writer.writerow(CSV_FIELDS)
+    for d in records:
+        head = [d["id"], d["customer_id"], d.get("created_at") or "", int(bool(d.get("is_submitted"))), d.get("version", 0)]
+        items = d.get("items") or []
+        for it in items:
+            writer.writerow(head + [it["product_id"], it["unit_price"]["amount"], it["unit_price"]["currency"], it["quantity"]])
+        if not items:
+            writer.writerow(head + ["", "", "", ""])
+        progress.add(1, 1)
+
+# --- commands ---
+
+def _report(progress: Progress, problems: List[str], as_json: bool) -> int:
+    summary = progress.summary()
+    for p in problems:
+        print(f"  {p}", file=sys.stderr)
+    if as_json:
+        print(json.dumps(summary))
+    else:
+        print(f"{progress.label}: {summary['records']} records in {summary['seconds']:.1f}s "
+              f"({summary['records_per_second']:,.0f}/s), {summary['written']} written, "
+              f"{summary['invalid']} invalid, {summary['conflicts']} conflicts")
+    return 1 if summary["invalid"] or summary["conflicts"] else 0
+
+def _cmd_import(args) -> int:
+    fmt = _format_of(args.path, args.format)
+    target = open_order_repository(args.to)
+    progress = Progress("import")
+    with (sys.stdin if args.path == "-" else open(args.path, newline="")) as stream:
+        problems = load(_units(fmt, stream), fmt, target, progress, args.workers, args.chunk_size)
+    return _report(progress, problems, args.json)
+
+def _cmd_export(args) -> int:
+    fmt = _format_of(args.out, args.format)
+    source = open_order_repository(args.source)
+    progress = Progress("export")
+    with (sys.stdout if args.out == "-" else open(args.out, "w", newline="")) as out:
+        dump(_records_of(source), fmt, out, progress)
+    return _report(progress, [], args.json)
+
+def _cmd_migrate(args) -> int:
+    source, target = open_order_repository(args.source), open_order_repository(args.to)
+    progress = Progress("migrate")
+    problems = load(_records_of(source), "dict", target, progress, args.workers, args.chunk_size)
+    return _report(progress, problems, args.json)
+
+def _cmd_reshard(args) -> int:
+    source, target = open_order_repository(args.source), open_order_repository(args.to)
+    if not isinstance(target, ShardedOrderRepository):
+        raise ValueError(f"reshard needs a sharded:N:SPEC target, got {args.to!r}")
+    progress = Progress("reshard")
+    problems = load(_records_of(source), "dict", target, progress, args.workers, args.chunk_size)
+    status = _report(progress, problems, args.json)
+    if not args.json:
+        print("orders per shard: " + ", ".join(map(str, target.stats()["orders"])))
+    target.close()
+    return status
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="hexshop-bulk", description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def common(p, parallel: bool = True):
+        if parallel:
+            p.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                           help="decoding processes (0 decodes in-process)")
+            p.add_argument("--chunk-size", type=int, default=1000)
+        p.add_argument("--json", action="store_true", help="print the summary as JSON")
+
+    p = sub.add_parser("import", help="load orders from a CSV/NDJSON file ('-' for stdin)")
+    p.add_argument("path")
+    p.add_argument("--to", required=True, help=f"target repository: {SPECS}")
+    p.add_argument("--format", choices=("ndjson", "csv"), help="default: from the file extension")
+    common(p)
+    p.set_defaults(run=_cmd_import)
+
+    p = sub.add_parser("export", help="write every order to a CSV/NDJSON file ('-' for stdout)")
+    p.add_argument("--from", dest="source", required=True, help=f"source repository: {SPECS}")
+    p.add_argument("--out", default="-")
+    p.add_argument("--format", choices=("ndjson", "csv"), help="default: from the file extension")
+    common(p, parallel=False)
+    p.set_defaults(run=_cmd_export)
+
+    p = sub.add_parser("migrate", help="copy every order from one repository to another")
+    p.add_argument("--from", dest="source", required=True, help=f"source repository: {SPECS}")
+    p.add_argument("--to", required=True, help=f"target repository: {SPECS}")
+    common(p)
+    p.set_defaults(run=_cmd_migrate)
+
+    p = sub.add_parser("reshard", help="copy every order into a new set of shards")
+    p.add_argument("--from", dest="source", required=True, help=f"source repository: {SPECS}")
+    p.add_argument("--to", required=True, help="target shards, e.g. sharded:8:file:./orders-{}.json")
+    common(p)
+    p.set_defaults(run=_cmd_reshard)
+
+    args = parser.parse_args(argv)
+    try:
+        return args.run(args)
+    except (ValueError, RuntimeError) as e:  # bad spec, or a store another process owns
+        raise SystemExit(str(e))
+
+if __name__ == "__main__":
+    sys.exit(main())
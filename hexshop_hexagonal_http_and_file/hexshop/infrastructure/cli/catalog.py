@@ -0,0 +1,43 @@
+"""Loads product prices into the catalog that servers read with CATALOG_DB / CATALOG_FILE.
+
+    python -m hexshop.infrastructure.cli.catalog prices.csv --to sqlite:./catalog.db
+    python -m hexshop.infrastructure.cli.catalog prices.csv --to file:./catalog.json
+
+The CSV has a header and the columns ``product_id,unit_price_pence[,currency]``.
+Products already in the catalog are repriced. Running servers pick up the new
+prices once their cached entries expire (``HEXSHOP_CATALOG_TTL`` seconds).
+"""
+from __future__ import annotations
+from typing import List, Optional
+import argparse, csv, sys
+from ...domain.catalog.ports import ProductCatalogPort
+from ...domain.value_objects import Money, ProductId
+from ..persistence.file_product_catalog import FileProductCatalog
+from ..persistence.sqlite_product_catalog import SqliteProductCatalog
+
+def open_catalog(spec: str) -> ProductCatalogPort:
+    kind, _, path = spec.partition(":")
+    if kind == "sqlite" and path:
+        return SqliteProductCatalog(path)
+    if kind == "file" and path:
+        return FileProductCatalog(path)
+    raise ValueError(f"unknown catalog {spec!r} (sqlite:PATH, file:PATH)")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="hexshop-catalog", description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="CSV of prices ('-' for stdin)")
+    parser.add_argument("--to", required=True, help="sqlite:PATH or file:PATH")
+    args = parser.parse_args(argv)
+    try:
+        catalog = open_catalog(args.to)
+        with (sys.stdin if args.path == "-" else open(args.path, newline="")) as f:
+            prices = {ProductId(r["product_id"]): Money(int(r["unit_price_pence"]), r.get("currency") or "GBP")
+                      for r in csv.DictReader(f)}
+    except (ValueError, KeyError) as e:
+        raise SystemExit(f"{type(e).__name__}: {e}")
+    catalog.set_prices(prices)
+    print(f"{len(prices)} prices loaded into {args.to}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
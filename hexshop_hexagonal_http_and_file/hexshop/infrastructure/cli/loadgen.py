@@ -0,0 +1,261 @@
+"""Synthetic checkout traffic against CheckoutService or the HTTP app, with latency percentiles.
+
+    python -m hexshop.infrastructure.cli.loadgen --sessions 2000 --concurrency 16
+    python -m hexshop.infrastructure.cli.loadgen --target http --app file --rate 200 --duration 30
+    python -m hexshop.infrastructure.cli.loadgen --repo file:./orders.json --mix add=5,preview=1,submit=0.3
+
+A session starts an order, adds a Poisson-distributed number of lines,
+previews the discounted total some number of times and then submits with
+some probability (``--mix``). Customers are picked with a Zipf distribution so a
+few hot customers own most orders, as on a real storefront.
+
+In the open loop (``--rate``), a session's ``start`` latency runs from its
+scheduled arrival, not from when a worker got to it. Time spent waiting for a
+free worker therefore counts, as it would for a real client, instead of
+vanishing just when the system falls behind. The report also says how many
+arrivals started more than 1ms late, and the worst delay.
+"""
+from __future__ import annotations
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from itertools import accumulate
+from typing import Callable, Dict, List, Optional
+import argparse, json, math, os, random, sys, threading, time
+from ..persistence.factory import SPECS, open_order_repository
+
+OPERATIONS = ("start", "add", "preview", "submit")
+LATE_AFTER = 0.001  # an arrival whose session starts later than this after its schedule is late
+
+@dataclass
+class Mix:
+    add: float = 3.0
+    preview: float = 1.0
+    submit: float = 0.6
+
+    @staticmethod
+    def parse(text: str) -> "Mix":
+        mix = Mix()
+        for part in filter(None, text.split(",")):
+            name, _, value = part.partition("=")
+            if name not in ("add", "preview", "submit"):
+                raise argparse.ArgumentTypeError(f"unknown mix entry {name!r}")
+            setattr(mix, name, float(value))
+        return mix
+
+class Zipf:
+    def __init__(self, n: int, s: float):
+        self._cdf = list(accumulate(1 / (rank ** s) for rank in range(1, n + 1)))
+
+    def sample(self, rng: random.Random) -> int:
+        return bisect_left(self._cdf, rng.random() * self._cdf[-1])
+
+def _poisson(rng: random.Random, mean: float) -> int:
+    # Knuth; means here are small
+    limit, k, p = math.exp(-mean), 0, rng.random()
+    while p > limit:
+        k += 1
+        p *= rng.random()
+    return k
+
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = {op: [] for op in OPERATIONS}
+        self.errors: Dict[str, int] = {op: 0 for op in OPERATIONS}
+        self.arrival_delays: List[float] = []  # open loop: how late each session started
+
+    def arrived(self, scheduled: float) -> None:
+        delay = time.perf_counter() - scheduled
+        with self._lock:
+            self.arrival_delays.append(max(delay, 0.0))
+
+    def timed(self, op: str, fn: Callable, *args, since: Optional[float] = None):
+        # ``since``: when the operation was due, if earlier than now (an open-loop arrival)
+        start = time.perf_counter() if since is None else since
+        try:
+            return fn(*args)
+        except Exception:
+            with self._lock:
+                self.errors[op] += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.latencies[op].append(elapsed)
+
+    def report(self, wall_seconds: float) -> dict:
+        out = {"wall_seconds": wall_seconds, "operations": {}}
+        for op in OPERATIONS:
+            samples = sorted(self.latencies[op])
+            n = len(samples)
+            if not n:
+                continue
+
+            def pct(q: float) -> float:
+                return samples[min(n - 1, int(n * q))] * 1e3
+            out["operations"][op] = {
+                "count": n, "errors": self.errors[op], "throughput_per_s": n / wall_seconds,
+                "p50_ms": pct(0.50), "p95_ms": pct(0.95), "p99_ms": pct(0.99), "p999_ms": pct(0.999),
+            }
+        if self.arrival_delays:
+            out["arrivals"] = {
+                "scheduled": len(self.arrival_delays),
+                "late": sum(d > LATE_AFTER for d in self.arrival_delays),
+                "max_delay_ms": max(self.arrival_delays) * 1e3,
+            }
+        return out
+
+class DirectDriver:
+    """Calls CheckoutService in this process."""
+    def __init__(self, repo_spec: str):
+        from ...domain.entities import Customer
+        from ...domain.services.discounts import DiscountService
+        from ...application.use_cases import CheckoutService
+        self._customer_cls = Customer
+        self.checkout = CheckoutService(_order_repository(repo_spec), DiscountService())
+
+    def create_customer(self, n: int):
+        return self._customer_cls.new(f"Customer {n}", f"customer{n}@example.com")
+
+    def start(self, customer, sku: str, price: int, qty: int):
+        return self.checkout.start_order_with_item(customer, sku, price, qty)
+
+    def add(self, order_id, sku: str, price: int, qty: int):
+        self.checkout.add_item(order_id, sku, price, qty)
+
+    def preview(self, order_id):
+        self.checkout.preview_total_with_discount(order_id, 2000, 10)
+
+    def submit(self, order_id):
+        self.checkout.submit(order_id)
+
+class HttpDriver:
+    """Drives the FastAPI app in-process through its ASGI interface (one test client per thread)."""
+    def __init__(self, app_name: str):
+        from fastapi.testclient import TestClient
+        if app_name == "file":
+            from ..http.fastapi_app_file import app
+        else:
+            from ..http.fastapi_app import app
+        self._app, self._client_cls = app, TestClient
+        self._local = threading.local()
+        self._email_tag = os.getpid()  # keep emails unique across runs against a persistent store
+
+    def _client(self):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self._client_cls(self._app)
+        return client
+
+    @staticmethod
+    def _ok(response):
+        if response.status_code >= 400:
+            raise RuntimeError(f"HTTP {response.status_code}: {response.text}")
+        return response
+
+    def create_customer(self, n: int):
+        body = {"name": f"Customer {n}", "email": f"customer{n}-{self._email_tag}@example.com"}
+        return self._ok(self._client().post("/customers", json=body)).json()["customer_id"]
+
+    def start(self, customer_id, sku: str, price: int, qty: int):
+        body = {"customer_id": customer_id, "product_id": sku, "unit_price_pence": price, "quantity": qty}
+        return self._ok(self._client().post("/orders", json=body)).json()["order_id"]
+
+    def add(self, order_id, sku: str, price: int, qty: int):
+        body = {"product_id": sku, "unit_price_pence": price, "quantity": qty}
+        self._ok(self._client().post(f"/orders/{order_id}/items", json=body))
+
+    def preview(self, order_id):
+        self._ok(self._client().get(f"/orders/{order_id}/preview"))
+
+    def submit(self, order_id):
+        self._ok(self._client().post(f"/orders/{order_id}/submit"))
+
+def _order_repository(spec: str):
+    try:
+        return open_order_repository(spec)
+    except ValueError as e:
+        raise SystemExit(str(e))
+
+def _session(driver, recorder: Recorder, customers: list, zipf: Zipf, mix: Mix, rng: random.Random, skus: int,
+             scheduled: Optional[float] = None):
+    def line():
+        return f"SKU-{rng.randrange(skus)}", rng.choice((99, 250, 800, 1999, 2400)), rng.randint(1, 3)
+    if scheduled is not None:
+        recorder.arrived(scheduled)
+    try:
+        order_id = recorder.timed("start", driver.start, customers[zipf.sample(rng)], *line(), since=scheduled)
+        for _ in range(_poisson(rng, mix.add)):
+            recorder.timed("add", driver.add, order_id, *line())
+        for _ in range(_poisson(rng, mix.preview)):
+            recorder.timed("preview", driver.preview, order_id)
+        if rng.random() < mix.submit:
+            recorder.timed("submit", driver.submit, order_id)
+    except Exception:
+        pass  # already counted; a broken session just ends
+
+def run(args) -> dict:
+    driver = HttpDriver(args.app) if args.target == "http" else DirectDriver(args.repo)
+    customers = [driver.create_customer(n) for n in range(args.customers)]
+    zipf = Zipf(len(customers), args.zipf)
+    recorder = Recorder()
+    seed = random.Random(args.seed)
+
+    def one_session(session_seed: int, scheduled: Optional[float] = None):
+        _session(driver, recorder, customers, zipf, args.mix, random.Random(session_seed), args.skus, scheduled)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        if args.rate:
+            # open loop: sessions arrive as a Poisson process regardless of how fast they finish
+            deadline = start + args.duration
+            next_at = start
+            while next_at < deadline:
+                delay = next_at - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                pool.submit(one_session, seed.getrandbits(32), next_at)
+                next_at += seed.expovariate(args.rate)
+        else:
+            # closed loop: --concurrency workers run sessions back to back
+            for _ in range(args.sessions):
+                pool.submit(one_session, seed.getrandbits(32))
+    return recorder.report(time.perf_counter() - start)
+
+def _print_table(report: dict) -> None:
+    print(f"wall time {report['wall_seconds']:.2f}s")
+    print(f"{'op':<8} {'count':>8} {'errors':>7} {'ops/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'p999 ms':>9}")
+    for op, s in report["operations"].items():
+        print(f"{op:<8} {s['count']:>8} {s['errors']:>7} {s['throughput_per_s']:>9.1f} "
+              f"{s['p50_ms']:>9.3f} {s['p95_ms']:>9.3f} {s['p99_ms']:>9.3f} {s['p999_ms']:>9.3f}")
+    arrivals = report.get("arrivals")
+    if arrivals:
+        print(f"arrivals: {arrivals['scheduled']} scheduled, {arrivals['late']} started late, "
+              f"worst by {arrivals['max_delay_ms']:.1f} ms")
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", choices=("direct", "http"), default="direct")
+    parser.add_argument("--repo", default="memory", help=f"direct target: {SPECS}")
+    parser.add_argument("--app", choices=("memory", "file"), default="memory", help="http target: which FastAPI app")
+    parser.add_argument("--sessions", type=int, default=1000, help="closed loop: sessions to run")
+    parser.add_argument("--concurrency", type=int, default=8, help="worker threads")
+    parser.add_argument("--rate", type=float, help="open loop: session arrivals per second")
+    parser.add_argument("--duration", type=float, default=10.0, help="open loop: seconds to generate arrivals")
+    parser.add_argument("--customers", type=int, default=200)
+    parser.add_argument("--zipf", type=float, default=1.1, help="customer popularity skew (0 = uniform)")
+    parser.add_argument("--skus", type=int, default=500)
+    parser.add_argument("--mix", type=Mix.parse, default=Mix(), help="mean adds, mean previews, submit probability")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+    report = run(args)
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        _print_table(report)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""Rebuilds the order summary read model from scratch.
+
+    python -m hexshop.infrastructure.cli.projections rebuild --from file:./orders.json --to ./summaries.db
+
+Run this after restoring an order store from backup, after bulk imports or
+migrations (they write to the repository directly, not through CheckoutService),
+or whenever summaries are suspected to have drifted. Summaries are replaced in a
+single transaction, so readers see either the old set or the new one.
+"""
+from __future__ import annotations
+from typing import List, Optional
+import argparse, sys, time
+from ...application.projections import OrderSummaryProjection
+from ..persistence.factory import SPECS, open_order_repository
+from ..persistence.sqlite_summary_store import SqliteOrderSummaryStore
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="hexshop-projections", description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("rebuild", help="replace every summary with one computed from the order store")
+    p.add_argument("--from", dest="source", required=True, help=f"order repository: {SPECS}")
+    p.add_argument("--to", required=True, help="summary database (the server's SUMMARY_DB)")
+    args = parser.parse_args(argv)
+
+    try:
+        repo = open_order_repository(args.source)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    started = time.perf_counter()
+    count = OrderSummaryProjection(SqliteOrderSummaryStore(args.to)).rebuild(repo)
+    print(f"rebuilt {count} order summaries in {time.perf_counter() - started:.2f}s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,26 @@
+from __future__ import annotations
+import argparse, os
+from ..persistence.socket_order_repository import OrderStoreServer
+from ..persistence.durable_order_repository import DurableInMemoryOrderRepository
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a shared in-memory order store over a Unix socket.")
+    parser.add_argument("--socket", default=os.environ.get("ORDER_STORE_SOCKET", "./hexshop-orders.sock"))
+    parser.add_argument("--data-dir", default=os.environ.get("ORDER_DATA_DIR"),
+                        help="keep orders across restarts (snapshots + write-ahead log) in this directory")
+    parser.add_argument("--snapshot-interval", type=float, default=60.0)
+    args = parser.parse_args(argv)
+    repo = DurableInMemoryOrderRepository(args.data_dir, args.snapshot_interval) if args.data_dir else None
+    with OrderStoreServer(args.socket, repo) as server:
+        print(f"Order store listening on {args.socket}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.unlink(args.socket)
+            if repo is not None:
+                repo.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+from __future__ import annotations
+from typing import Iterable, Optional
+import asyncio, os
+from fastapi import FastAPI
+from ..observability.metrics import Registry
+
+READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+class AdmissionLimit:
+    """At most ``max_concurrency`` requests in flight and ``max_queue`` waiting; the rest are shed."""
+    def __init__(self, name: str, max_concurrency: int, max_queue: int, queue_timeout: Optional[float] = None):
+        if max_concurrency <= 0 or max_queue < 0:
+            raise ValueError("Admission limits must be positive")
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.waiting = 0
+        self.slots = asyncio.Semaphore(max_concurrency)
+
+    def full(self) -> bool:
+        return self.in_flight >= self.max_concurrency and self.waiting >= self.max_queue
+
+class AdmissionControlMiddleware:
+    """ASGI middleware that bounds concurrent and queued requests, separately for reads and writes.
+
+    Requests that find the queue full, or that wait longer than the limit's
+    ``queue_timeout``, get ``503`` with ``Retry-After`` instead of piling up in
+    the threadpool.
+    """
+    def __init__(
+        self, app, read: AdmissionLimit, write: AdmissionLimit, retry_after: int = 1,
+        registry: Optional[Registry] = None, exempt: Iterable[str] = ("/metrics",),
+        exempt_suffixes: Iterable[str] = ("/events",),
+    ):
+        self.app = app
+        self.read = read
+        self.write = write
+        self.retry_after = str(retry_after)
+        self.exempt = tuple(exempt)
+        # long-lived streams would pin a slot for their whole lifetime
+        self.exempt_suffixes = tuple(exempt_suffixes)
+        self._depth = self._in_flight = self._rejected = None
+        if registry is not None:
+            self._depth = registry.gauge(
+                "hexshop_admission_queue_depth", "Requests waiting for an admission slot", ["route_class"])
+            self._in_flight = registry.gauge(
+                "hexshop_admission_in_flight", "Requests holding an admission slot", ["route_class"])
+            self._rejected = registry.counter(
+                "hexshop_admission_rejected_total", "Requests shed by admission control", ["route_class", "reason"])
+
+    def _report(self, limit: AdmissionLimit) -> None:
+        if self._depth is not None:
+            self._depth.set(limit.waiting, route_class=limit.name)
+            self._in_flight.set(limit.in_flight, route_class=limit.name)
+
+    async def _reject(self, limit: AdmissionLimit, reason: str, send) -> None:
+        if self._rejected is not None:
+            self._rejected.inc(route_class=limit.name, reason=reason)
+        await send({
+            "type": "http.response.start", "status": 503,
+            "headers": [(b"retry-after", self.retry_after.encode()), (b"content-type", b"application/json")],
+        })
+        await send({"type": "http.response.body", "body": b'{"detail":"server busy, retry later"}'})
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "")
+        if scope["type"] != "http" or path.startswith(self.exempt) or path.endswith(self.exempt_suffixes):
+            await self.app(scope, receive, send)
+            return
+        limit = self.read if scope["method"] in READ_METHODS else self.write
+        if limit.full():
+            await self._reject(limit, "queue_full", send)
+            return
+        limit.waiting += 1
+        self._report(limit)
+        try:
+            await asyncio.wait_for(limit.slots.acquire(), limit.queue_timeout)
+        except asyncio.TimeoutError:
+            await self._reject(limit, "timeout", send)
+            return
+        finally:
+            limit.waiting -= 1
+        limit.in_flight += 1
+        self._report(limit)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limit.in_flight -= 1
+            limit.slots.release()
+            self._report(limit)
+
+def _env_int(name: str) -> Optional[int]:
+    raw = os.environ.get(name)
+    return int(raw) if raw else None
+
+def install_admission_control(app: FastAPI, registry: Optional[Registry] = None) -> None:
+    """Enables admission control from the environment; off unless a concurrency limit is set.
+
+    ``HEXSHOP_MAX_READS`` / ``HEXSHOP_MAX_WRITES`` cap in-flight requests,
+    ``HEXSHOP_READ_QUEUE`` / ``HEXSHOP_WRITE_QUEUE`` cap waiters (default: same as
+    the concurrency cap), ``HEXSHOP_QUEUE_TIMEOUT`` bounds the wait in seconds and
+    ``HEXSHOP_RETRY_AFTER`` is sent to shed clients.
+    """
+    max_reads, max_writes = _env_int("HEXSHOP_MAX_READS"), _env_int("HEXSHOP_MAX_WRITES")
+    if max_reads is None and max_writes is None:
+        return
+    timeout = float(os.environ["HEXSHOP_QUEUE_TIMEOUT"]) if os.environ.get("HEXSHOP_QUEUE_TIMEOUT") else None
+    # an unset side gets a generous cap rather than none so one class can't starve the other
+    max_reads = max_reads or 1024
+    max_writes = max_writes or 1024
+    read_queue, write_queue = _env_int("HEXSHOP_READ_QUEUE"), _env_int("HEXSHOP_WRITE_QUEUE")
+    read = AdmissionLimit("read", max_reads, max_reads if read_queue is None else read_queue, timeout)
+    write = AdmissionLimit("write", max_writes, max_writes if write_queue is None else write_queue, timeout)
+    app.add_middleware(
+        AdmissionControlMiddleware, read=read, write=write,
+        retry_after=_env_int("HEXSHOP_RETRY_AFTER") or 1, registry=registry,
+    )
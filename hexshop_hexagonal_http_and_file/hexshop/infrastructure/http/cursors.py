@@ -0,0 +1,18 @@
+from __future__ import annotations
+from datetime import datetime
+import base64, uuid
+from ...domain.orders.ports import OrderKey
+
+def encode_cursor(key: OrderKey) -> str:
+    created_at, order_id = key
+    raw = f"{created_at.isoformat()}|{order_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> OrderKey:
+    """Raises ``ValueError`` for anything :func:`encode_cursor` didn't produce."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, order_id = raw.split("|")
+        return datetime.fromisoformat(created_at), uuid.UUID(order_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
@@ -0,0 +1,26 @@
+from __future__ import annotations
+from typing import Optional
+
+def etag_for(version: int) -> str:
+    return f'"{version}"'
+
+def _tags(header: str) -> list[str]:
+    return [t.strip().removeprefix("W/") for t in header.split(",") if t.strip()]
+
+def matches(header: Optional[str], version: int) -> bool:
+    """True if an ``If-None-Match``/``If-Match`` header names this version."""
+    if not header:
+        return False
+    tags = _tags(header)
+    return "*" in tags or etag_for(version) in tags
+
+def expected_version(if_match: Optional[str]) -> Optional[int]:
+    """Version demanded by an ``If-Match`` header; ``None`` means unconditional."""
+    if not if_match or if_match.strip() == "*":
+        return None
+    tag = _tags(if_match)[0].strip('"')
+    try:
+        return int(tag)
+    except ValueError:
+        # An ETag we never issued can't match any version.
+        return -1
@@ -1,20 +1,138 @@
 from __future__ import annotations
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Header, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
-import uuid
+from typing import List, Literal, Optional
+import atexit, uuid, os
 from ...domain.entities import Customer
+from ...domain.ids import use_id_generator
 from ...domain.services.discounts import DiscountService
 from ..persistence.in_memory_order_repository import InMemoryOrderRepository
+from ..persistence.in_memory_customer_repository import InMemoryCustomerRepository
+from ..persistence.file_customer_repository import FileCustomerRepository
+from ..persistence.socket_order_repository import SocketOrderRepository
+from ..persistence.durable_order_repository import DurableInMemoryOrderRepository
+from ..persistence.sqlite_order_repository import SqliteOrderRepository
+from ..persistence.tiered_order_repository import TieredOrderRepository
+from ..persistence.sharded_order_repository import ShardedOrderRepository
+from ..persistence.order_archive import OrderArchive
+from ..persistence.file_order_repository import _order_to_dict
 from ...application.use_cases import CheckoutService
+from ..persistence.cached_product_catalog import catalog_from_env
+from ..persistence.in_memory_inventory import InMemoryInventory
+from ..persistence.sqlite_inventory import SqliteInventory
+from ...domain.services.inventory import InventoryService
+from ...domain.inventory.ports import InsufficientStockError
+from ...application.projections import OrderSummary, OrderSummaryProjection, OrderSummaryStorePort
+from ..persistence.in_memory_summary_store import InMemoryOrderSummaryStore
+from ..persistence.sqlite_summary_store import SqliteOrderSummaryStore
+from ..persistence.repository_summary_store import RepositorySummaryStore
+from ...domain.orders.ports import ConcurrencyError, OrderFilter
+from ...domain.value_objects import ProductId
+from ...domain.customers.ports import DuplicateEmailError
+from .etag import etag_for, matches, expected_version
+from .cursors import encode_cursor, decode_cursor
+from .serializers import dumps, order_view_bytes, summary_view, totals_view
+from .sse import event_stream
+from ..messaging.in_process_bus import InProcessEventBus
+from .metrics import install_metrics
+from .admission import install_admission_control
+from .profiling import install_profiling
+from ..observability.metrics import registry_from_env
+from ..observability.instrumented import instrument_repository, instrument_checkout
 
 app = FastAPI(title="HexShop API (in-memory)")
+# uuid7 makes new order and customer ids time-ordered; stored uuid4 ids keep working
+use_id_generator(os.environ.get("HEXSHOP_ID_SCHEME", "uuid4"))
 
-repo = InMemoryOrderRepository()
-discounts = DiscountService()
-checkout = CheckoutService(repo, discounts)
+# profiling swaps the route class, so it goes before any route is declared
+profiles = install_profiling(app)
+metrics = registry_from_env()
+# admission goes in first so the latency middleware wraps it and sees queueing time
+install_admission_control(app, metrics)
+install_metrics(app, metrics)
+
+# With ORDER_STORE_SOCKET set, every worker talks to one shared store process
+# (see `make store`); otherwise each process owns a private in-memory store, kept
+# across restarts by snapshots and a write-ahead log when ORDER_DATA_DIR is set.
+# ORDER_DB instead keeps every order in SQLite with only the hot ones in memory.
+# HEXSHOP_OPEN_ORDER_TTL (cart expiry) needs the private in-memory store, sharded or not.
+_STORES = ("ORDER_STORE_SOCKET", "ORDER_DATA_DIR", "ORDER_DB")
+if os.environ.get("HEXSHOP_OPEN_ORDER_TTL") and any(os.environ.get(k) for k in _STORES):
+    raise RuntimeError(f"HEXSHOP_OPEN_ORDER_TTL only works with the in-memory order store; unset {', '.join(_STORES)}")
+if os.environ.get("ORDER_STORE_SOCKET"):
+    repo = instrument_repository(SocketOrderRepository(os.environ["ORDER_STORE_SOCKET"]), metrics)
+elif os.environ.get("ORDER_DATA_DIR"):
+    durable = DurableInMemoryOrderRepository(
+        os.environ["ORDER_DATA_DIR"], snapshot_interval=float(os.environ.get("HEXSHOP_SNAPSHOT_INTERVAL", "60")))
+    atexit.register(durable.close)
+    repo = instrument_repository(durable, metrics)
+elif os.environ.get("ORDER_DB"):
+    repo = instrument_repository(TieredOrderRepository(
+        SqliteOrderRepository(os.environ["ORDER_DB"]),
+        max_orders=int(os.environ.get("HEXSHOP_HOT_ORDERS", "10000")),
+        max_bytes=int(os.environ["HEXSHOP_HOT_BYTES"]) if os.environ.get("HEXSHOP_HOT_BYTES") else None,
+        metrics=metrics), metrics)
+else:
+    # open carts idle for HEXSHOP_OPEN_ORDER_TTL seconds are dropped, and archived if
+    # HEXSHOP_EXPIRED_ARCHIVE is set; the stock they held goes back
+    expired_archive = OrderArchive(os.environ["HEXSHOP_EXPIRED_ARCHIVE"]) if os.environ.get("HEXSHOP_EXPIRED_ARCHIVE") else None
 
-# In-memory customer store for demo
-CUSTOMERS: dict[str, Customer] = {}
+    def _on_expire(orders):
+        if expired_archive is not None:
+            expired_archive.append(_order_to_dict(o) for o in orders)
+        if projection is not None:
+            projection.forget(orders)
+        if inventory is not None:
+            for o in orders:
+                inventory.cancel(o.id)
+
+    def _memory_store() -> InMemoryOrderRepository:
+        if not os.environ.get("HEXSHOP_OPEN_ORDER_TTL"):
+            return InMemoryOrderRepository()
+        return InMemoryOrderRepository(
+            open_ttl=float(os.environ["HEXSHOP_OPEN_ORDER_TTL"]), on_expire=_on_expire,
+            expiry_tick=float(os.environ.get("HEXSHOP_EXPIRY_TICK", "1")))
+    if int(os.environ.get("HEXSHOP_ORDER_SHARDS", "1")) > 1:
+        # one lock and one set of indexes per shard instead of one for every order
+        repo = instrument_repository(ShardedOrderRepository(
+            [_memory_store() for _ in range(int(os.environ["HEXSHOP_ORDER_SHARDS"]))]), metrics)
+    else:
+        repo = instrument_repository(_memory_store(), metrics)
+# Listings, order summaries and the dashboard read denormalized summaries kept up to date
+# on every commit. SUMMARY_DB shares them between worker processes (set it whenever workers
+# share a store). A fresh private in-memory store starts empty, so its summaries can start
+# empty too. Any other store is read directly, so that no worker serves a stale copy and
+# startup loads nothing.
+projection: Optional[OrderSummaryProjection] = None
+if os.environ.get("SUMMARY_DB"):
+    projection = OrderSummaryProjection(SqliteOrderSummaryStore(os.environ["SUMMARY_DB"]))
+    summaries: OrderSummaryStorePort = projection.store
+elif not any(os.environ.get(k) for k in _STORES):
+    projection = OrderSummaryProjection(InMemoryOrderSummaryStore())
+    summaries = projection.store
+else:
+    summaries = RepositorySummaryStore(repo)
+discounts = DiscountService()
+events = InProcessEventBus()
+# With CATALOG_DB or CATALOG_FILE set, prices come from the product catalog (behind a TTL/LRU
+# cache) and any unit_price_pence a client sends is ignored.
+catalog = catalog_from_env(metrics)
+# Stock reservations: INVENTORY_DB shares stock between worker processes through SQLite;
+# HEXSHOP_INVENTORY=memory keeps it in this process, in HEXSHOP_INVENTORY_SHARDS shards per product.
+if os.environ.get("INVENTORY_DB"):
+    inventory: Optional[InventoryService] = InventoryService(SqliteInventory(os.environ["INVENTORY_DB"]))
+elif os.environ.get("HEXSHOP_INVENTORY") == "memory":
+    inventory = InventoryService(InMemoryInventory(int(os.environ.get("HEXSHOP_INVENTORY_SHARDS", "8"))))
+else:
+    inventory = None
+checkout = instrument_checkout(CheckoutService(repo, discounts, events, projection, catalog, inventory), metrics)
+SSE_BUFFER = int(os.environ.get("HEXSHOP_SSE_BUFFER", "100"))
+SSE_POLICY = os.environ.get("HEXSHOP_SSE_POLICY", "drop_oldest")
+if os.environ.get("CUSTOMERS_FILE"):
+    customers = FileCustomerRepository(os.environ["CUSTOMERS_FILE"])
+else:
+    customers = InMemoryCustomerRepository()
 
 class CustomerCreate(BaseModel):
     name: str
@@ -23,38 +141,188 @@ class CustomerCreate(BaseModel):
 class OrderStart(BaseModel):
     customer_id: str
     product_id: str
-    unit_price_pence: int
+    unit_price_pence: Optional[int] = None
     quantity: int
 
 class AddItem(BaseModel):
     product_id: str
-    unit_price_pence: int
+    unit_price_pence: Optional[int] = None
+    quantity: int
+
+class AddItems(BaseModel):
+    items: List[AddItem]
+
+class Restock(BaseModel):
     quantity: int
 
 @app.post("/customers")
 def create_customer(payload: CustomerCreate):
-    c = Customer.new(payload.name, payload.email)
-    CUSTOMERS[str(c.id)] = c
+    try:
+        c = Customer.new(payload.name, payload.email)
+        customers.save(c)
+    except DuplicateEmailError as e:
+        raise HTTPException(409, str(e))
+    except ValueError as e:
+        raise HTTPException(400, str(e))
     return {"customer_id": str(c.id)}
 
+@app.get("/customers")
+def find_customer(email: str):
+    c = customers.get_by_email(email)
+    if not c:
+        raise HTTPException(404, "customer not found")
+    return {"customer_id": str(c.id), "name": c.name, "email": c.email.value}
+
+def _customer_or_404(customer_id: str) -> Customer:
+    try:
+        c = customers.get(uuid.UUID(customer_id))
+    except ValueError:
+        c = None
+    if not c:
+        raise HTTPException(404, "customer not found")
+    return c
+
+@app.get("/customers/{customer_id}/orders")
+def list_customer_orders(
+    customer_id: str,
+    status: Optional[Literal["open", "submitted"]] = None,
+    min_total_pence: Optional[int] = None,
+    max_total_pence: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+):
+    customer = _customer_or_404(customer_id)
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    page = summaries.list_for_customer(
+        customer.id, OrderFilter(status, min_total_pence, max_total_pence), after=after, limit=limit)
+    return {
+        "orders": [summary_view(s) for s in page.summaries],
+        "next_cursor": encode_cursor(page.next_key) if page.next_key else None,
+    }
+
+@app.get("/products/{product_id}/orders")
+def list_product_orders(
+    product_id: str,
+    status: Optional[Literal["open", "submitted"]] = None,
+    min_total_pence: Optional[int] = None,
+    max_total_pence: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+):
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    page = repo.list_for_product(
+        ProductId(product_id), OrderFilter(status, min_total_pence, max_total_pence), after=after, limit=limit)
+    return {
+        "orders": [summary_view(OrderSummary.of(o)) for o in page.orders],
+        "next_cursor": encode_cursor(page.next_key) if page.next_key else None,
+    }
+
+def _inventory_or_404() -> InventoryService:
+    if inventory is None:
+        raise HTTPException(404, "inventory is not enabled")
+    return inventory
+
+@app.get("/inventory/{product_id}")
+def stock_level(product_id: str):
+    available = _inventory_or_404().inventory.available(ProductId(product_id))
+    if available is None:
+        raise HTTPException(404, "product is not stocked")
+    return {"product_id": product_id, "available": available}
+
+@app.post("/inventory/{product_id}/restock")
+def restock(product_id: str, payload: Restock):
+    stock = _inventory_or_404().inventory
+    try:
+        stock.restock({ProductId(product_id): payload.quantity})
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    return {"product_id": product_id, "available": stock.available(ProductId(product_id))}
+
+@app.get("/dashboard")
+def dashboard():
+    return {status: totals_view(t) for status, t in summaries.dashboard().items()}
+
+@app.get("/customers/{customer_id}/events")
+async def customer_events(customer_id: str, request: Request):
+    customer = await run_in_threadpool(_customer_or_404, customer_id)
+    return event_stream(request, events.subscribe(customer_id=customer.id, maxsize=SSE_BUFFER, policy=SSE_POLICY))
+
 @app.post("/orders")
 def start_order(payload: OrderStart):
-    cid = payload.customer_id
-    if cid not in CUSTOMERS:
-        raise HTTPException(404, "customer not found")
-    order_id = checkout.start_order_with_item(
-        CUSTOMERS[cid], payload.product_id, payload.unit_price_pence, payload.quantity
-    )
+    customer = _customer_or_404(payload.customer_id)
+    try:
+        order_id = checkout.start_order_with_item(
+            customer, payload.product_id, payload.unit_price_pence, payload.quantity
+        )
+    except InsufficientStockError as e:
+        raise HTTPException(409, str(e))
+    except ValueError as e:
+        raise HTTPException(400, str(e))
     return {"order_id": str(order_id)}
 
 @app.post("/orders/{order_id}/items")
-def add_item(order_id: str, payload: AddItem):
+def add_item(order_id: str, payload: AddItem, response: Response, if_match: Optional[str] = Header(None)):
     try:
-        checkout.add_item(uuid.UUID(order_id), payload.product_id, payload.unit_price_pence, payload.quantity)
+        version = checkout.add_item(
+            uuid.UUID(order_id), payload.product_id, payload.unit_price_pence, payload.quantity,
+            expected_version=expected_version(if_match),
+        )
+        response.headers["ETag"] = etag_for(version)
         return {"ok": True}
+    except ConcurrencyError as e:
+        raise HTTPException(412, str(e))
+    except InsufficientStockError as e:
+        raise HTTPException(409, str(e))
     except ValueError as e:
         raise HTTPException(400, str(e))
 
+@app.post("/orders/{order_id}/items/batch")
+def add_items(order_id: str, payload: AddItems, response: Response, if_match: Optional[str] = Header(None)):
+    try:
+        version = checkout.add_items(
+            uuid.UUID(order_id), [(it.product_id, it.unit_price_pence, it.quantity) for it in payload.items],
+            expected_version=expected_version(if_match),
+        )
+        response.headers["ETag"] = etag_for(version)
+        return {"ok": True}
+    except ConcurrencyError as e:
+        raise HTTPException(412, str(e))
+    except InsufficientStockError as e:
+        raise HTTPException(409, str(e))
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+@app.delete("/orders/{order_id}/items/{product_id}")
+def remove_item(order_id: str, product_id: str, response: Response, if_match: Optional[str] = Header(None)):
+    try:
+        version = checkout.remove_item(uuid.UUID(order_id), product_id, expected_version=expected_version(if_match))
+        response.headers["ETag"] = etag_for(version)
+        return {"ok": True}
+    except ConcurrencyError as e:
+        raise HTTPException(412, str(e))
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+@app.get("/orders/{order_id}/events")
+async def order_events(order_id: str, request: Request):
+    oid = uuid.UUID(order_id)
+    if await run_in_threadpool(repo.version_of, oid) is None:
+        raise HTTPException(404, "order not found")
+    return event_stream(request, events.subscribe(order_id=oid, maxsize=SSE_BUFFER, policy=SSE_POLICY))
+
+@app.get("/orders/{order_id}/summary")
+def get_order_summary(order_id: str):
+    s = summaries.get(uuid.UUID(order_id))
+    if not s:
+        raise HTTPException(404, "order not found")
+    return Response(dumps(summary_view(s)), media_type="application/json", headers={"ETag": etag_for(s.version)})
+
 @app.get("/orders/{order_id}/preview")
 def preview(order_id: str, threshold_pence: int = 2000, discount_pct: int = 10):
     try:
@@ -64,25 +332,25 @@ def preview(order_id: str, threshold_pence: int = 2000, discount_pct: int = 10):
         raise HTTPException(404, str(e))
 
 @app.post("/orders/{order_id}/submit")
-def submit(order_id: str):
+def submit(order_id: str, if_match: Optional[str] = Header(None)):
     try:
-        total = checkout.submit(uuid.UUID(order_id))
+        total = checkout.submit(uuid.UUID(order_id), expected_version=expected_version(if_match))
         return {"total_pence": total.amount, "currency": total.currency}
+    except ConcurrencyError as e:
+        raise HTTPException(412, str(e))
     except ValueError as e:
         raise HTTPException(400, str(e))
 
 @app.get("/orders/{order_id}")
-def get_order(order_id: str):
-    o = repo.get(uuid.UUID(order_id))
+def get_order(order_id: str, if_none_match: Optional[str] = Header(None)):
+    oid = uuid.UUID(order_id)
+    if if_none_match:
+        version = repo.version_of(oid)
+        if version is None:
+            raise HTTPException(404, "order not found")
+        if matches(if_none_match, version):
+            return Response(status_code=304, headers={"ETag": etag_for(version)})
+    o = repo.get(oid)
     if not o:
         raise HTTPException(404, "order not found")
-    return {
-        "id": str(o.id),
-        "customer_id": str(o.customer_id),
-        "is_submitted": o.is_submitted(),
-        "items": [
-            {"product_id": it.product_id.value, "unit_price_pence": it.unit_price.amount, "qty": it.quantity}
-            for it in o.items()
-        ],
-        "total_pence": o.total().amount,
-    }
+    return Response(order_view_bytes(o), media_type="application/json", headers={"ETag": etag_for(o.version)})
@@ -1,21 +1,117 @@
 from __future__ import annotations
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Header, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
-import uuid, os
+from typing import List, Literal, Optional
+import atexit, uuid, os
 from ...domain.entities import Customer
+from ...domain.ids import use_id_generator
 from ...domain.services.discounts import DiscountService
 from ..persistence.file_order_repository import FileOrderRepository
+from ..persistence.tiered_order_repository import TieredOrderRepository
+from ..persistence.sharded_order_repository import ShardedOrderRepository
+from ..persistence.file_customer_repository import FileCustomerRepository
+from ..persistence.sqlite_customer_repository import SqliteCustomerRepository
 from ...application.use_cases import CheckoutService
+from ...application.single_flight import SingleFlight
+from ..persistence.cached_product_catalog import catalog_from_env
+from ..persistence.in_memory_inventory import InMemoryInventory
+from ..persistence.sqlite_inventory import SqliteInventory
+from ...domain.services.inventory import InventoryService
+from ...domain.inventory.ports import InsufficientStockError
+from ...application.projections import OrderSummary, OrderSummaryProjection
+from ..persistence.sqlite_summary_store import SqliteOrderSummaryStore
+from ...domain.orders.ports import ConcurrencyError, OrderFilter
+from ...domain.value_objects import ProductId
+from ...domain.customers.ports import DuplicateEmailError
+from .etag import etag_for, matches, expected_version
+from .cursors import encode_cursor, decode_cursor
+from .serializers import dumps, order_view_bytes, summary_view, totals_view
+from .sse import event_stream
+from ..messaging.in_process_bus import InProcessEventBus
+from .metrics import install_metrics
+from .admission import install_admission_control
+from .profiling import install_profiling
+from ..observability.metrics import registry_from_env
+from ..observability.instrumented import instrument_repository, instrument_checkout
 
 app = FastAPI(title="HexShop API (file-backed)")
+# uuid7 makes new order and customer ids time-ordered; stored uuid4 ids keep working
+use_id_generator(os.environ.get("HEXSHOP_ID_SCHEME", "uuid4"))
 
 repo_path = os.environ.get("REPO_FILE", "./orders.json")
-repo = FileOrderRepository(repo_path)
-discounts = DiscountService()
-checkout = CheckoutService(repo, discounts)
+# profiling swaps the route class, so it goes before any route is declared
+profiles = install_profiling(app)
+metrics = registry_from_env()
+# admission goes in first so the latency middleware wraps it and sees queueing time
+install_admission_control(app, metrics)
+install_metrics(app, metrics)
+
+# REPO_WRITE_BEHIND=<seconds>: saves return once in memory and a background writer
+# group-commits them; this process then owns the file, and other writers (a second
+# worker, `bulk import`, `archive`) fail fast instead of being overwritten.
+def _order_file(path: str) -> FileOrderRepository:
+    return FileOrderRepository(
+        path, metrics=metrics,
+        write_behind=float(os.environ.get("REPO_WRITE_BEHIND", "0")),
+        batch_size=int(os.environ.get("REPO_WRITE_BATCH", "500")),
+        max_unflushed=int(os.environ.get("REPO_MAX_UNFLUSHED", "5000")))
 
-# naive in-memory customers (you can swap for a file-backed port similarly)
-CUSTOMERS: dict[str, Customer] = {}
+# REPO_SHARDS=<n> splits orders by customer over n files named after REPO_FILE
+# (orders-0.json, ...); change n with `bulk reshard`, never in place.
+if int(os.environ.get("REPO_SHARDS", "1")) > 1:
+    root, ext = os.path.splitext(repo_path)
+    repo = ShardedOrderRepository([_order_file(f"{root}-{i}{ext}") for i in range(int(os.environ["REPO_SHARDS"]))])
+else:
+    repo = _order_file(repo_path)
+atexit.register(repo.close)
+# HEXSHOP_HOT_ORDERS / HEXSHOP_HOT_BYTES put a bounded in-memory tier in front of the file.
+# The tier never sees other writers' changes, so it needs write-behind's ownership of the file.
+if os.environ.get("HEXSHOP_HOT_ORDERS") or os.environ.get("HEXSHOP_HOT_BYTES"):
+    if float(os.environ.get("REPO_WRITE_BEHIND", "0")) <= 0:
+        raise RuntimeError("HEXSHOP_HOT_ORDERS/HEXSHOP_HOT_BYTES need REPO_WRITE_BEHIND, so no other process writes the file")
+    repo = TieredOrderRepository(
+        repo,
+        max_orders=int(os.environ["HEXSHOP_HOT_ORDERS"]) if os.environ.get("HEXSHOP_HOT_ORDERS") else None,
+        max_bytes=int(os.environ["HEXSHOP_HOT_BYTES"]) if os.environ.get("HEXSHOP_HOT_BYTES") else None,
+        metrics=metrics)
+repo = instrument_repository(repo, metrics)
+# Listings, order summaries and the dashboard read denormalized summaries kept up to date
+# on every commit, in SQLite so every worker shares them: SUMMARY_DB, by default next to
+# REPO_FILE. A new database is filled from the file once, at startup.
+summary_db = os.environ.get("SUMMARY_DB") or f"{repo_path}.summaries.db"
+fresh = not os.path.exists(summary_db)
+projection = OrderSummaryProjection(SqliteOrderSummaryStore(summary_db))
+if fresh:
+    projection.rebuild(repo)
+summaries = projection.store
+discounts = DiscountService()
+events = InProcessEventBus()
+# With CATALOG_DB or CATALOG_FILE set, prices come from the product catalog (behind a TTL/LRU
+# cache) and any unit_price_pence a client sends is ignored.
+catalog = catalog_from_env(metrics)
+# Stock reservations: INVENTORY_DB shares stock between worker processes through SQLite;
+# HEXSHOP_INVENTORY=memory keeps it in this process, in HEXSHOP_INVENTORY_SHARDS shards per product.
+if os.environ.get("INVENTORY_DB"):
+    inventory: Optional[InventoryService] = InventoryService(SqliteInventory(os.environ["INVENTORY_DB"]))
+elif os.environ.get("HEXSHOP_INVENTORY") == "memory":
+    inventory = InventoryService(InMemoryInventory(int(os.environ.get("HEXSHOP_INVENTORY_SHARDS", "8"))))
+else:
+    inventory = None
+# Each read of the file re-parses it, so concurrent GETs and previews of one order share a single
+# read. HEXSHOP_READ_TTL=<seconds> also reuses a finished read for that long (reads may then lag writes).
+coalesced = metrics.counter(
+    "hexshop_coalesced_reads_total", "Order reads served by a read already in flight") if metrics else None
+reads = SingleFlight(
+    ttl=float(os.environ.get("HEXSHOP_READ_TTL", "0")), on_coalesced=coalesced.inc if coalesced else None)
+checkout = instrument_checkout(
+    CheckoutService(repo, discounts, events, projection, catalog, inventory, reads), metrics)
+SSE_BUFFER = int(os.environ.get("HEXSHOP_SSE_BUFFER", "100"))
+SSE_POLICY = os.environ.get("HEXSHOP_SSE_POLICY", "drop_oldest")
+if os.environ.get("CUSTOMERS_DB"):
+    customers = SqliteCustomerRepository(os.environ["CUSTOMERS_DB"])
+else:
+    customers = FileCustomerRepository(os.environ.get("CUSTOMERS_FILE", "./customers.json"))
 
 class CustomerCreate(BaseModel):
     name: str
@@ -24,38 +120,188 @@ class CustomerCreate(BaseModel):
 class OrderStart(BaseModel):
     customer_id: str
     product_id: str
-    unit_price_pence: int
+    unit_price_pence: Optional[int] = None
     quantity: int
 
 class AddItem(BaseModel):
     product_id: str
-    unit_price_pence: int
+    unit_price_pence: Optional[int] = None
+    quantity: int
+
+class AddItems(BaseModel):
+    items: List[AddItem]
+
+class Restock(BaseModel):
     quantity: int
 
 @app.post("/customers")
 def create_customer(payload: CustomerCreate):
-    c = Customer.new(payload.name, payload.email)
-    CUSTOMERS[str(c.id)] = c
+    try:
+        c = Customer.new(payload.name, payload.email)
+        customers.save(c)
+    except DuplicateEmailError as e:
+        raise HTTPException(409, str(e))
+    except ValueError as e:
+        raise HTTPException(400, str(e))
     return {"customer_id": str(c.id)}
 
+@app.get("/customers")
+def find_customer(email: str):
+    c = customers.get_by_email(email)
+    if not c:
+        raise HTTPException(404, "customer not found")
+    return {"customer_id": str(c.id), "name": c.name, "email": c.email.value}
+
+def _customer_or_404(customer_id: str) -> Customer:
+    try:
+        c = customers.get(uuid.UUID(customer_id))
+    except ValueError:
+        c = None
+    if not c:
+        raise HTTPException(404, "customer not found")
+    return c
+
+@app.get("/customers/{customer_id}/orders")
+def list_customer_orders(
+    customer_id: str,
+    status: Optional[Literal["open", "submitted"]] = None,
+    min_total_pence: Optional[int] = None,
+    max_total_pence: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+):
+    customer = _customer_or_404(customer_id)
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    page = summaries.list_for_customer(
+        customer.id, OrderFilter(status, min_total_pence, max_total_pence), after=after, limit=limit)
+    return {
+        "orders": [summary_view(s) for s in page.summaries],
+        "next_cursor": encode_cursor(page.next_key) if page.next_key else None,
+    }
+
+@app.get("/products/{product_id}/orders")
+def list_product_orders(
+    product_id: str,
+    status: Optional[Literal["open", "submitted"]] = None,
+    min_total_pence: Optional[int] = None,
+    max_total_pence: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+):
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    page = repo.list_for_product(
+        ProductId(product_id), OrderFilter(status, min_total_pence, max_total_pence), after=after, limit=limit)
+    return {
+        "orders": [summary_view(OrderSummary.of(o)) for o in page.orders],
+        "next_cursor": encode_cursor(page.next_key) if page.next_key else None,
+    }
+
+def _inventory_or_404() -> InventoryService:
+    if inventory is None:
+        raise HTTPException(404, "inventory is not enabled")
+    return inventory
+
+@app.get("/inventory/{product_id}")
+def stock_level(product_id: str):
+    available = _inventory_or_404().inventory.available(ProductId(product_id))
+    if available is None:
+        raise HTTPException(404, "product is not stocked")
+    return {"product_id": product_id, "available": available}
+
+@app.post("/inventory/{product_id}/restock")
+def restock(product_id: str, payload: Restock):
+    stock = _inventory_or_404().inventory
+    try:
+        stock.restock({ProductId(product_id): payload.quantity})
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    return {"product_id": product_id, "available": stock.available(ProductId(product_id))}
+
+@app.get("/dashboard")
+def dashboard():
+    return {status: totals_view(t) for status, t in summaries.dashboard().items()}
+
+@app.get("/customers/{customer_id}/events")
+async def customer_events(customer_id: str, request: Request):
+    customer = await run_in_threadpool(_customer_or_404, customer_id)
+    return event_stream(request, events.subscribe(customer_id=customer.id, maxsize=SSE_BUFFER, policy=SSE_POLICY))
+
 @app.post("/orders")
 def start_order(payload: OrderStart):
-    cid = payload.customer_id
-    if cid not in CUSTOMERS:
-        raise HTTPException(404, "customer not found")
-    order_id = checkout.start_order_with_item(
-        CUSTOMERS[cid], payload.product_id, payload.unit_price_pence, payload.quantity
-    )
+    customer = _customer_or_404(payload.customer_id)
+    try:
+        order_id = checkout.start_order_with_item(
+            customer, payload.product_id, payload.unit_price_pence, payload.quantity
+        )
+    except InsufficientStockError as e:
+        raise HTTPException(409, str(e))
+    except ValueError as e:
+        raise HTTPException(400, str(e))
     return {"order_id": str(order_id)}
 
 @app.post("/orders/{order_id}/items")
-def add_item(order_id: str, payload: AddItem):
+def add_item(order_id: str, payload: AddItem, response: Response, if_match: Optional[str] = Header(None)):
     try:
-        checkout.add_item(uuid.UUID(order_id), payload.product_id, payload.unit_price_pence, payload.quantity)
+        version = checkout.add_item(
+            uuid.UUID(order_id), payload.product_id, payload.unit_price_pence, payload.quantity,
+            expected_version=expected_version(if_match),
+        )
+        response.headers["ETag"] = etag_for(version)
         return {"ok": True}
+    except ConcurrencyError as e:
+        raise HTTPException(412, str(e))
+    except InsufficientStockError as e:
+        raise HTTPException(409, str(e))
     except ValueError as e:
         raise HTTPException(400, str(e))
 
+@app.post("/orders/{order_id}/items/batch")
+def add_items(order_id: str, payload: AddItems, response: Response, if_match: Optional[str] = Header(None)):
+    try:
+        version = checkout.add_items(
+            uuid.UUID(order_id), [(it.product_id, it.unit_price_pence, it.quantity) for it in payload.items],
+            expected_version=expected_version(if_match),
+        )
+        response.headers["ETag"] = etag_for(version)
+        return {"ok": True}
+    except ConcurrencyError as e:
+        raise HTTPException(412, str(e))
+    except InsufficientStockError as e:
+        raise HTTPException(409, str(e))
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+@app.delete("/orders/{order_id}/items/{product_id}")
+def remove_item(order_id: str, product_id: str, response: Response, if_match: Optional[str] = Header(None)):
+    try:
+        version = checkout.remove_item(uuid.UUID(order_id), product_id, expected_version=expected_version(if_match))
+        response.headers["ETag"] = etag_for(version)
+        return {"ok": True}
+    except ConcurrencyError as e:
+        raise HTTPException(412, str(e))
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+@app.get("/orders/{order_id}/events")
+async def order_events(order_id: str, request: Request):
+    oid = uuid.UUID(order_id)
+    if await run_in_threadpool(repo.version_of, oid) is None:
+        raise HTTPException(404, "order not found")
+    return event_stream(request, events.subscribe(order_id=oid, maxsize=SSE_BUFFER, policy=SSE_POLICY))
+
+@app.get("/orders/{order_id}/summary")
+def get_order_summary(order_id: str):
+    s = summaries.get(uuid.UUID(order_id))
+    if not s:
+        raise HTTPException(404, "order not found")
+    return Response(dumps(summary_view(s)), media_type="application/json", headers={"ETag": etag_for(s.version)})
+
 @app.get("/orders/{order_id}/preview")
 def preview(order_id: str, threshold_pence: int = 2000, discount_pct: int = 10):
     try:
@@ -65,25 +311,25 @@ def preview(order_id: str, threshold_pence: int = 2000, discount_pct: int = 10):
         raise HTTPException(404, str(e))
 
 @app.post("/orders/{order_id}/submit")
-def submit(order_id: str):
+def submit(order_id: str, if_match: Optional[str] = Header(None)):
     try:
-        total = checkout.submit(uuid.UUID(order_id))
+        total = checkout.submit(uuid.UUID(order_id), expected_version=expected_version(if_match))
         return {"total_pence": total.amount, "currency": total.currency}
+    except ConcurrencyError as e:
+        raise HTTPException(412, str(e))
     except ValueError as e:
         raise HTTPException(400, str(e))
 
 @app.get("/orders/{order_id}")
-def get_order(order_id: str):
-    o = repo.get(uuid.UUID(order_id))
+def get_order(order_id: str, if_none_match: Optional[str] = Header(None)):
+    oid = uuid.UUID(order_id)
+    if if_none_match:
+        version = checkout.order_version(oid)
+        if version is None:
+            raise HTTPException(404, "order not found")
+        if matches(if_none_match, version):
+            return Response(status_code=304, headers={"ETag": etag_for(version)})
+    o = checkout.read_order(oid)
     if not o:
         raise HTTPException(404, "order not found")
-    return {
-        "id": str(o.id),
-        "customer_id": str(o.customer_id),
-        "is_submitted": o.is_submitted(),
-        "items": [
-            {"product_id": it.product_id.value, "unit_price_pence": it.unit_price.amount, "qty": it.quantity}
-            for it in o.items()
-        ],
-        "total_pence": o.total().amount,
-    }
+    return Response(order_view_bytes(o), media_type="application/json", headers={"ETag": etag_for(o.version)})
@@ -0,0 +1,44 @@
+from __future__ import annotations
+from typing import Optional
+import time
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from ..observability.metrics import Registry
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+class RequestLatencyMiddleware:
+    """ASGI middleware recording latency per route template (not raw path, to bound label cardinality)."""
+    def __init__(self, app, registry: Registry):
+        self.app = app
+        self._seconds = registry.histogram(
+            "hexshop_http_request_seconds", "HTTP request latency by route", ["method", "route", "status"])
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = getattr(scope.get("route"), "path", "unmatched")
+            self._seconds.observe(
+                time.perf_counter() - start, method=scope["method"], route=route, status=str(status["code"]))
+
+def install_metrics(app: FastAPI, registry: Optional[Registry]) -> None:
+    """Adds latency middleware and ``GET /metrics``; does nothing when metrics are disabled."""
+    if registry is None:
+        return
+    app.add_middleware(RequestLatencyMiddleware, registry=registry)
+
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        return PlainTextResponse(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
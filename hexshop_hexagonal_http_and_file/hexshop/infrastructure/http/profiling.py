@@ -0,0 +1,200 @@
+from __future__ import annotations
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Deque, List, Optional
+import cProfile, functools, inspect, io, itertools, os, pstats, random, threading, time, tracemalloc
+from fastapi import FastAPI, HTTPException, Header
+from fastapi.routing import APIRoute
+
+PROFILE_HEADER = "x-profile"
+TOKEN_HEADER = "x-profile-token"
+TOP_FUNCTIONS = 40
+TOP_ALLOCATIONS = 25
+
+@dataclass
+class CapturedProfile:
+    id: int
+    method: str
+    path: str
+    modes: frozenset
+    started_at: datetime
+    duration_ms: float = 0.0
+    status: int = 0
+    cpu: Optional[str] = None
+    allocations: List[dict] = field(default_factory=list)
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id, "method": self.method, "path": self.path, "modes": sorted(self.modes),
+            "started_at": self.started_at.isoformat(), "duration_ms": round(self.duration_ms, 3), "status": self.status,
+        }
+
+# Set by the middleware for requests that should be profiled; the route wrapper
+# below runs in the endpoint's own thread (FastAPI copies the context into its
+# threadpool), which is where cProfile has to be enabled to see the work.
+_current: ContextVar[Optional[CapturedProfile]] = ContextVar("hexshop_profile", default=None)
+
+# tracemalloc is process-wide, so only one request traces allocations at a time.
+_tracemalloc_lock = threading.Lock()
+
+def _run_profiled(capture: CapturedProfile, fn, args, kwargs):
+    profiler = cProfile.Profile() if "cpu" in capture.modes else None
+    tracing = "alloc" in capture.modes and _tracemalloc_lock.acquire(blocking=False)
+    started_tracing = False
+    try:
+        if tracing and not tracemalloc.is_tracing():
+            tracemalloc.start(10)
+            started_tracing = True
+        if tracing:
+            tracemalloc.clear_traces()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            # snapshot before formatting the CPU stats so that work doesn't show up as allocations
+            if tracing:
+                snapshot = tracemalloc.take_snapshot().filter_traces(
+                    tuple(tracemalloc.Filter(False, f) for f in (tracemalloc.__file__, cProfile.__file__, __file__)))
+                capture.allocations = [
+                    {"where": str(stat.traceback[0]), "size_kib": round(stat.size / 1024, 1), "count": stat.count}
+                    for stat in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]
+                ]
+            if profiler is not None:
+                out = io.StringIO()
+                pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+                capture.cpu = out.getvalue()
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+        if tracing:
+            _tracemalloc_lock.release()
+
+class ProfilingRoute(APIRoute):
+    """Route whose (sync) endpoint runs under cProfile/tracemalloc when the request was picked for profiling."""
+    def __init__(self, path: str, endpoint, **kwargs):
+        if not inspect.iscoroutinefunction(endpoint):
+            original = endpoint
+
+            @functools.wraps(original)
+            def endpoint(*args, **kw):
+                capture = _current.get()
+                if capture is None:
+                    return original(*args, **kw)
+                return _run_profiled(capture, original, args, kw)
+        super().__init__(path, endpoint, **kwargs)
+
+class ProfileStore:
+    """Bounded ring buffer of captured profiles; the oldest fall off."""
+    def __init__(self, capacity: int):
+        self._items: Deque[CapturedProfile] = deque(maxlen=capacity)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def new_capture(self, method: str, path: str, modes: frozenset) -> CapturedProfile:
+        return CapturedProfile(next(self._ids), method, path, modes, datetime.now(timezone.utc))
+
+    def add(self, capture: CapturedProfile) -> None:
+        with self._lock:
+            self._items.append(capture)
+
+    def list(self) -> List[CapturedProfile]:
+        with self._lock:
+            return list(self._items)
+
+    def get(self, profile_id: int) -> Optional[CapturedProfile]:
+        with self._lock:
+            return next((p for p in self._items if p.id == profile_id), None)
+
+def _parse_modes(value: str) -> frozenset:
+    modes = frozenset(m.strip() for m in value.lower().split(",")) & {"cpu", "alloc"}
+    return modes or frozenset({"cpu"})
+
+class ProfilingMiddleware:
+    """Picks requests to profile (``X-Profile`` header or random sampling) and files the results."""
+    def __init__(self, app, store: ProfileStore, sample_rate: float = 0.0, sample_modes: frozenset = frozenset({"cpu"}),
+                 allow_header: bool = True, token: Optional[str] = None):
+        self.app = app
+        self.store = store
+        self.sample_rate = sample_rate
+        self.sample_modes = sample_modes
+        self.allow_header = allow_header
+        self.token = token
+
+    def _modes_for(self, scope) -> Optional[frozenset]:
+        if self.allow_header:
+            headers = dict(scope["headers"])
+            requested = headers.get(PROFILE_HEADER.encode())
+            if requested is not None and (self.token is None or headers.get(TOKEN_HEADER.encode()) == self.token.encode()):
+                return _parse_modes(requested.decode())
+        if self.sample_rate and random.random() < self.sample_rate:
+            return self.sample_modes
+        return None
+
+    async def __call__(self, scope, receive, send):
+        modes = self._modes_for(scope) if scope["type"] == "http" else None
+        if modes is None:
+            await self.app(scope, receive, send)
+            return
+        capture = self.store.new_capture(scope["method"], scope["path"], modes)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                capture.status = message["status"]
+                message["headers"] = [*message.get("headers", []), (b"x-profile-id", str(capture.id).encode())]
+            await send(message)
+
+        token = _current.set(capture)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            capture.duration_ms = (time.perf_counter() - start) * 1e3
+            _current.reset(token)
+            self.store.add(capture)
+
+def install_profiling(app: FastAPI) -> Optional[ProfileStore]:
+    """Enables profiling hooks from the environment; must run before any route is declared.
+
+    ``HEXSHOP_PROFILING=1`` honours the ``X-Profile: cpu|alloc|cpu,alloc`` request
+    header, ``HEXSHOP_PROFILE_SAMPLE_RATE`` profiles that fraction of all requests
+    (``HEXSHOP_PROFILE_MODES`` picks what is captured, default ``cpu``), and
+    ``HEXSHOP_PROFILE_TOKEN`` if set must accompany the header (as
+    ``X-Profile-Token``) and admin calls. ``HEXSHOP_PROFILE_BUFFER`` bounds how many
+    profiles are kept. With none of these set, nothing is installed.
+    """
+    allow_header = os.environ.get("HEXSHOP_PROFILING", "").lower() in ("1", "true", "yes", "on")
+    sample_rate = float(os.environ.get("HEXSHOP_PROFILE_SAMPLE_RATE") or 0)
+    if not allow_header and sample_rate <= 0:
+        return None
+    token = os.environ.get("HEXSHOP_PROFILE_TOKEN") or None
+    store = ProfileStore(int(os.environ.get("HEXSHOP_PROFILE_BUFFER", "50")))
+    app.router.route_class = ProfilingRoute
+    app.add_middleware(
+        ProfilingMiddleware, store=store, sample_rate=sample_rate,
+        sample_modes=_parse_modes(os.environ.get("HEXSHOP_PROFILE_MODES", "cpu")),
+        allow_header=allow_header, token=token,
+    )
+
+    def check_token(given: Optional[str]) -> None:
+        if token is not None and given != token:
+            raise HTTPException(403, "profile token required")
+
+    @app.get("/admin/profiles", include_in_schema=False)
+    def list_profiles(x_profile_token: Optional[str] = Header(None)):
+        check_token(x_profile_token)
+        return [p.summary() for p in reversed(store.list())]
+
+    @app.get("/admin/profiles/{profile_id}", include_in_schema=False)
+    def get_profile(profile_id: int, x_profile_token: Optional[str] = Header(None)):
+        check_token(x_profile_token)
+        p = store.get(profile_id)
+        if p is None:
+            raise HTTPException(404, "profile not found (it may have been evicted)")
+        return {**p.summary(), "cpu": p.cpu, "allocations": p.allocations}
+
+    return store
@@ -0,0 +1,68 @@
+from __future__ import annotations
+from typing import Any
+import json
+from ...domain.orders.models import Order
+from ...application.projections import OrderSummary, StatusTotals
+from ...domain.orders.events import OrderEvent, ItemAdded, ItemRemoved, OrderSubmitted
+from ...domain.value_objects import Money, ensure_same_currency
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+_ZERO = Money(0, "GBP")
+
+# Built once; json.dumps would construct an encoder for every call with non-default options.
+_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+def dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return _encoder.encode(obj).encode()
+
+def order_view(o: Order) -> dict:
+    """The ``GET /orders/{id}`` body, built in one pass over the lines."""
+    items = []
+    total = 0
+    for it in o.iter_items():
+        price = it.unit_price
+        ensure_same_currency(_ZERO, price)  # same rule as Order.total()
+        total += price.amount * it.quantity
+        items.append({"product_id": it.product_id.value, "unit_price_pence": price.amount, "qty": it.quantity})
+    return {
+        "id": str(o.id),
+        "customer_id": str(o.customer_id),
+        "is_submitted": o.is_submitted(),
+        "items": items,
+        "total_pence": total,
+    }
+
+def order_view_bytes(o: Order) -> bytes:
+    return dumps(order_view(o))
+
+def summary_view(s: OrderSummary) -> dict:
+    return {
+        "id": str(s.id),
+        "customer_id": str(s.customer_id),
+        "created_at": s.created_at.isoformat(),
+        "updated_at": s.updated_at.isoformat(),
+        "is_submitted": s.is_submitted,
+        "item_count": s.line_count,
+        "total_pence": s.total_pence,
+    }
+
+def totals_view(t: StatusTotals) -> dict:
+    return {"orders": t.orders, "lines": t.lines, "total_pence": t.total_pence}
+
+EVENT_NAMES = {ItemAdded: "item_added", ItemRemoved: "item_removed", OrderSubmitted: "order_submitted"}
+
+def event_view(e: OrderEvent) -> dict:
+    body = {"order_id": str(e.order_id), "customer_id": str(e.customer_id), "occurred_at": e.occurred_at.isoformat()}
+    if isinstance(e, ItemAdded):
+        body.update(product_id=e.product_id.value, unit_price_pence=e.unit_price.amount, qty=e.quantity)
+    elif isinstance(e, ItemRemoved):
+        body.update(product_id=e.product_id.value)
+    elif isinstance(e, OrderSubmitted):
+        body.update(total_pence=e.total.amount)
+    return body
@@ -0,0 +1,31 @@
+from __future__ import annotations
+from typing import AsyncIterator
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from ..messaging.in_process_bus import Subscription
+from .serializers import EVENT_NAMES, dumps, event_view
+
+KEEPALIVE_SECONDS = 15.0
+
+async def _frames(request: Request, sub: Subscription) -> AsyncIterator[bytes]:
+    try:
+        yield b"retry: 2000\n\n"
+        while True:
+            event = await sub.next(timeout=KEEPALIVE_SECONDS)
+            if await request.is_disconnected():
+                return
+            if event is None:
+                if sub.closed:
+                    # overflowed under the disconnect policy: let the client reconnect and re-read
+                    return
+                yield b": keepalive\n\n"
+                continue
+            yield b"event: " + EVENT_NAMES[type(event)].encode() + b"\ndata: " + dumps(event_view(event)) + b"\n\n"
+    finally:
+        sub.close()
+
+def event_stream(request: Request, sub: Subscription) -> StreamingResponse:
+    return StreamingResponse(
+        _frames(request, sub), media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
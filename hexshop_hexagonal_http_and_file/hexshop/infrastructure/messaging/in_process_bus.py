@@ -0,0 +1,108 @@
+from __future__ import annotations
+from collections import deque
+from typing import Deque, Dict, Hashable, List, Literal, Optional, Sequence, Set
+import asyncio, threading, uuid
+from ...domain.orders.events import OrderEvent
+from ...domain.orders.ports import EventPublisherPort
+
+DropPolicy = Literal["drop_oldest", "disconnect"]
+
+class Subscription:
+    """A bounded buffer of events for one consumer.
+
+    ``offer`` may be called from any thread; ``next`` is awaited on the event
+    loop the subscription was created on. When the buffer is full the policy
+    either discards the oldest event (counted in ``dropped``) or closes the
+    subscription so the consumer can reconnect and re-read current state.
+    """
+    def __init__(self, bus: "InProcessEventBus", topics: Sequence[Hashable], maxsize: int, policy: DropPolicy):
+        if maxsize <= 0:
+            raise ValueError("Subscription buffer must hold at least one event")
+        self._bus = bus
+        self.topics = tuple(topics)
+        self.maxsize = maxsize
+        self.policy = policy
+        self.dropped = 0
+        self.closed = False
+        self._buffer: Deque[OrderEvent] = deque()
+        self._lock = threading.Lock()
+        self._loop = asyncio.get_running_loop()
+        self._ready = asyncio.Event()
+
+    def offer(self, event: OrderEvent) -> None:
+        with self._lock:
+            if self.closed:
+                return
+            if len(self._buffer) >= self.maxsize:
+                if self.policy == "disconnect":
+                    self.closed = True
+                else:
+                    self._buffer.popleft()
+                    self.dropped += 1
+            if not self.closed:
+                self._buffer.append(event)
+        self._wake()
+
+    async def next(self, timeout: Optional[float] = None) -> Optional[OrderEvent]:
+        """The next event, or ``None`` on timeout or once closed and drained."""
+        while True:
+            with self._lock:
+                if self._buffer:
+                    return self._buffer.popleft()
+                if self.closed:
+                    return None
+                self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+
+    def close(self) -> None:
+        with self._lock:
+            self.closed = True
+        self._bus._unsubscribe(self)
+        self._wake()
+
+    def _wake(self) -> None:
+        try:
+            self._loop.call_soon_threadsafe(self._ready.set)
+        except RuntimeError:
+            pass  # the consumer's loop has shut down
+
+class InProcessEventBus(EventPublisherPort):
+    """Fans order events out to subscribers of the order or of its customer, within one process."""
+    def __init__(self):
+        self._subscribers: Dict[Hashable, Set[Subscription]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(
+        self, order_id: Optional[uuid.UUID] = None, customer_id: Optional[uuid.UUID] = None,
+        maxsize: int = 100, policy: DropPolicy = "drop_oldest",
+    ) -> Subscription:
+        topics: List[Hashable] = []
+        if order_id is not None:
+            topics.append(("order", order_id))
+        if customer_id is not None:
+            topics.append(("customer", customer_id))
+        sub = Subscription(self, topics, maxsize, policy)
+        with self._lock:
+            for t in topics:
+                self._subscribers.setdefault(t, set()).add(sub)
+        return sub
+
+    def _unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            for t in sub.topics:
+                subs = self._subscribers.get(t)
+                if subs is not None:
+                    subs.discard(sub)
+                    if not subs:
+                        del self._subscribers[t]
+
+    def publish(self, events: Sequence[OrderEvent]) -> None:
+        for event in events:
+            with self._lock:
+                targets = self._subscribers.get(("order", event.order_id), set()) | \
+                    self._subscribers.get(("customer", event.customer_id), set())
+            for sub in targets:
+                sub.offer(event)
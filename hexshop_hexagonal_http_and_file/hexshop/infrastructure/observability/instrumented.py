@@ -0,0 +1,104 @@
+from __future__ import annotations
+from datetime import datetime
+from typing import Callable, Iterable, Iterator, List, Optional, TypeVar
+import functools, inspect, time, uuid
+from ...domain.orders.models import Order
+from ...domain.orders.ports import OrderRepositoryPort, OrderFilter, OrderKey, OrderPage
+from ...domain.value_objects import ProductId
+from ...application.use_cases import CheckoutService
+from .metrics import Registry, Histogram, Counter
+
+T = TypeVar("T")
+
+def _timed(hist: Histogram, errors: Counter, label: str, value: str, fn: Callable[..., T]) -> Callable[..., T]:
+    labels = {label: value}
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        except Exception:
+            errors.inc(**labels)
+            raise
+        finally:
+            hist.observe(time.perf_counter() - start, **labels)
+    return wrapper
+
+class InstrumentedOrderRepository(OrderRepositoryPort):
+    """Times every port call on the wrapped repository."""
+    METHODS = ("save", "save_many", "get", "by_customer", "iter_all", "version_of",
+               "list_for_customer", "list_for_product", "list_created_between")
+
+    def __init__(self, inner: OrderRepositoryPort, registry: Registry):
+        self.inner = inner
+        seconds = registry.histogram(
+            "hexshop_repository_call_seconds", "Order repository call latency", ["method"])
+        errors = registry.counter(
+            "hexshop_repository_call_errors_total", "Order repository calls that raised", ["method"])
+        self._calls = {m: _timed(seconds, errors, "method", m, getattr(inner, m)) for m in self.METHODS}
+
+    def _call(self, method: str, *args):
+        return self._calls[method](*args)
+
+    def save(self, order: Order) -> None:
+        self._call("save", order)
+
+    def save_many(self, orders: Iterable[Order]) -> None:
+        self._call("save_many", orders)
+
+    def get(self, order_id: uuid.UUID) -> Optional[Order]:
+        return self._call("get", order_id)
+
+    def iter_all(self) -> Iterator[Order]:
+        # times producing the iterator, not consuming it
+        return self._call("iter_all")
+
+    def by_customer(self, customer_id: uuid.UUID) -> List[Order]:
+        return self._call("by_customer", customer_id)
+
+    def version_of(self, order_id: uuid.UUID) -> Optional[int]:
+        return self._call("version_of", order_id)
+
+    def list_for_customer(
+        self, customer_id: uuid.UUID, filter: OrderFilter = OrderFilter(),
+        after: Optional[OrderKey] = None, limit: int = 50,
+    ) -> OrderPage:
+        return self._call("list_for_customer", customer_id, filter, after, limit)
+
+    def list_for_product(
+        self, product_id: ProductId, filter: OrderFilter = OrderFilter(),
+        after: Optional[OrderKey] = None, limit: int = 50,
+    ) -> OrderPage:
+        return self._call("list_for_product", product_id, filter, after, limit)
+
+    def list_created_between(
+        self, start: datetime, end: datetime, filter: OrderFilter = OrderFilter(),
+        after: Optional[OrderKey] = None, limit: int = 50,
+    ) -> OrderPage:
+        return self._call("list_created_between", start, end, filter, after, limit)
+
+    def __getattr__(self, name: str):
+        # adapter-specific extras (flush, close, stats, ...) pass straight through
+        return getattr(self.inner, name)
+
+class InstrumentedCheckoutService:
+    """Times each public use case of the wrapped ``CheckoutService``."""
+    def __init__(self, inner: CheckoutService, registry: Registry):
+        self.inner = inner
+        seconds = registry.histogram(
+            "hexshop_use_case_seconds", "Checkout use case latency", ["use_case"])
+        errors = registry.counter(
+            "hexshop_use_case_errors_total", "Checkout use cases that raised", ["use_case"])
+        for name, _ in inspect.getmembers(type(inner), inspect.isfunction):
+            if not name.startswith("_"):
+                setattr(self, name, _timed(seconds, errors, "use_case", name, getattr(inner, name)))
+
+    def __getattr__(self, name: str):
+        return getattr(self.inner, name)
+
+def instrument_repository(repo: OrderRepositoryPort, registry: Optional[Registry]) -> OrderRepositoryPort:
+    return InstrumentedOrderRepository(repo, registry) if registry is not None else repo
+
+def instrument_checkout(service: CheckoutService, registry: Optional[Registry]) -> CheckoutService:
+    return InstrumentedCheckoutService(service, registry) if registry is not None else service  # type: ignore[return-value]
@@ -0,0 +1,83 @@
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+import os, threading, time
+from ...domain.catalog.ports import ProductCatalogPort
+from ...domain.value_objects import Money, ProductId
+from ..observability.metrics import Registry
+from .file_product_catalog import FileProductCatalog
+from .sqlite_product_catalog import SqliteProductCatalog
+
+class CachedProductCatalog(ProductCatalogPort):
+    """Read-through cache in front of a catalog.
+
+    It is an LRU of at most ``max_entries`` products, and each price is trusted
+    for ``ttl`` seconds. A batch is answered from the cache where possible, and
+    everything else comes from one ``get_prices`` call to the catalog behind
+    it. Products the catalog does not know are cached as well, so repeated
+    requests for a bad SKU cost one lookup per TTL. ``set_prices`` writes
+    through and refreshes the prices it changed. Changes made by other writers
+    show up once the cached entry expires.
+    """
+    def __init__(
+        self, inner: ProductCatalogPort, max_entries: int = 10_000, ttl: float = 60.0,
+        metrics: Optional[Registry] = None, clock: Callable[[], float] = time.monotonic,
+    ):
+        self.inner = inner
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        # product -> (price, or None if unknown; when the entry stops being trusted), least recently used first
+        self._entries: "OrderedDict[ProductId, Tuple[Optional[Money], float]]" = OrderedDict()
+        self._m_lookups = None
+        if metrics is not None:
+            self._m_lookups = metrics.counter("hexshop_catalog_lookups_total", "Product price lookups", ["result"])
+
+    def get_prices(self, product_ids: Iterable[ProductId]) -> Dict[ProductId, Money]:
+        out: Dict[ProductId, Money] = {}
+        missing: List[ProductId] = []
+        wanted = set(product_ids)
+        now = self._clock()
+        with self._lock:
+            for p in wanted:
+                entry = self._entries.get(p)
+                if entry is None or entry[1] <= now:
+                    missing.append(p)
+                    continue
+                self._entries.move_to_end(p)
+                if entry[0] is not None:
+                    out[p] = entry[0]
+        if self._m_lookups is not None:
+            self._m_lookups.inc(len(wanted) - len(missing), result="hit")
+            self._m_lookups.inc(len(missing), result="miss")
+        if missing:
+            fetched = self.inner.get_prices(missing)
+            self._remember({p: fetched.get(p) for p in missing})
+            out.update(fetched)
+        return out
+
+    def set_prices(self, prices: Mapping[ProductId, Money]) -> None:
+        self.inner.set_prices(prices)
+        self._remember(prices)
+
+    def _remember(self, prices: Mapping[ProductId, Optional[Money]]) -> None:
+        expires = self._clock() + self.ttl
+        with self._lock:
+            for p, m in prices.items():
+                self._entries[p] = (m, expires)
+                self._entries.move_to_end(p)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+def catalog_from_env(metrics: Optional[Registry] = None) -> Optional[ProductCatalogPort]:
+    """The cached catalog named by ``CATALOG_DB`` (SQLite) or ``CATALOG_FILE`` (JSON), else ``None``."""
+    if os.environ.get("CATALOG_DB"):
+        inner: ProductCatalogPort = SqliteProductCatalog(os.environ["CATALOG_DB"])
+    elif os.environ.get("CATALOG_FILE"):
+        inner = FileProductCatalog(os.environ["CATALOG_FILE"])
+    else:
+        return None
+    return CachedProductCatalog(
+        inner, max_entries=int(os.environ.get("HEXSHOP_CATALOG_CACHE", "10000")),
+        ttl=float(os.environ.get("HEXSHOP_CATALOG_TTL", "60")), metrics=metrics)
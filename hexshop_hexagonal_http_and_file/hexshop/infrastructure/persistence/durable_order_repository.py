@@ -0,0 +1,281 @@
+from __future__ import annotations
+from bisect import insort
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional
+import fcntl, marshal, os, struct, tempfile, threading, uuid
+from ...domain.orders.models import Order, OrderItem
+from ...domain.orders.ports import ConcurrencyError, OrderFilter, OrderKey, OrderPage
+from ...domain.value_objects import Money, ProductId
+from .in_memory_order_repository import InMemoryOrderRepository, _copy
+
+# A record is the order id and customer id (16 raw bytes each) followed by the marshalled
+# (created_us, updated_us, is_submitted, version, ((product_id, amount, currency, quantity), ...)).
+# Keeping one flat bytes object per order makes snapshots a single list to (un)marshal,
+# and the id prefixes let startup index orders without decoding them.
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_US = timedelta(microseconds=1)
+_FRAME = struct.Struct(">I")
+_MAGIC = b"HXSNAP1\n"
+SNAPSHOT = "orders.snapshot"
+WAL_PREFIX = "orders.wal."
+
+def to_record(o: Order) -> bytes:
+    return o.id.bytes + o.customer_id.bytes + marshal.dumps((
+        (o.created_at - _EPOCH) // _US, (o.updated_at - _EPOCH) // _US, o.is_submitted(), o.version,
+        tuple((it.product_id.value, it.unit_price.amount, it.unit_price.currency, it.quantity) for it in o.iter_items()),
+    ))
+
+def _fields(record: bytes) -> tuple:
+    return marshal.loads(record[32:])
+
+def from_record(record: bytes) -> Order:
+    created_us, updated_us, is_submitted, version, items = _fields(record)
+    created_at = _EPOCH + timedelta(microseconds=created_us)
+    return Order(
+        id=uuid.UUID(bytes=record[:16]), customer_id=uuid.UUID(bytes=record[16:32]),
+        _items=[OrderItem(ProductId(p), Money(amount, currency), qty) for p, amount, currency, qty in items],
+        _is_submitted=is_submitted, version=version, created_at=created_at,
+        updated_at=_EPOCH + timedelta(microseconds=updated_us),
+    )
+
+class _LazyOrders(dict):
+    """Orders are only rebuilt from their records when first touched, so a warm start
+    costs one unmarshal rather than a million aggregate constructions."""
+    def __init__(self, records: Dict[bytes, bytes]):
+        super().__init__()
+        self.records = records
+
+    def __missing__(self, order_id: uuid.UUID) -> Order:
+        o = self[order_id] = from_record(self.records[order_id.bytes])
+        return o
+
+class DurableInMemoryOrderRepository(InMemoryOrderRepository):
+    """``InMemoryOrderRepository`` that survives restarts.
+
+    Every save is appended to a write-ahead log before it becomes visible. A
+    background thread periodically writes a snapshot. It takes a copy-on-write
+    view of the records under the lock, then writes that view to a temp file,
+    fsyncs it and renames it into place. The log segments the snapshot now
+    covers are then deleted. Startup loads the latest snapshot and replays the
+    segments written after it.
+
+    Log writes are flushed to the OS on every save. Set ``fsync=True`` to also
+    survive power loss, at the cost of one fsync per write.
+    """
+    def __init__(self, directory: str, snapshot_interval: float = 60.0, fsync: bool = False):
+        super().__init__()
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.fsync = fsync
+        self._dir_lock = open(os.path.join(directory, "LOCK"), "w")
+        try:
+            fcntl.flock(self._dir_lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            self._dir_lock.close()
+            raise RuntimeError(f"{directory} is in use by another order store")
+        self._lock = threading.RLock()
+        self._snapshotting = threading.Lock()
+        self._records: Dict[bytes, bytes] = {}
+        self._store = _LazyOrders(self._records)
+        # customer id bytes -> order id bytes, for customers whose sorted key list in
+        # _by_customer has not been built since startup
+        self._unindexed: Dict[bytes, List[bytes]] = {}
+        self._global_indexed = False  # the product and creation-time indexes are built on first use
+        self._unsnapshotted = 0  # writes (including ones replayed at startup) not yet in a snapshot
+        self._seq = self._restore()
+        self._wal = open(self._wal_path(self._seq), "ab")
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        if snapshot_interval > 0:
+            self._thread = threading.Thread(
+                target=self._snapshot_loop, args=(snapshot_interval,), name="order-snapshots", daemon=True)
+            self._thread.start()
+
+    # --- port ---
+
+    def save(self, order: Order) -> None:
+        with self._lock:
+            key = order.id.bytes
+            current = self._records.get(key)
+            if current is not None and _fields(current)[3] != order.version:
+                raise ConcurrencyError("Order was modified concurrently")
+            order.version += 1
+            record = to_record(order)
+            try:
+                self._append(record)
+            except BaseException:
+                order.version -= 1
+                raise
+            self._records[key] = record
+            self._store[order.id] = _copy(order)
+            if current is None:
+                self._index(order.customer_id)
+                insort(self._by_customer.setdefault(order.customer_id, []), (order.created_at, order.id))
+            self._index_globally(order, current is None)
+            self._unsnapshotted += 1
+
+    def get(self, order_id: uuid.UUID) -> Optional[Order]:
+        return _copy(self._store[order_id]) if order_id.bytes in self._records else None
+
+    def version_of(self, order_id: uuid.UUID) -> Optional[int]:
+        r = self._records.get(order_id.bytes)
+        return _fields(r)[3] if r is not None else None
+
+    def iter_all(self) -> Iterator[Order]:
+        return (_copy(self._store[uuid.UUID(bytes=k)]) for k in list(self._records))
+
+    def by_customer(self, customer_id: uuid.UUID) -> List[Order]:
+        self._index(customer_id)
+        return super().by_customer(customer_id)
+
+    def list_for_customer(
+        self, customer_id: uuid.UUID, filter: OrderFilter = OrderFilter(),
+        after: Optional[OrderKey] = None, limit: int = 50,
+    ) -> OrderPage:
+        self._index(customer_id)
+        return super().list_for_customer(customer_id, filter, after, limit)
+
+    def list_for_product(
+        self, product_id: ProductId, filter: OrderFilter = OrderFilter(),
+        after: Optional[OrderKey] = None, limit: int = 50,
+    ) -> OrderPage:
+        self._build_global_indexes()
+        return super().list_for_product(product_id, filter, after, limit)
+
+    def list_created_between(
+        self, start: datetime, end: datetime, filter: OrderFilter = OrderFilter(),
+        after: Optional[OrderKey] = None, limit: int = 50,
+    ) -> OrderPage:
+        self._build_global_indexes()
+        return super().list_created_between(start, end, filter, after, limit)
+
+    def _build_global_indexes(self) -> None:
+        if self._global_indexed:
+            return
+        with self._lock:
+            if self._global_indexed:
+                return
+            for oid, record in self._records.items():
+                created_us, _, _, _, items = _fields(record)
+                order_id = uuid.UUID(bytes=oid)
+                key = (_EPOCH + timedelta(microseconds=created_us), order_id)
+                self._by_created.append(key)
+                products = self._products_of[order_id] = frozenset(ProductId(it[0]) for it in items)
+                for p in products:
+                    self._by_product.setdefault(p, []).append(key)
+            self._by_created.sort()
+            for keys in self._by_product.values():
+                keys.sort()
+            self._global_indexed = True
+
+    def _index(self, customer_id: uuid.UUID) -> None:
+        if not self._unindexed:
+            return
+        with self._lock:
+            ids = self._unindexed.pop(customer_id.bytes, None)
+            if ids is not None:
+                keys = self._by_customer.setdefault(customer_id, [])
+                keys.extend((_EPOCH + timedelta(microseconds=_fields(self._records[i])[0]), uuid.UUID(bytes=i)) for i in ids)
+                keys.sort()
+
+    # --- durability ---
+
+    def snapshot(self) -> int:
+        """Writes a snapshot of every order; returns how many it holds."""
+        with self._snapshotting:
+            with self._lock:
+                # records are immutable bytes, so a shallow copy is a consistent view
+                view = list(self._records.values())
+                self._seq += 1
+                self._wal.close()
+                self._wal = open(self._wal_path(self._seq), "ab")
+                seq, self._unsnapshotted = self._seq, 0
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(_MAGIC)
+                marshal.dump((seq, view), f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, os.path.join(self.directory, SNAPSHOT))
+            self._fsync_dir()
+            for s in self._wal_segments():
+                if s < seq:
+                    os.remove(self._wal_path(s))
+            return len(view)
+
+    def close(self, snapshot: bool = True) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        if snapshot and self._unsnapshotted:
+            self.snapshot()
+        with self._lock:
+            self._wal.close()
+        self._dir_lock.close()
+
+    def _snapshot_loop(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            if self._unsnapshotted:
+                self.snapshot()
+
+    def _append(self, record: bytes) -> None:
+        self._wal.write(_FRAME.pack(len(record)) + record)
+        self._wal.flush()
+        if self.fsync:
+            os.fsync(self._wal.fileno())
+
+    def _wal_path(self, seq: int) -> str:
+        return os.path.join(self.directory, f"{WAL_PREFIX}{seq:08d}")
+
+    def _wal_segments(self) -> List[int]:
+        return sorted(int(n[len(WAL_PREFIX):]) for n in os.listdir(self.directory) if n.startswith(WAL_PREFIX))
+
+    def _fsync_dir(self) -> None:
+        fd = os.open(self.directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _restore(self) -> int:
+        seq, records = 1, []
+        path = os.path.join(self.directory, SNAPSHOT)
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                if f.read(len(_MAGIC)) != _MAGIC:
+                    raise ValueError(f"{path} is not an order snapshot")
+                seq, records = marshal.load(f)
+        self._records.update((r[:16], r) for r in records)
+        del records
+        segments = [s for s in self._wal_segments() if s >= seq]
+        for s in segments:
+            for r in self._replay(self._wal_path(s)):
+                self._records[r[:16]] = r
+                self._unsnapshotted += 1
+        # group by customer now; each customer's sorted keys are built on first use
+        unindexed = self._unindexed
+        for oid in self._records:
+            customer = self._records[oid][16:32]
+            ids = unindexed.get(customer)
+            if ids is None:
+                unindexed[customer] = [oid]
+            else:
+                ids.append(oid)
+        return segments[-1] if segments else seq
+
+    @staticmethod
+    def _replay(path: str) -> Iterator[bytes]:
+        with open(path, "r+b") as f:
+            good = 0
+            while True:
+                head = f.read(_FRAME.size)
+                if len(head) < _FRAME.size:
+                    break
+                (n,) = _FRAME.unpack(head)
+                record = f.read(n)
+                if len(record) < n:
+                    break
+                good = f.tell()
+                yield record
+            # a crash mid-append leaves a torn frame at the end; drop it
+            f.truncate(good)
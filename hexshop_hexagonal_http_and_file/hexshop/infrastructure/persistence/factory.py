@@ -0,0 +1,37 @@
+from __future__ import annotations
+import os, tempfile
+from ...domain.orders.ports import OrderRepositoryPort
+
+SPECS = "memory, durable:DIR, file[:PATH], sqlite:PATH, socket:PATH, tiered:SPEC, sharded:N:SPEC"
+
+def open_order_repository(spec: str) -> OrderRepositoryPort:
+    """Builds an order repository from a ``kind[:arg]`` spec as used by the command line tools."""
+    kind, _, arg = spec.partition(":")
+    if kind == "memory":
+        from .in_memory_order_repository import InMemoryOrderRepository
+        return InMemoryOrderRepository()
+    if kind == "durable" and arg:
+        from .durable_order_repository import DurableInMemoryOrderRepository
+        return DurableInMemoryOrderRepository(arg)
+    if kind == "file":
+        from .file_order_repository import FileOrderRepository
+        return FileOrderRepository(arg or os.path.join(tempfile.mkdtemp(), "orders.json"))
+    if kind == "sqlite" and arg:
+        from .sqlite_order_repository import SqliteOrderRepository
+        return SqliteOrderRepository(arg)
+    if kind == "socket" and arg:
+        from .socket_order_repository import SocketOrderRepository
+        return SocketOrderRepository(arg)
+    if kind == "tiered" and arg:
+        from .tiered_order_repository import TieredOrderRepository
+        return TieredOrderRepository(open_order_repository(arg))
+    if kind == "sharded" and arg:
+        # sharded:4:file:./orders-{}.json -- each shard's spec with {} replaced by its number
+        count, _, inner = arg.partition(":")
+        if not count.isdigit() or int(count) < 1 or not inner:
+            raise ValueError(f"expected sharded:N:SPEC, got {spec!r}")
+        if inner.partition(":")[2] and "{}" not in inner:
+            raise ValueError(f"shards would share {inner!r}; put {{}} where the shard number goes")
+        from .sharded_order_repository import ShardedOrderRepository
+        return ShardedOrderRepository([open_order_repository(inner.replace("{}", str(i))) for i in range(int(count))])
+    raise ValueError(f"unknown repository {spec!r} ({SPECS})")
@@ -0,0 +1,73 @@
+from __future__ import annotations
+from typing import Dict, Iterable, Optional, Tuple
+import fcntl, json, os, threading, uuid
+from ...domain.entities import Customer
+from ...domain.customers.ports import CustomerRepositoryPort, DuplicateEmailError, email_key
+from ...domain.value_objects import Email
+
+def _customer_to_dict(c: Customer) -> dict:
+    return {"id": str(c.id), "name": c.name, "email": c.email.value}
+
+def _customer_from_dict(d: dict) -> Customer:
+    return Customer(id=uuid.UUID(d["id"]), name=d["name"], email=Email(d["email"]))
+
+class FileCustomerRepository(CustomerRepositoryPort):
+    """JSON file of customers shared by every process that opens it.
+
+    The parsed file and its email index are cached until the file changes on
+    disk, so lookups are dict hits; writes take an exclusive lock and re-read
+    before checking email uniqueness.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._stamp: Optional[Tuple[int, int, int]] = None
+        self._by_id: Dict[str, Customer] = {}
+        self._by_email: Dict[str, str] = {}
+        if not os.path.exists(self.path):
+            with open(self.path, "w") as f:
+                json.dump({}, f)
+
+    def _current(self) -> Tuple[Dict[str, Customer], Dict[str, str]]:
+        st = os.stat(self.path)
+        stamp = (st.st_ino, st.st_mtime_ns, st.st_size)
+        with self._lock:
+            if stamp != self._stamp:
+                with open(self.path, "r") as f:
+                    raw = json.load(f)
+                by_id = {k: _customer_from_dict(d) for k, d in raw.items()}
+                self._by_email = {email_key(c.email.value): k for k, c in by_id.items()}
+                self._by_id, self._stamp = by_id, stamp
+            return self._by_id, self._by_email
+
+    def save(self, customer: Customer) -> None:
+        key = str(customer.id)
+        with open(self.path + ".lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            by_id, by_email = self._current()
+            owner = by_email.get(email_key(customer.email.value))
+            if owner is not None and owner != key:
+                raise DuplicateEmailError("Email already registered")
+            data = {k: _customer_to_dict(c) for k, c in by_id.items()}
+            data[key] = _customer_to_dict(customer)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp, self.path)
+
+    def get(self, customer_id: uuid.UUID) -> Optional[Customer]:
+        return self._current()[0].get(str(customer_id))
+
+    def get_by_email(self, email: str) -> Optional[Customer]:
+        by_id, by_email = self._current()
+        cid = by_email.get(email_key(email))
+        return by_id.get(cid) if cid else None
+
+    def get_many(self, customer_ids: Iterable[uuid.UUID]) -> Dict[uuid.UUID, Customer]:
+        by_id = self._current()[0]
+        out: Dict[uuid.UUID, Customer] = {}
+        for cid in customer_ids:
+            c = by_id.get(str(cid))
+            if c is not None:
+                out[cid] = c
+        return out
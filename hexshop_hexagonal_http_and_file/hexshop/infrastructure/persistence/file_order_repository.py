@@ -1,15 +1,22 @@
 from __future__ import annotations
-from typing import Dict, List, Optional
-import uuid, json, os
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional
+import uuid, json, os, fcntl, tempfile, threading, time
 from ...domain.orders.models import Order, OrderItem
-from ...domain.orders.ports import OrderRepositoryPort
+from ...domain.orders.ports import OrderRepositoryPort, ConcurrencyError, OrderFilter, OrderKey, OrderPage
 from ...domain.value_objects import Money, ProductId
+from ..observability.metrics import Registry
+from .order_archive import OrderArchive, archive_dir_for
 
 def _order_to_dict(o: Order) -> dict:
     return {
         "id": str(o.id),
         "customer_id": str(o.customer_id),
         "is_submitted": o.is_submitted(),
+        "version": o.version,
+        "created_at": o.created_at.isoformat(),
+        "updated_at": o.updated_at.isoformat(),
         "items": [
             {
                 "product_id": it.product_id.value,
@@ -20,46 +27,345 @@ def _order_to_dict(o: Order) -> dict:
         ],
     }
 
+# records written before orders had a creation time sort as the oldest
+_EPOCH = datetime.fromtimestamp(0, timezone.utc)
+
+def _created_at(d: dict) -> datetime:
+    ts = d.get("created_at")
+    return datetime.fromisoformat(ts) if ts else _EPOCH
+
+def _updated_at(d: dict) -> datetime:
+    ts = d.get("updated_at")
+    return datetime.fromisoformat(ts) if ts else _created_at(d)
+
+def _total_pence(d: dict) -> int:
+    return sum(it["unit_price"]["amount"] * it["quantity"] for it in d.get("items", []))
+
 def _order_from_dict(d: dict) -> Order:
-    o = Order(id=uuid.UUID(d["id"]), customer_id=uuid.UUID(d["customer_id"]))
+    o = Order(id=uuid.UUID(d["id"]), customer_id=uuid.UUID(d["customer_id"]), created_at=_created_at(d))
     for it in d.get("items", []):
         o.add_item(ProductId(it["product_id"]), Money(it["unit_price"]["amount"], it["unit_price"]["currency"]), it["quantity"])
     if d.get("is_submitted"):
         # submit sets a flag and enforces invariants; since items exist it is safe:
         o.submit()
+    o.version = d.get("version", 0)
+    o.updated_at = datetime.fromisoformat(d["updated_at"]) if d.get("updated_at") else o.created_at
+    o.pull_events()  # rebuilding the order is not a change
     return o
 
 class FileOrderRepository(OrderRepositoryPort):
-    def __init__(self, path: str):
+    """All orders in one JSON object, rewritten on every save.
+
+    With ``write_behind`` set (in seconds), this process keeps the records in
+    memory and owns the file. A save updates memory and returns. A background
+    writer then writes everything pending in one go: temp file, one fsync,
+    rename. It does this every ``write_behind`` seconds, or sooner once
+    ``batch_size`` saves are waiting. Saves block while ``max_unflushed`` saves
+    are still not on disk, which bounds what a crash can lose. ``flush`` waits
+    for the current state to be durable. ``close`` flushes and stops the writer.
+    The repository holds an exclusive lock on ``<path>.owner`` until ``close``.
+    While it does, a second write-behind repository on the file fails to open,
+    and saves through a plain one raise ``RuntimeError``; otherwise the next
+    flush would overwrite what they wrote.
+
+    ``archive_submitted`` moves old submitted orders out of the file into an
+    ``OrderArchive``. By default that is ``<path>.archive/``, picked up
+    automatically once it exists, even if another process creates it later. ``get``, ``version_of`` and the full scans
+    still find archived orders. Per-customer listings only cover the live file.
+    """
+    def __init__(
+        self, path: str, metrics: Optional[Registry] = None,
+        write_behind: float = 0.0, batch_size: int = 500, max_unflushed: int = 5000,
+        archive: Optional[OrderArchive] = None,
+    ):
         self.path = path
+        self.archive = archive
+        self._lock = threading.Lock()
+        self._bytes = self._hydrations = self._flushes = None
+        if metrics is not None:
+            self._bytes = metrics.counter(
+                "hexshop_file_repository_bytes_total", "Bytes moved by the file order repository", ["direction"])
+            self._hydrations = metrics.counter(
+                "hexshop_order_hydrations_total", "Orders rebuilt from stored records")
         if not os.path.exists(self.path):
             with open(self.path, "w") as f:
                 json.dump({}, f)
+        self._data: Optional[Dict[str, dict]] = None
+        self._owner = None
+        if write_behind > 0:
+            if metrics is not None:
+                self._flushes = metrics.histogram(
+                    "hexshop_file_repository_flush_saves", "Saves written per write-behind flush",
+                    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 5000))
+            self.write_behind, self.batch_size, self.max_unflushed = write_behind, batch_size, max_unflushed
+            with open(self.path + ".lock", "w") as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)  # no plain save is half-way through
+                self._owner = open(self.path + ".owner", "w")
+                try:
+                    fcntl.flock(self._owner, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    self._owner.close()
+                    raise RuntimeError(f"{self.path} is in use by another write-behind writer")
+                self._data = self._load()
+            self._state = threading.Condition()
+            self._seq = self._durable_seq = 0  # saves accepted / saves on disk
+            self._flush_wanted = self._closing = False
+            self._error: Optional[BaseException] = None
+            self._writer = threading.Thread(target=self._write_behind_loop, name="order-file-writer", daemon=True)
+            self._writer.start()
 
     def _load(self) -> Dict[str, dict]:
         with open(self.path, "r") as f:
-            return json.load(f)
+            raw = f.read()
+        if self._bytes is not None:
+            self._bytes.inc(len(raw), direction="read")
+        return json.loads(raw)
+
+    def _records(self) -> Dict[str, dict]:
+        """Every stored record; in write-behind mode a shallow copy of memory, safe to iterate."""
+        if self._data is None:
+            return self._load()
+        with self._state:
+            return dict(self._data)
+
+    def _record(self, key: str) -> Optional[dict]:
+        d = self._load().get(key) if self._data is None else self._data.get(key)
+        if d is None and self._archive() is not None:
+            d = self.archive.get(key)
+        return d
 
-    def _save_all(self, data: Dict[str, dict]) -> None:
-        tmp = self.path + ".tmp"
-        with open(tmp, "w") as f:
-            json.dump(data, f)
+    def _archive(self) -> Optional[OrderArchive]:
+        # `bulk archive` in another process may create the archive while this one runs
+        if self.archive is None and os.path.isdir(archive_dir_for(self.path)):
+            self.archive = OrderArchive(archive_dir_for(self.path))
+        return self.archive
+
+    def _all_records(self) -> Iterator[dict]:
+        live = self._records()
+        yield from live.values()
+        if self._archive() is not None:
+            # an order can be in both after a crash mid-archive; the live copy wins
+            yield from (d for d in self.archive.iter_records() if d["id"] not in live)
+
+    @contextmanager
+    def _writing(self) -> Iterator[None]:
+        # read-modify-write must be exclusive across threads and processes sharing the file
+        with self._lock, open(self.path + ".lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            if self._owner is not None:
+                yield
+                return
+            # a write-behind writer holds the owner lock; its next flush would undo this write
+            with open(self.path + ".owner", "w") as owner:
+                try:
+                    fcntl.flock(owner, fcntl.LOCK_SH | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    raise RuntimeError(f"{self.path} is owned by a write-behind writer") from None
+                yield
+
+    def _save_all(self, data: Dict[str, dict], sync: bool = False) -> None:
+        raw = json.dumps(data)
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            f.write(raw)
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
         os.replace(tmp, self.path)
+        if sync:
+            dir_fd = os.open(directory, os.O_RDONLY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+        if self._bytes is not None:
+            self._bytes.inc(len(raw), direction="written")
+
+    # --- write-behind ---
+
+    def _write_behind_loop(self) -> None:
+        while True:
+            with self._state:
+                self._state.wait_for(
+                    lambda: self._closing or self._flush_wanted or self._seq - self._durable_seq >= self.batch_size,
+                    timeout=self.write_behind)
+                self._flush_wanted = False
+                if self._seq == self._durable_seq:
+                    if self._closing:
+                        return
+                    continue
+                # records are replaced, never mutated, so a shallow copy is a consistent view
+                snapshot, seq = dict(self._data), self._seq
+            try:
+                with self._writing():
+                    self._save_all(snapshot, sync=True)
+            except Exception as e:
+                with self._state:
+                    self._error = e
+                    self._state.notify_all()
+                if self._closing:
+                    return
+                time.sleep(self.write_behind)  # keep the state; try again
+                continue
+            with self._state:
+                if self._flushes is not None:
+                    self._flushes.observe(seq - self._durable_seq)
+                self._durable_seq, self._error = seq, None
+                self._state.notify_all()
+
+    def flush(self) -> None:
+        """Returns once every save accepted so far is on disk (no-op without write-behind)."""
+        if self._data is None:
+            return
+        with self._state:
+            target = self._seq
+            self._flush_wanted = True
+            self._state.notify_all()
+            self._state.wait_for(lambda: self._durable_seq >= target or self._error is not None)
+            if self._durable_seq < target:
+                raise self._error
+
+    def close(self) -> None:
+        if self._data is None:
+            return
+        try:
+            self.flush()
+        finally:
+            with self._state:
+                self._closing = True
+                self._state.notify_all()
+            self._writer.join()
+            self._owner.close()
+
+    def _hydrate(self, d: dict) -> Order:
+        if self._hydrations is not None:
+            self._hydrations.inc()
+        return _order_from_dict(d)
 
     def save(self, order: Order) -> None:
-        data = self._load()
-        data[str(order.id)] = _order_to_dict(order)
-        self._save_all(data)
+        self.save_many([order])
+
+    def save_many(self, orders: Iterable[Order]) -> None:
+        orders = list(orders)
+        if self._data is not None:
+            self._save_behind(orders)
+        else:
+            with self._writing():
+                data = self._load()
+                self._apply(data, orders)
+                self._save_all(data)
+        for order in orders:
+            order.version += 1
+
+    def _save_behind(self, orders: List[Order]) -> None:
+        with self._state:
+            # the durability bound: don't run further ahead of the disk than this
+            self._state.wait_for(lambda: self._seq - self._durable_seq < self.max_unflushed)
+            self._apply(self._data, orders)
+            self._seq += len(orders)
+            if self._seq - self._durable_seq >= self.batch_size:
+                self._state.notify_all()
+
+    @staticmethod
+    def _apply(data: Dict[str, dict], orders: List[Order]) -> None:
+        for order in orders:
+            current = data.get(str(order.id))
+            if current is not None and current.get("version", 0) != order.version:
+                raise ConcurrencyError("Order was modified concurrently")
+        for order in orders:
+            d = _order_to_dict(order)
+            d["version"] = order.version + 1
+            data[str(order.id)] = d
 
     def get(self, order_id: uuid.UUID) -> Optional[Order]:
-        data = self._load()
-        d = data.get(str(order_id))
-        return _order_from_dict(d) if d else None
+        d = self._record(str(order_id))
+        return self._hydrate(d) if d else None
+
+    def iter_all(self) -> Iterator[Order]:
+        for d in self._all_records():
+            yield self._hydrate(d)
+
+    def iter_records(self) -> Iterator[dict]:
+        # stored records as-is, for bulk tools that decode them elsewhere
+        return self._all_records()
+
+    def archive_submitted(self, before: datetime) -> int:
+        """Moves orders submitted before ``before`` into the archive; returns how many moved."""
+        if self.archive is None:
+            self.archive = OrderArchive(archive_dir_for(self.path))
+
+        def old(d: dict) -> bool:
+            return bool(d.get("is_submitted")) and _updated_at(d) < before
+
+        if self._data is not None:
+            with self._state:
+                moving = {k: d for k, d in self._data.items() if old(d)}
+            if not moving:
+                return 0
+            self.archive.append(moving.values())
+            with self._state:
+                for k in moving:
+                    del self._data[k]  # submitted orders never change, so nothing raced us
+                self._seq += 1
+                self._state.notify_all()
+            return len(moving)
+        with self._writing():
+            data = self._load()
+            moving = {k: d for k, d in data.items() if old(d)}
+            if not moving:
+                return 0
+            # archive durably first: a crash in between leaves a duplicate, never a loss
+            self.archive.append(moving.values())
+            for k in moving:
+                del data[k]
+            self._save_all(data, sync=True)
+        return len(moving)
+
+    def version_of(self, order_id: uuid.UUID) -> Optional[int]:
+        d = self._record(str(order_id))
+        return d.get("version", 0) if d else None
 
     def by_customer(self, customer_id: uuid.UUID) -> List[Order]:
-        data = self._load()
+        data = self._records()
         out: List[Order] = []
         for d in data.values():
             if d["customer_id"] == str(customer_id):
-                out.append(_order_from_dict(d))
+                out.append(self._hydrate(d))
         return out
+
+    def list_for_customer(
+        self, customer_id: uuid.UUID, filter: OrderFilter = OrderFilter(),
+        after: Optional[OrderKey] = None, limit: int = 50,
+    ) -> OrderPage:
+        cid = str(customer_id)
+        return self._page((d for d in self._records().values() if d["customer_id"] == cid), filter, after, limit)
+
+    def list_for_product(
+        self, product_id: ProductId, filter: OrderFilter = OrderFilter(),
+        after: Optional[OrderKey] = None, limit: int = 50,
+    ) -> OrderPage:
+        pid = product_id.value
+        return self._page(
+            (d for d in self._all_records() if any(it["product_id"] == pid for it in d.get("items", ()))),
+            filter, after, limit)
+
+    def list_created_between(
+        self, start: datetime, end: datetime, filter: OrderFilter = OrderFilter(),
+        after: Optional[OrderKey] = None, limit: int = 50,
+    ) -> OrderPage:
+        return self._page((d for d in self._all_records() if start <= _created_at(d) < end), filter, after, limit)
+
+    def _page(self, records: Iterable[dict], filter: OrderFilter, after: Optional[OrderKey], limit: int) -> OrderPage:
+        # filter and sort on the raw records; only the returned page is hydrated
+        keyed = []
+        for d in records:
+            key = (_created_at(d), uuid.UUID(d["id"]))
+            if after is not None and key >= after:
+                continue
+            if filter.accepts(bool(d.get("is_submitted")), _total_pence(d)):
+                keyed.append((key, d))
+        keyed.sort(key=lambda kd: kd[0], reverse=True)
+        page = [self._hydrate(d) for _, d in keyed[:limit]]
+        next_key = keyed[limit - 1][0] if len(keyed) > limit else None
+        return OrderPage(page, next_key)
@@ -0,0 +1,41 @@
+from __future__ import annotations
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+import fcntl, json, os, threading
+from ...domain.catalog.ports import ProductCatalogPort
+from ...domain.value_objects import Money, ProductId
+
+class FileProductCatalog(ProductCatalogPort):
+    """JSON file of ``{"SKU": {"amount": 250, "currency": "GBP"}}``, cached until it changes on disk."""
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._stamp: Optional[Tuple[int, int, int]] = None
+        self._prices: Dict[ProductId, Money] = {}
+        if not os.path.exists(self.path):
+            with open(self.path, "w") as f:
+                json.dump({}, f)
+
+    def _current(self) -> Dict[ProductId, Money]:
+        st = os.stat(self.path)
+        stamp = (st.st_ino, st.st_mtime_ns, st.st_size)
+        with self._lock:
+            if stamp != self._stamp:
+                with open(self.path, "r") as f:
+                    raw = json.load(f)
+                self._prices = {ProductId(k): Money(v["amount"], v.get("currency", "GBP")) for k, v in raw.items()}
+                self._stamp = stamp
+            return self._prices
+
+    def get_prices(self, product_ids: Iterable[ProductId]) -> Dict[ProductId, Money]:
+        prices = self._current()
+        return {p: prices[p] for p in product_ids if p in prices}
+
+    def set_prices(self, prices: Mapping[ProductId, Money]) -> None:
+        with open(self.path + ".lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            merged = dict(self._current())
+            merged.update(prices)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump({p.value: {"amount": m.amount, "currency": m.currency} for p, m in merged.items()}, f)
+            os.replace(tmp, self.path)
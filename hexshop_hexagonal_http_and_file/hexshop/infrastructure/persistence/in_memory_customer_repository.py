@@ -0,0 +1,38 @@
+from __future__ import annotations
+from typing import Dict, Iterable, Optional
+import threading, uuid
+from ...domain.entities import Customer
+from ...domain.customers.ports import CustomerRepositoryPort, DuplicateEmailError, email_key
+
+class InMemoryCustomerRepository(CustomerRepositoryPort):
+    def __init__(self):
+        self._by_id: Dict[uuid.UUID, Customer] = {}
+        self._by_email: Dict[str, uuid.UUID] = {}
+        self._lock = threading.Lock()
+
+    def save(self, customer: Customer) -> None:
+        key = email_key(customer.email.value)
+        with self._lock:
+            owner = self._by_email.get(key)
+            if owner is not None and owner != customer.id:
+                raise DuplicateEmailError("Email already registered")
+            previous = self._by_id.get(customer.id)
+            if previous is not None:
+                self._by_email.pop(email_key(previous.email.value), None)
+            self._by_id[customer.id] = customer
+            self._by_email[key] = customer.id
+
+    def get(self, customer_id: uuid.UUID) -> Optional[Customer]:
+        return self._by_id.get(customer_id)
+
+    def get_by_email(self, email: str) -> Optional[Customer]:
+        cid = self._by_email.get(email_key(email))
+        return self._by_id.get(cid) if cid else None
+
+    def get_many(self, customer_ids: Iterable[uuid.UUID]) -> Dict[uuid.UUID, Customer]:
+        out: Dict[uuid.UUID, Customer] = {}
+        for cid in customer_ids:
+            c = self._by_id.get(cid)
+            if c is not None:
+                out[cid] = c
+        return out
@@ -0,0 +1,128 @@
+from __future__ import annotations
+from contextlib import ExitStack
+from typing import Dict, List, Mapping, Optional, Tuple
+import threading, uuid
+from ...domain.inventory.ports import InsufficientStockError, InventoryPort
+from ...domain.value_objects import ProductId
+
+class _ShardedCounter:
+    """One product's unreserved stock, split across shards that each have their own lock.
+
+    A reservation takes from the shard its order hashes to, holding that lock
+    alone. Only when that shard is short does it lock every shard (in order)
+    to gather the rest, so the answer stays exact as stock runs out.
+    """
+    def __init__(self, shards: int):
+        self.locks = [threading.Lock() for _ in range(shards)]
+        self.counts = [0] * shards
+
+    def take(self, quantity: int, shard: int) -> bool:
+        with self.locks[shard]:
+            if self.counts[shard] >= quantity:
+                self.counts[shard] -= quantity
+                return True
+        with ExitStack() as stack:
+            for lock in self.locks:
+                stack.enter_context(lock)
+            if sum(self.counts) < quantity:
+                return False
+            for s in range(len(self.counts)):
+                got = min(self.counts[s], quantity)
+                self.counts[s] -= got
+                quantity -= got
+            return True
+
+    def put(self, quantity: int, shard: int) -> None:
+        with self.locks[shard]:
+            self.counts[shard] += quantity
+
+    def spread(self, quantity: int) -> None:
+        n = len(self.counts)
+        for s in range(n):
+            self.put(quantity // n + (1 if s < quantity % n else 0), s)
+
+    def total(self) -> int:
+        return sum(self.counts)
+
+class InMemoryInventory(InventoryPort):
+    """Stock as sharded counters per product, with reservations sharded by order.
+
+    Checkouts for one hot product mostly contend on different shard locks,
+    not on one lock per product. Restocking spreads the new stock evenly.
+    """
+    def __init__(self, shards: int = 8):
+        self.shards = shards
+        self._lock = threading.Lock()  # guards adding counters, not using them
+        self._counters: Dict[ProductId, _ShardedCounter] = {}
+        # order reservations, sharded the same way: order -> product -> quantity held
+        self._held: List[Tuple[threading.Lock, Dict[uuid.UUID, Dict[ProductId, int]]]] = [
+            (threading.Lock(), {}) for _ in range(shards)]
+
+    def _shard(self, order_id: uuid.UUID) -> int:
+        return hash(order_id) % self.shards
+
+    def reserve(self, order_id: uuid.UUID, quantities: Mapping[ProductId, int]) -> None:
+        shard = self._shard(order_id)
+        taken: List[Tuple[_ShardedCounter, ProductId, int]] = []
+        for product_id, quantity in quantities.items():
+            counter = self._counters.get(product_id)
+            if counter is None or quantity <= 0:
+                continue
+            if not counter.take(quantity, shard):
+                for c, _, q in taken:
+                    c.put(q, shard)
+                raise InsufficientStockError(f"Not enough stock for {product_id.value!r}")
+            taken.append((counter, product_id, quantity))
+        if taken:
+            lock, held = self._held[shard]
+            with lock:
+                mine = held.setdefault(order_id, {})
+                for _, product_id, quantity in taken:
+                    mine[product_id] = mine.get(product_id, 0) + quantity
+
+    def release(self, order_id: uuid.UUID, quantities: Mapping[ProductId, int]) -> None:
+        shard = self._shard(order_id)
+        lock, held = self._held[shard]
+        back: Dict[ProductId, int] = {}
+        with lock:
+            mine = held.get(order_id)
+            if not mine:
+                return
+            for product_id, quantity in quantities.items():
+                q = min(quantity, mine.get(product_id, 0))
+                if q > 0:
+                    back[product_id] = q
+                    mine[product_id] -= q
+                    if not mine[product_id]:
+                        del mine[product_id]
+            if not mine:
+                del held[order_id]
+        for product_id, q in back.items():
+            self._counters[product_id].put(q, shard)
+
+    def cancel(self, order_id: uuid.UUID) -> None:
+        shard = self._shard(order_id)
+        lock, held = self._held[shard]
+        with lock:
+            mine = held.pop(order_id, {})
+        for product_id, q in mine.items():
+            self._counters[product_id].put(q, shard)
+
+    def commit(self, order_id: uuid.UUID) -> None:
+        lock, held = self._held[self._shard(order_id)]
+        with lock:
+            held.pop(order_id, None)
+
+    def available(self, product_id: ProductId) -> Optional[int]:
+        counter = self._counters.get(product_id)
+        return counter.total() if counter is not None else None
+
+    def restock(self, levels: Mapping[ProductId, int]) -> None:
+        if any(q < 0 for q in levels.values()):
+            raise ValueError("Restock quantities cannot be negative")
+        for product_id, quantity in levels.items():
+            counter = self._counters.get(product_id)
+            if counter is None:
+                with self._lock:
+                    counter = self._counters.setdefault(product_id, _ShardedCounter(self.shards))
+            counter.spread(quantity)
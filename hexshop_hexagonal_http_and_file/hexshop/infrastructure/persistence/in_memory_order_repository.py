@@ -1,18 +1,210 @@
 from __future__ import annotations
-from typing import Dict, List, Optional
-import uuid
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from dataclasses import replace
+from datetime import datetime
+from typing import Callable, Dict, FrozenSet, Iterator, List, Optional
+import logging, threading, time, uuid
 from ...domain.orders.models import Order
-from ...domain.orders.ports import OrderRepositoryPort
+from ...domain.value_objects import ProductId
+from ...domain.orders.ports import (
+    OrderRepositoryPort, ConcurrencyError, OrderFilter, OrderKey, OrderPage, order_key, page_of,
+)
+
+def _copy(o: Order) -> Order:
+    # callers mutate what they get before saving; the store must not see that until the save
+    return replace(o, _items=list(o._items), _events=[])
+
+log = logging.getLogger(__name__)
 
 class InMemoryOrderRepository(OrderRepositoryPort):
-    def __init__(self):
+    """Orders in a dict, with sorted key indexes per customer, per product and by creation time.
+
+    The store keeps its own copy of each order and hands out copies, so a
+    stale copy fails the version check on save, and changes a caller drops
+    are never seen.
+
+    With ``open_ttl`` set, an open order that nobody saves or reads for that
+    many seconds is dropped, and the dropped orders are passed to
+    ``on_expire``. Every open order has the same TTL, so keeping open orders
+    in last-touched order already gives the expiry queue. A touch moves one
+    entry to the back, and each tick (every ``expiry_tick`` seconds, on a
+    background thread) pops only the expired entries from the front.
+
+    ``on_expire`` runs under the store's lock, before the orders are dropped.
+    If it raises, they stay and the next tick tries again, so an order is never
+    dropped without being archived and its stock released. The last
+    ``remember_expired`` expired ids are remembered, and saving one of those
+    orders raises ``ConcurrencyError`` rather than bringing it back without
+    its stock.
+    """
+    def __init__(
+        self, open_ttl: Optional[float] = None, on_expire: Optional[Callable[[List[Order]], None]] = None,
+        expiry_tick: float = 1.0, clock: Callable[[], float] = time.monotonic, remember_expired: int = 100_000,
+    ):
         self._store: Dict[uuid.UUID, Order] = {}
+        # customer -> that customer's order keys, ascending
+        self._by_customer: Dict[uuid.UUID, List[OrderKey]] = {}
+        # product -> keys of the orders with a line for it, ascending; and each order's products
+        self._by_product: Dict[ProductId, List[OrderKey]] = {}
+        self._products_of: Dict[uuid.UUID, FrozenSet[ProductId]] = {}
+        # every order key, ascending, for creation-time range scans
+        self._by_created: List[OrderKey] = []
+        self._global_indexed = True  # whether _by_product and _by_created are kept
+        self._lock = threading.RLock()
+        self.open_ttl = open_ttl
+        self.on_expire = on_expire
+        self._clock = clock
+        # open orders -> when last touched, oldest first
+        self._touched: "OrderedDict[uuid.UUID, float]" = OrderedDict()
+        # ids of recently expired orders, oldest first
+        self.remember_expired = remember_expired
+        self._expired: "OrderedDict[uuid.UUID, None]" = OrderedDict()
+        if open_ttl is not None and expiry_tick > 0:
+            threading.Thread(target=self._expiry_loop, args=(expiry_tick,), name="order-expiry", daemon=True).start()
 
     def save(self, order: Order) -> None:
-        self._store[order.id] = order
+        with self._lock:
+            current = self._store.get(order.id)
+            if current is not None and current.version != order.version:
+                raise ConcurrencyError("Order was modified concurrently")
+            if current is None and order.id in self._expired:
+                raise ConcurrencyError("Order expired while it was being changed")
+            order.version += 1
+            self._store[order.id] = _copy(order)
+            if current is None:
+                insort(self._by_customer.setdefault(order.customer_id, []), order_key(order))
+            self._index_globally(order, current is None)
+            if self.open_ttl is not None:
+                if order.is_submitted():
+                    self._touched.pop(order.id, None)
+                else:
+                    self._touch(order.id)
 
     def get(self, order_id: uuid.UUID) -> Optional[Order]:
-        return self._store.get(order_id)
+        o = self._store.get(order_id)
+        if o is not None and self.open_ttl is not None and order_id in self._touched:
+            with self._lock:
+                if order_id in self._touched:
+                    self._touch(order_id)
+        return _copy(o) if o is not None else None
+
+    def _index_globally(self, order: Order, new_order: bool) -> None:
+        if not self._global_indexed:
+            return
+        if new_order:
+            # new orders are almost always the newest, so this is nearly always an append
+            insort(self._by_created, order_key(order))
+        # only the products that came or went since the last save move in the index
+        old = self._products_of.get(order.id, frozenset())
+        new = frozenset(it.product_id for it in order.iter_items())
+        if new == old:
+            return
+        key = order_key(order)
+        for p in old - new:
+            self._unindex_product(p, key)
+        for p in new - old:
+            insort(self._by_product.setdefault(p, []), key)
+        self._products_of[order.id] = new
+
+    def _unindex_product(self, product_id: ProductId, key: OrderKey) -> None:
+        keys = self._by_product[product_id]
+        del keys[bisect_left(keys, key)]
+        if not keys:
+            del self._by_product[product_id]
+
+    def _touch(self, order_id: uuid.UUID) -> None:
+        self._touched[order_id] = self._clock()
+        self._touched.move_to_end(order_id)
+
+    def expire_idle(self, now: Optional[float] = None) -> List[Order]:
+        """Drops the open orders idle for longer than ``open_ttl``; returns them."""
+        if self.open_ttl is None:
+            return []
+        deadline = (self._clock() if now is None else now) - self.open_ttl
+        with self._lock:
+            expired: List[Order] = []
+            for order_id, touched_at in self._touched.items():
+                if touched_at > deadline:
+                    break
+                expired.append(self._store[order_id])
+            if not expired:
+                return []
+            if self.on_expire is not None:
+                self.on_expire([_copy(o) for o in expired])  # if this raises, nothing is dropped
+            for o in expired:
+                self._drop(o)
+        return [_copy(o) for o in expired]
+
+    def _drop(self, o: Order) -> None:
+        del self._touched[o.id]
+        del self._store[o.id]
+        keys = self._by_customer[o.customer_id]
+        del keys[bisect_left(keys, order_key(o))]
+        if not keys:
+            del self._by_customer[o.customer_id]
+        if self._global_indexed:
+            del self._by_created[bisect_left(self._by_created, order_key(o))]
+        for p in self._products_of.pop(o.id, ()):
+            self._unindex_product(p, order_key(o))
+        self._expired[o.id] = None
+        while len(self._expired) > self.remember_expired:
+            self._expired.popitem(last=False)
+
+    def _expiry_loop(self, tick: float) -> None:
+        while True:
+            time.sleep(tick)
+            try:
+                self.expire_idle()
+            except Exception:
+                log.exception("Expiring idle orders failed; retrying next tick")
 
     def by_customer(self, customer_id: uuid.UUID) -> List[Order]:
-        return [o for o in self._store.values() if o.customer_id == customer_id]
+        with self._lock:
+            return [_copy(self._store[k[1]]) for k in self._by_customer.get(customer_id, ())]
+
+    def iter_all(self) -> Iterator[Order]:
+        return (_copy(o) for o in list(self._store.values()))
+
+    def version_of(self, order_id: uuid.UUID) -> Optional[int]:
+        o = self._store.get(order_id)
+        return o.version if o else None
+
+    def list_for_customer(
+        self, customer_id: uuid.UUID, filter: OrderFilter = OrderFilter(),
+        after: Optional[OrderKey] = None, limit: int = 50,
+    ) -> OrderPage:
+        with self._lock:
+            return self._page(self._by_customer.get(customer_id, []), filter, after, limit)
+
+    def list_for_product(
+        self, product_id: ProductId, filter: OrderFilter = OrderFilter(),
+        after: Optional[OrderKey] = None, limit: int = 50,
+    ) -> OrderPage:
+        with self._lock:
+            return self._page(self._by_product.get(product_id, []), filter, after, limit)
+
+    def list_created_between(
+        self, start: datetime, end: datetime, filter: OrderFilter = OrderFilter(),
+        after: Optional[OrderKey] = None, limit: int = 50,
+    ) -> OrderPage:
+        with self._lock:
+            keys = self._by_created
+            # (t,) sorts before every (t, id), so these find the first key created at or after t
+            hi = bisect_left(keys, (end,))
+            return self._page(keys, filter, after, limit, lo=bisect_left(keys, (start,)), hi=hi)
+
+    def _page(
+        self, keys: List[OrderKey], filter: OrderFilter, after: Optional[OrderKey], limit: int,
+        lo: int = 0, hi: Optional[int] = None,
+    ) -> OrderPage:
+        # walks keys[lo:hi] backwards from ``after``; costs the page, not the list
+        end = len(keys) if hi is None else hi
+        if after is not None:
+            end = min(end, bisect_left(keys, after))
+
+        def newest_first() -> Iterator[Order]:
+            for i in range(end - 1, lo - 1, -1):
+                yield self._store[keys[i][1]]
+        page = page_of(newest_first(), filter, limit)
+        return OrderPage([_copy(o) for o in page.orders], page.next_key)
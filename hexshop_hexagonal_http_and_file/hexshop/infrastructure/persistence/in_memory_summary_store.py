@@ -0,0 +1,74 @@
+from __future__ import annotations
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional
+import threading, uuid
+from ...application.projections import (
+    STATUSES, Dashboard, OrderSummary, OrderSummaryStorePort, StatusTotals, SummaryPage,
+)
+from ...domain.orders.ports import OrderFilter, OrderKey
+
+class InMemoryOrderSummaryStore(OrderSummaryStorePort):
+    """Summaries plus a per-customer key index; dashboard totals are kept as running sums."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.replace_all(())
+
+    def upsert(self, summary: OrderSummary) -> None:
+        with self._lock:
+            self._upsert(summary)
+
+    def _upsert(self, summary: OrderSummary) -> None:
+        current = self._by_id.get(summary.id)
+        if current is not None:
+            if current.version >= summary.version:
+                return
+            self._totals[current.status] = self._totals[current.status].plus(current, -1)
+        else:
+            insort(self._by_customer.setdefault(summary.customer_id, []), summary.key)
+        self._by_id[summary.id] = summary
+        self._totals[summary.status] = self._totals[summary.status].plus(summary)
+
+    def get(self, order_id: uuid.UUID) -> Optional[OrderSummary]:
+        return self._by_id.get(order_id)
+
+    def list_for_customer(
+        self, customer_id: uuid.UUID, filter: OrderFilter = OrderFilter(),
+        after: Optional[OrderKey] = None, limit: int = 50,
+    ) -> SummaryPage:
+        with self._lock:
+            keys = self._by_customer.get(customer_id, [])
+            i = bisect_left(keys, after) if after is not None else len(keys)
+            out: List[OrderSummary] = []
+            while i > 0:
+                i -= 1
+                s = self._by_id[keys[i][1]]
+                if not filter.accepts(s.is_submitted, s.total_pence):
+                    continue
+                if len(out) == limit:
+                    return SummaryPage(out, out[-1].key)
+                out.append(s)
+            return SummaryPage(out)
+
+    def remove(self, order_ids: Iterable[uuid.UUID]) -> None:
+        with self._lock:
+            for order_id in order_ids:
+                s = self._by_id.pop(order_id, None)
+                if s is None:
+                    continue
+                self._totals[s.status] = self._totals[s.status].plus(s, -1)
+                keys = self._by_customer[s.customer_id]
+                del keys[bisect_left(keys, s.key)]
+                if not keys:
+                    del self._by_customer[s.customer_id]
+
+    def dashboard(self) -> Dashboard:
+        return dict(self._totals)
+
+    def replace_all(self, summaries: Iterable[OrderSummary]) -> int:
+        with self._lock:
+            self._by_id: Dict[uuid.UUID, OrderSummary] = {}
+            self._by_customer: Dict[uuid.UUID, List[OrderKey]] = {}
+            self._totals: Dashboard = {s: StatusTotals() for s in STATUSES}
+            for s in summaries:
+                self._upsert(s)
+            return len(self._by_id)
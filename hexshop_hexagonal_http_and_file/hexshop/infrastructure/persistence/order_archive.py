@@ -0,0 +1,144 @@
+from __future__ import annotations
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import gzip, json, lzma, os, tempfile, threading, time
+
+# codec -> (compress, decompress, file suffix)
+CODECS: Dict[str, Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes], str]] = {
+    "gzip": (gzip.compress, gzip.decompress, ".gz"),
+    "lzma": (lzma.compress, lzma.decompress, ".xz"),
+}
+
+def archive_dir_for(path: str) -> str:
+    """Where the archive of an orders file lives by convention."""
+    return path + ".archive"
+
+@dataclass
+class _Segment:
+    path: str
+    codec: str
+    count: int
+    first_ids: List[str]  # first id of each block
+    offsets: List[int]    # block boundaries; len(first_ids) + 1 entries
+    last_id: str
+
+    def covers(self, order_id: str) -> bool:
+        return self.first_ids[0] <= order_id <= self.last_id
+
+    def block(self, i: int) -> List[bytes]:
+        with open(self.path, "rb") as f:
+            f.seek(self.offsets[i])
+            raw = f.read(self.offsets[i + 1] - self.offsets[i])
+        return CODECS[self.codec][1](raw).splitlines()
+
+class OrderArchive:
+    """Immutable, compressed segments of stored order records.
+
+    Each ``append`` writes one new segment. Its records are sorted by id and
+    cut into blocks of ``block_records``, and each block is compressed on its
+    own. A gzip segment is therefore a valid multi-member gzip file of NDJSON.
+    The sidecar ``.idx`` holds the first id of every block. ``get`` bisects
+    that sparse index and decompresses a single block. The index is written
+    last, so a segment that never got one (a crash mid-append) is ignored.
+    Segments that other processes append are picked up on the next read.
+    """
+    def __init__(self, directory: str, codec: str = "gzip", block_records: int = 256):
+        if codec not in CODECS:
+            raise ValueError(f"unknown codec {codec!r} ({', '.join(CODECS)})")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.codec = codec
+        self.block_records = block_records
+        self._lock = threading.Lock()
+        self._segments: List[_Segment] = []
+        self._stems: set = set()
+        self._listed_at: Optional[int] = None  # directory mtime when last listed
+        self._refresh()
+
+    def _refresh(self) -> None:
+        # adding a segment's index changes the directory's mtime, so an unchanged one needs no
+        # listing; a recent one is listed anyway, as coarse clocks can hide a second change
+        mtime = os.stat(self.directory).st_mtime_ns
+        if mtime == self._listed_at and time.time_ns() - mtime > 2_000_000_000:
+            return
+        with self._lock:
+            for name in sorted(os.listdir(self.directory)):
+                stem = name[:-len(".idx")]
+                if name.endswith(".idx") and stem not in self._stems:
+                    self._segments.append(self._open(stem))
+                    self._stems.add(stem)
+            self._listed_at = mtime
+
+    def _open(self, stem: str) -> _Segment:
+        with open(os.path.join(self.directory, stem + ".idx")) as f:
+            idx = json.load(f)
+        return _Segment(os.path.join(self.directory, stem + CODECS[idx["codec"]][2]), idx["codec"], idx["count"],
+                        idx["first_ids"], idx["offsets"], idx["last_id"])
+
+    def __len__(self) -> int:
+        self._refresh()
+        return sum(s.count for s in self._segments)
+
+    def append(self, records: Iterable[dict]) -> int:
+        """Writes ``records`` as a new segment; returns how many were archived."""
+        ordered = sorted(records, key=lambda d: d["id"])
+        if not ordered:
+            return 0
+        compress, _, suffix = CODECS[self.codec]
+        with self._lock:
+            stem = f"segment-{len(self._segments) + 1:06d}"
+            while os.path.exists(os.path.join(self.directory, stem + ".idx")):
+                stem += "b"
+            first_ids, offsets = [], [0]
+            data = os.path.join(self.directory, stem + suffix)
+            with open(data, "wb") as f:
+                for i in range(0, len(ordered), self.block_records):
+                    block = ordered[i:i + self.block_records]
+                    raw = compress("".join(json.dumps(d, separators=(",", ":")) + "\n" for d in block).encode())
+                    f.write(raw)
+                    first_ids.append(block[0]["id"])
+                    offsets.append(offsets[-1] + len(raw))
+                f.flush()
+                os.fsync(f.fileno())
+            idx = {"codec": self.codec, "count": len(ordered), "first_ids": first_ids,
+                   "offsets": offsets, "last_id": ordered[-1]["id"]}
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(idx, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, os.path.join(self.directory, stem + ".idx"))
+            self._segments.append(self._open(stem))
+            self._stems.add(stem)
+        return len(ordered)
+
+    def get(self, order_id: str) -> Optional[dict]:
+        self._refresh()
+        needle = order_id.encode()
+        for seg in reversed(self._segments):  # newest first
+            if not seg.covers(order_id):
+                continue
+            for line in seg.block(bisect_right(seg.first_ids, order_id) - 1):
+                if needle in line:
+                    d = json.loads(line)
+                    if d["id"] == order_id:
+                        return d
+        return None
+
+    def segment_paths(self) -> List[str]:
+        return [s.path for s in self._segments]
+
+    def iter_records(self) -> Iterator[dict]:
+        self._refresh()
+        for seg in list(self._segments):
+            yield from iter_segment(seg.path, seg.codec)
+
+def iter_segment(path: str, codec: Optional[str] = None) -> Iterator[dict]:
+    """Streams the records of one segment file."""
+    if codec is None:
+        codec = next(c for c, (_, _, suffix) in CODECS.items() if path.endswith(suffix))
+    opener = gzip.open if codec == "gzip" else lzma.open
+    with opener(path, "rb") as f:
+        for line in f:
+            yield json.loads(line)
@@ -0,0 +1,56 @@
+from __future__ import annotations
+from typing import Iterable, Iterator, Optional, Tuple
+import uuid
+from ...application.projections import (
+    STATUSES, Dashboard, OrderSummary, OrderSummaryStorePort, StatusTotals, SummaryPage,
+)
+from ...domain.orders.ports import OrderFilter, OrderKey, OrderRepositoryPort
+from .file_order_repository import _total_pence
+
+class RepositorySummaryStore(OrderSummaryStorePort):
+    """Summaries worked out from the order repository on every read; nothing is stored.
+
+    For a repository that other processes write to, when no shared summary
+    store is configured. Every worker then sees the same orders the
+    repository does, and startup loads nothing. Listings and single summaries
+    cost what the repository's own listing and ``get`` cost. The dashboard
+    totals every stored record (without rebuilding orders where the repository
+    hands out raw records), so use a shared store (``SUMMARY_DB``) where it is
+    hot. There is nothing to rebuild, so ``replace_all`` raises.
+    """
+    def __init__(self, repo: OrderRepositoryPort):
+        self.repo = repo
+
+    def upsert(self, summary: OrderSummary) -> None:
+        pass  # the repository already has the order
+
+    def get(self, order_id: uuid.UUID) -> Optional[OrderSummary]:
+        o = self.repo.get(order_id)
+        return OrderSummary.of(o) if o is not None else None
+
+    def list_for_customer(
+        self, customer_id: uuid.UUID, filter: OrderFilter = OrderFilter(),
+        after: Optional[OrderKey] = None, limit: int = 50,
+    ) -> SummaryPage:
+        page = self.repo.list_for_customer(customer_id, filter, after, limit)
+        return SummaryPage([OrderSummary.of(o) for o in page.orders], page.next_key)
+
+    def dashboard(self) -> Dashboard:
+        totals: Dashboard = {s: StatusTotals() for s in STATUSES}
+        for submitted, lines, pence in self._figures():
+            t = totals[STATUSES[submitted]]
+            totals[STATUSES[submitted]] = StatusTotals(t.orders + 1, t.lines + lines, t.total_pence + pence)
+        return totals
+
+    def _figures(self) -> Iterator[Tuple[bool, int, int]]:
+        # (submitted, lines, pence) per order, from the raw records where the repository has them
+        iter_records = getattr(self.repo, "iter_records", None)
+        if iter_records is not None:
+            return ((bool(d.get("is_submitted")), len(d.get("items", ())), _total_pence(d)) for d in iter_records())
+        return ((s.is_submitted, s.line_count, s.total_pence) for s in map(OrderSummary.of, self.repo.iter_all()))
+
+    def remove(self, order_ids: Iterable[uuid.UUID]) -> None:
+        pass
+
+    def replace_all(self, summaries: Iterable[OrderSummary]) -> int:
+        raise RuntimeError("Summaries worked out from the repository cannot be rebuilt; rebuild a SUMMARY_DB instead")
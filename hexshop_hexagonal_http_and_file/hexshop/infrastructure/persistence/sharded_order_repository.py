@@ -0,0 +1,160 @@
+from __future__ import annotations
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from itertools import chain
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, TypeVar
+import threading, uuid, zlib
+from ...domain.orders.models import Order
+from ...domain.orders.ports import OrderRepositoryPort, OrderFilter, OrderKey, OrderPage, order_key
+from ...domain.value_objects import ProductId
+
+T = TypeVar("T")
+
+def shard_of(customer_id: uuid.UUID, shards: int) -> int:
+    """The shard a customer's orders live on: stable across processes and restarts, unlike ``hash``."""
+    return zlib.crc32(customer_id.bytes) % shards
+
+def merge_pages(pages: Iterable[OrderPage], limit: int) -> OrderPage:
+    """Merges per-shard pages of ``limit`` into the first ``limit`` orders overall, newest first."""
+    pages = list(pages)
+    orders = sorted((o for p in pages for o in p.orders), key=order_key, reverse=True)
+    more = len(orders) > limit or any(p.next_key is not None for p in pages)
+    orders = orders[:limit]
+    return OrderPage(orders, order_key(orders[-1]) if more and orders else None)
+
+class ShardedOrderRepository(OrderRepositoryPort):
+    """Orders split over several repositories by customer.
+
+    An order lives on the shard that its customer id hashes to, so
+    ``by_customer`` and customer listings touch one shard. Saves go to one
+    shard as well. Each shard has its own file, database or lock, so writes
+    for customers on different shards do not wait on each other. A batch is
+    written per shard, in parallel, and is only atomic within a shard.
+
+    An order id does not say which shard holds it. A ``get`` asks every shard
+    at once on a thread pool, then remembers the answer for up to
+    ``route_cache`` orders. Product and date listings ask every shard for a
+    page and merge them. ``iter_all`` reads the shards one after another.
+
+    The shard count is part of the data layout. Opening the same shards with
+    a different count strands orders on the wrong shard, so change it with
+    ``bulk reshard``, which copies every order to a new set of shards.
+    """
+    def __init__(self, shards: Sequence[OrderRepositoryPort], workers: Optional[int] = None, route_cache: int = 100_000):
+        if not shards:
+            raise ValueError("A sharded repository needs at least one shard")
+        self.shards = list(shards)
+        self.route_cache = route_cache
+        self._pool = ThreadPoolExecutor(workers or len(self.shards), thread_name_prefix="order-shard")
+        self._lock = threading.Lock()
+        self._routes: "OrderedDict[uuid.UUID, int]" = OrderedDict()
+
+    def shard_for(self, customer_id: uuid.UUID) -> OrderRepositoryPort:
+        return self.shards[shard_of(customer_id, len(self.shards))]
+
+    def _fan_out(self, fn: Callable[[OrderRepositoryPort], T]) -> List[T]:
+        if len(self.shards) == 1:
+            return [fn(self.shards[0])]
+        return list(self._pool.map(fn, self.shards))
+
+    def _remember(self, order_id: uuid.UUID, shard: int) -> None:
+        with self._lock:
+            self._routes[order_id] = shard
+            self._routes.move_to_end(order_id)
+            while len(self._routes) > self.route_cache:
+                self._routes.popitem(last=False)
+
+    def _locate(self, order_id: uuid.UUID, fn: Callable[[OrderRepositoryPort], Optional[T]]) -> Optional[T]:
+        with self._lock:
+            known = self._routes.get(order_id)
+        if known is not None:
+            found = fn(self.shards[known])
+            if found is not None:
+                return found
+        for shard, found in enumerate(self._fan_out(fn)):
+            if found is not None:
+                self._remember(order_id, shard)
+                return found
+        return None
+
+    # --- port ---
+
+    def save(self, order: Order) -> None:
+        shard = shard_of(order.customer_id, len(self.shards))
+        self.shards[shard].save(order)
+        self._remember(order.id, shard)
+
+    def save_many(self, orders: Iterable[Order]) -> None:
+        groups: Dict[int, List[Order]] = {}
+        for o in orders:
+            groups.setdefault(shard_of(o.customer_id, len(self.shards)), []).append(o)
+        if len(groups) == 1:
+            [(shard, batch)] = groups.items()
+            self.shards[shard].save_many(batch)
+        else:
+            futures = [self._pool.submit(self.shards[s].save_many, batch) for s, batch in groups.items()]
+            errors = [f.exception() for f in futures]  # waits for every batch, failed or not
+            first = next((e for e in errors if e is not None), None)
+            if first is not None:
+                raise first
+        for shard, batch in groups.items():
+            for o in batch:
+                self._remember(o.id, shard)
+
+    def get(self, order_id: uuid.UUID) -> Optional[Order]:
+        return self._locate(order_id, lambda s: s.get(order_id))
+
+    def version_of(self, order_id: uuid.UUID) -> Optional[int]:
+        return self._locate(order_id, lambda s: s.version_of(order_id))
+
+    def by_customer(self, customer_id: uuid.UUID) -> List[Order]:
+        return self.shard_for(customer_id).by_customer(customer_id)
+
+    def list_for_customer(
+        self, customer_id: uuid.UUID, filter: OrderFilter = OrderFilter(),
+        after: Optional[OrderKey] = None, limit: int = 50,
+    ) -> OrderPage:
+        return self.shard_for(customer_id).list_for_customer(customer_id, filter, after, limit)
+
+    def list_for_product(
+        self, product_id: ProductId, filter: OrderFilter = OrderFilter(),
+        after: Optional[OrderKey] = None, limit: int = 50,
+    ) -> OrderPage:
+        return merge_pages(self._fan_out(lambda s: s.list_for_product(product_id, filter, after, limit)), limit)
+
+    def list_created_between(
+        self, start: datetime, end: datetime, filter: OrderFilter = OrderFilter(),
+        after: Optional[OrderKey] = None, limit: int = 50,
+    ) -> OrderPage:
+        return merge_pages(self._fan_out(lambda s: s.list_created_between(start, end, filter, after, limit)), limit)
+
+    def iter_all(self) -> Iterator[Order]:
+        return chain.from_iterable(s.iter_all() for s in self.shards)
+
+    def iter_records(self) -> Iterator[dict]:
+        # stored records as-is where a shard can give them, for the bulk tools
+        from .file_order_repository import _order_to_dict
+
+        def records(s: OrderRepositoryPort) -> Iterator[dict]:
+            iter_records = getattr(s, "iter_records", None)
+            return iter_records() if iter_records is not None else (_order_to_dict(o) for o in s.iter_all())
+        return chain.from_iterable(records(s) for s in self.shards)
+
+    def stats(self) -> dict:
+        """Orders per shard, and how many sit on a shard their customer does not hash to (a full scan)."""
+        def count(i: int) -> tuple:
+            total = misplaced = 0
+            for o in self.shards[i].iter_all():
+                total += 1
+                misplaced += shard_of(o.customer_id, len(self.shards)) != i
+            return total, misplaced
+        counts = list(self._pool.map(count, range(len(self.shards))))
+        return {"orders": [c[0] for c in counts], "misplaced": sum(c[1] for c in counts)}
+
+    def close(self) -> None:
+        for s in self.shards:
+            close = getattr(s, "close", None)
+            if close is not None:
+                close()
+        self._pool.shutdown()
@@ -0,0 +1,194 @@
+from __future__ import annotations
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+import json, os, socket, socketserver, struct, threading, uuid
+from ...domain.orders.models import Order
+from ...domain.orders.ports import OrderRepositoryPort, ConcurrencyError, OrderFilter, OrderKey, OrderPage
+from ...domain.value_objects import ProductId
+from .file_order_repository import _order_to_dict, _order_from_dict
+from .in_memory_order_repository import InMemoryOrderRepository
+
+# Frames are a 4-byte big-endian length followed by a JSON document.
+_HEADER = struct.Struct(">I")
+
+def _send(sock: socket.socket, payload: Any) -> None:
+    body = json.dumps(payload, separators=(",", ":")).encode()
+    sock.sendall(_HEADER.pack(len(body)) + body)
+
+def _recv_exact(sock: socket.socket, n: int) -> bytes:
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk:
+            raise ConnectionError("order store closed the connection")
+        buf += chunk
+    return bytes(buf)
+
+def _recv(sock: socket.socket) -> Any:
+    (n,) = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    return json.loads(_recv_exact(sock, n))
+
+def _key_to_json(key: Optional[OrderKey]):
+    return [key[0].isoformat(), str(key[1])] if key else None
+
+def _key_from_json(raw) -> Optional[OrderKey]:
+    return (datetime.fromisoformat(raw[0]), uuid.UUID(raw[1])) if raw else None
+
+def _filter_to_json(f: OrderFilter) -> dict:
+    return {"status": f.status, "min_total_pence": f.min_total_pence, "max_total_pence": f.max_total_pence}
+
+class OrderStoreServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Single owner of an in-memory order store, shared by worker processes over a Unix socket.
+
+    Every request runs under one lock, so all workers see a single, linearizable
+    store; optimistic version checks in ``save`` still catch lost updates between
+    workers because each save arrives as a fresh copy of the order.
+    """
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, repo: Optional[OrderRepositoryPort] = None):
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        self.repo = repo or InMemoryOrderRepository()
+        self.lock = threading.Lock()
+        super().__init__(socket_path, _StoreHandler)
+
+    def dispatch(self, request: Dict[str, Any]) -> Any:
+        op = request["op"]
+        with self.lock:
+            if op == "save":
+                order = _order_from_dict(request["order"])
+                self.repo.save(order)
+                return order.version
+            if op == "save_many":
+                orders = [_order_from_dict(d) for d in request["orders"]]
+                self.repo.save_many(orders)
+                return [o.version for o in orders]
+            if op == "iter_all":
+                return [_order_to_dict(o) for o in self.repo.iter_all()]
+            if op == "get":
+                o = self.repo.get(uuid.UUID(request["id"]))
+                return _order_to_dict(o) if o else None
+            if op == "version_of":
+                return self.repo.version_of(uuid.UUID(request["id"]))
+            if op == "by_customer":
+                return [_order_to_dict(o) for o in self.repo.by_customer(uuid.UUID(request["customer_id"]))]
+            if op == "list_for_customer":
+                page = self.repo.list_for_customer(
+                    uuid.UUID(request["customer_id"]), OrderFilter(**request["filter"]),
+                    after=_key_from_json(request["after"]), limit=request["limit"],
+                )
+                return {"orders": [_order_to_dict(o) for o in page.orders], "next_key": _key_to_json(page.next_key)}
+            if op == "list_created_between":
+                page = self.repo.list_created_between(
+                    datetime.fromisoformat(request["start"]), datetime.fromisoformat(request["end"]),
+                    OrderFilter(**request["filter"]), after=_key_from_json(request["after"]), limit=request["limit"],
+                )
+                return {"orders": [_order_to_dict(o) for o in page.orders], "next_key": _key_to_json(page.next_key)}
+            if op == "list_for_product":
+                page = self.repo.list_for_product(
+                    ProductId(request["product_id"]), OrderFilter(**request["filter"]),
+                    after=_key_from_json(request["after"]), limit=request["limit"],
+                )
+                return {"orders": [_order_to_dict(o) for o in page.orders], "next_key": _key_to_json(page.next_key)}
+        raise ValueError(f"Unknown operation {op!r}")
+
+class _StoreHandler(socketserver.BaseRequestHandler):
+    server: OrderStoreServer
+
+    def handle(self) -> None:
+        while True:
+            try:
+                request = _recv(self.request)
+            except ConnectionError:
+                return
+            try:
+                _send(self.request, {"result": self.server.dispatch(request)})
+            except ConcurrencyError as e:
+                _send(self.request, {"error": "concurrency", "message": str(e)})
+            except ValueError as e:
+                _send(self.request, {"error": "value", "message": str(e)})
+
+class SocketOrderRepository(OrderRepositoryPort):
+    """Client for :class:`OrderStoreServer`; one connection per thread."""
+    def __init__(self, socket_path: str):
+        self.socket_path = socket_path
+        self._local = threading.local()
+
+    def _connection(self) -> socket.socket:
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.connect(self.socket_path)
+            self._local.sock = sock
+        return sock
+
+    def _call(self, request: Dict[str, Any]) -> Any:
+        try:
+            sock = self._connection()
+            _send(sock, request)
+            response = _recv(sock)
+        except (ConnectionError, BrokenPipeError):
+            # the store may have restarted; retry once on a fresh connection
+            self._local.sock = None
+            sock = self._connection()
+            _send(sock, request)
+            response = _recv(sock)
+        if "error" in response:
+            if response["error"] == "concurrency":
+                raise ConcurrencyError(response["message"])
+            raise ValueError(response["message"])
+        return response["result"]
+
+    def save(self, order: Order) -> None:
+        order.version = self._call({"op": "save", "order": _order_to_dict(order)})
+
+    def save_many(self, orders: Iterable[Order]) -> None:
+        orders = list(orders)
+        versions = self._call({"op": "save_many", "orders": [_order_to_dict(o) for o in orders]})
+        for o, v in zip(orders, versions):
+            o.version = v
+
+    def iter_all(self) -> Iterator[Order]:
+        # the store answers in one frame; fine for the exports and rebuilds this is used for
+        return (_order_from_dict(d) for d in self._call({"op": "iter_all"}))
+
+    def get(self, order_id: uuid.UUID) -> Optional[Order]:
+        d = self._call({"op": "get", "id": str(order_id)})
+        return _order_from_dict(d) if d else None
+
+    def version_of(self, order_id: uuid.UUID) -> Optional[int]:
+        return self._call({"op": "version_of", "id": str(order_id)})
+
+    def by_customer(self, customer_id: uuid.UUID) -> List[Order]:
+        return [_order_from_dict(d) for d in self._call({"op": "by_customer", "customer_id": str(customer_id)})]
+
+    def list_for_customer(
+        self, customer_id: uuid.UUID, filter: OrderFilter = OrderFilter(),
+        after: Optional[OrderKey] = None, limit: int = 50,
+    ) -> OrderPage:
+        raw = self._call({
+            "op": "list_for_customer", "customer_id": str(customer_id),
+            "filter": _filter_to_json(filter), "after": _key_to_json(after), "limit": limit,
+        })
+        return OrderPage([_order_from_dict(d) for d in raw["orders"]], _key_from_json(raw["next_key"]))
+
+    def list_for_product(
+        self, product_id: ProductId, filter: OrderFilter = OrderFilter(),
+        after: Optional[OrderKey] = None, limit: int = 50,
+    ) -> OrderPage:
+        raw = self._call({
+            "op": "list_for_product", "product_id": product_id.value,
+            "filter": _filter_to_json(filter), "after": _key_to_json(after), "limit": limit,
+        })
+        return OrderPage([_order_from_dict(d) for d in raw["orders"]], _key_from_json(raw["next_key"]))
+
+    def list_created_between(
+        self, start: datetime, end: datetime, filter: OrderFilter = OrderFilter(),
+        after: Optional[OrderKey] = None, limit: int = 50,
+    ) -> OrderPage:
+        raw = self._call({
+            "op": "list_created_between", "start": start.isoformat(), "end": end.isoformat(),
+            "filter": _filter_to_json(filter), "after": _key_to_json(after), "limit": limit,
+        })
+        return OrderPage([_order_from_dict(d) for d in raw["orders"]], _key_from_json(raw["next_key"]))
@@ -0,0 +1,32 @@
+from __future__ import annotations
+from contextlib import contextmanager
+from typing import Iterator
+import sqlite3, threading
+
+class SqliteDatabase:
+    """One connection per thread onto a WAL-mode database file, so readers don't block each other."""
+    def __init__(self, path: str, schema: str = ""):
+        self.path = path
+        self._local = threading.local()
+        if schema:
+            self.connection().executescript(schema)
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
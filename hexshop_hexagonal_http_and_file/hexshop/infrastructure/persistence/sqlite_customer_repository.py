@@ -0,0 +1,59 @@
+from __future__ import annotations
+from typing import Dict, Iterable, List, Optional
+import sqlite3, uuid
+from ...domain.entities import Customer
+from ...domain.customers.ports import CustomerRepositoryPort, DuplicateEmailError, email_key
+from ...domain.value_objects import Email
+from .sqlite import SqliteDatabase
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS customers (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    email TEXT NOT NULL,
+    email_key TEXT NOT NULL UNIQUE
+);
+"""
+
+# stay under SQLite's default bound-parameter limit
+_BATCH = 500
+
+def _row_to_customer(row) -> Customer:
+    return Customer(id=uuid.UUID(row[0]), name=row[1], email=Email(row[2]))
+
+class SqliteCustomerRepository(CustomerRepositoryPort):
+    def __init__(self, path: str):
+        self.db = SqliteDatabase(path, SCHEMA)
+
+    def save(self, customer: Customer) -> None:
+        try:
+            with self.db.transaction() as conn:
+                conn.execute(
+                    "INSERT INTO customers (id, name, email, email_key) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(id) DO UPDATE SET name=excluded.name, email=excluded.email, email_key=excluded.email_key",
+                    (str(customer.id), customer.name, customer.email.value, email_key(customer.email.value)),
+                )
+        except sqlite3.IntegrityError as e:
+            raise DuplicateEmailError("Email already registered") from e
+
+    def get(self, customer_id: uuid.UUID) -> Optional[Customer]:
+        row = self.db.connection().execute(
+            "SELECT id, name, email FROM customers WHERE id = ?", (str(customer_id),)).fetchone()
+        return _row_to_customer(row) if row else None
+
+    def get_by_email(self, email: str) -> Optional[Customer]:
+        row = self.db.connection().execute(
+            "SELECT id, name, email FROM customers WHERE email_key = ?", (email_key(email),)).fetchone()
+        return _row_to_customer(row) if row else None
+
+    def get_many(self, customer_ids: Iterable[uuid.UUID]) -> Dict[uuid.UUID, Customer]:
+        ids: List[str] = list({str(c) for c in customer_ids})
+        out: Dict[uuid.UUID, Customer] = {}
+        conn = self.db.connection()
+        for i in range(0, len(ids), _BATCH):
+            chunk = ids[i:i + _BATCH]
+            marks = ",".join("?" * len(chunk))
+            for row in conn.execute(f"SELECT id, name, email FROM customers WHERE id IN ({marks})", chunk):
+                c = _row_to_customer(row)
+                out[c.id] = c
+        return out
@@ -0,0 +1,157 @@
+from __future__ import annotations
+from concurrent.futures import Future
+from typing import Any, Callable, List, Mapping, Optional, Tuple
+import queue, sqlite3, threading, uuid
+from ...domain.inventory.ports import InsufficientStockError, InventoryPort
+from ...domain.value_objects import ProductId
+from .sqlite import SqliteDatabase
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS stock (
+    product_id TEXT PRIMARY KEY,
+    available INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS reservations (
+    order_id TEXT NOT NULL,
+    product_id TEXT NOT NULL,
+    quantity INTEGER NOT NULL,
+    PRIMARY KEY (order_id, product_id)
+) WITHOUT ROWID;
+"""
+
+_Op = Tuple[Callable[..., Any], tuple, Future]
+
+class SqliteInventory(InventoryPort):
+    """Stock and reservations in SQLite, shared by every process using the file.
+
+    SQLite has a single writer, so splitting a hot product's row into shards
+    would not help. Instead, each process funnels its reservation writes
+    through one writer thread. Whatever has queued up while the previous
+    transaction ran (up to ``max_batch`` operations) is applied in a single
+    transaction, with a savepoint per operation so that one sold-out
+    reservation fails alone. Under contention, a thousand checkouts then cost
+    a handful of transactions instead of a thousand.
+    """
+    def __init__(self, path: str, max_batch: int = 256):
+        self.db = SqliteDatabase(path, SCHEMA)
+        self.max_batch = max_batch
+        self._queue: "queue.Queue[Optional[_Op]]" = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="inventory-writer", daemon=True)
+        self._writer.start()
+
+    # --- port ---
+
+    def reserve(self, order_id: uuid.UUID, quantities: Mapping[ProductId, int]) -> None:
+        self._submit(self._reserve, str(order_id), {p.value: q for p, q in quantities.items() if q > 0})
+
+    def release(self, order_id: uuid.UUID, quantities: Mapping[ProductId, int]) -> None:
+        self._submit(self._release, str(order_id), {p.value: q for p, q in quantities.items()})
+
+    def cancel(self, order_id: uuid.UUID) -> None:
+        self._submit(self._release, str(order_id), None)
+
+    def commit(self, order_id: uuid.UUID) -> None:
+        self._submit(self._commit, str(order_id))
+
+    def available(self, product_id: ProductId) -> Optional[int]:
+        row = self.db.connection().execute(
+            "SELECT available FROM stock WHERE product_id = ?", (product_id.value,)).fetchone()
+        return row[0] if row else None
+
+    def restock(self, levels: Mapping[ProductId, int]) -> None:
+        if any(q < 0 for q in levels.values()):
+            raise ValueError("Restock quantities cannot be negative")
+        self._submit(self._restock, {p.value: q for p, q in levels.items()})
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._writer.join()
+
+    # --- writer ---
+
+    def _submit(self, fn: Callable[..., Any], *args: Any) -> Any:
+        done: Future = Future()
+        self._queue.put((fn, args, done))
+        return done.result()
+
+    def _write_loop(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch: List[_Op] = [first]
+            while len(batch) < self.max_batch:
+                try:
+                    op = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if op is None:
+                    self._queue.put(None)  # finish this batch, then stop
+                    break
+                batch.append(op)
+            self._apply(batch)
+
+    def _apply(self, batch: List[_Op]) -> None:
+        outcomes: List[Tuple[Future, Any, Optional[BaseException]]] = []
+        try:
+            with self.db.transaction() as conn:
+                for fn, args, done in batch:
+                    conn.execute("SAVEPOINT op")
+                    try:
+                        result = fn(conn, *args)
+                    except (ValueError, sqlite3.Error) as e:
+                        conn.execute("ROLLBACK TO op")
+                        conn.execute("RELEASE op")
+                        outcomes.append((done, None, e))
+                        continue
+                    conn.execute("RELEASE op")
+                    outcomes.append((done, result, None))
+        except BaseException as e:
+            for _, _, done in batch:
+                done.set_exception(e)
+            return
+        for done, result, error in outcomes:
+            if error is not None:
+                done.set_exception(error)
+            else:
+                done.set_result(result)
+
+    @staticmethod
+    def _reserve(conn: sqlite3.Connection, order_id: str, quantities: dict) -> None:
+        for product_id, quantity in quantities.items():
+            updated = conn.execute(
+                "UPDATE stock SET available = available - ? WHERE product_id = ? AND available >= ?",
+                (quantity, product_id, quantity)).rowcount
+            if not updated:
+                if conn.execute("SELECT 1 FROM stock WHERE product_id = ?", (product_id,)).fetchone():
+                    raise InsufficientStockError(f"Not enough stock for {product_id!r}")
+                continue  # untracked
+            conn.execute(
+                "INSERT INTO reservations (order_id, product_id, quantity) VALUES (?, ?, ?) "
+                "ON CONFLICT(order_id, product_id) DO UPDATE SET quantity = quantity + excluded.quantity",
+                (order_id, product_id, quantity))
+
+    @staticmethod
+    def _release(conn: sqlite3.Connection, order_id: str, quantities: Optional[dict]) -> None:
+        held = dict(conn.execute("SELECT product_id, quantity FROM reservations WHERE order_id = ?", (order_id,)))
+        for product_id, holding in held.items():
+            back = holding if quantities is None else min(holding, quantities.get(product_id, 0))
+            if back <= 0:
+                continue
+            conn.execute("UPDATE stock SET available = available + ? WHERE product_id = ?", (back, product_id))
+            if back == holding:
+                conn.execute("DELETE FROM reservations WHERE order_id = ? AND product_id = ?", (order_id, product_id))
+            else:
+                conn.execute("UPDATE reservations SET quantity = quantity - ? WHERE order_id = ? AND product_id = ?",
+                             (back, order_id, product_id))
+
+    @staticmethod
+    def _commit(conn: sqlite3.Connection, order_id: str) -> None:
+        conn.execute("DELETE FROM reservations WHERE order_id = ?", (order_id,))
+
+    @staticmethod
+    def _restock(conn: sqlite3.Connection, levels: dict) -> None:
+        conn.executemany(
+            "INSERT INTO stock (product_id, available) VALUES (?, ?) "
+            "ON CONFLICT(product_id) DO UPDATE SET available = available + excluded.available",
+            list(levels.items()))
@@ -0,0 +1,178 @@
+from __future__ import annotations
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional
+import json, uuid
+from ...domain.orders.models import Order
+from ...domain.orders.ports import OrderRepositoryPort, ConcurrencyError, OrderFilter, OrderKey, OrderPage
+from ...domain.value_objects import ProductId
+from .file_order_repository import _order_to_dict, _order_from_dict
+from .sqlite import SqliteDatabase
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    id TEXT PRIMARY KEY,
+    customer_id TEXT NOT NULL,
+    created_us INTEGER NOT NULL,
+    is_submitted INTEGER NOT NULL,
+    version INTEGER NOT NULL,
+    total_pence INTEGER NOT NULL,
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS orders_by_customer ON orders (customer_id, created_us, id);
+CREATE INDEX IF NOT EXISTS orders_by_created ON orders (created_us, id);
+CREATE TABLE IF NOT EXISTS order_products (
+    product_id TEXT NOT NULL,
+    created_us INTEGER NOT NULL,
+    order_id TEXT NOT NULL,
+    PRIMARY KEY (product_id, created_us, order_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS order_products_by_order ON order_products (order_id);
+"""
+
+# databases written before order_products existed get it filled once, from the stored bodies
+_BACKFILL = (
+    "INSERT OR IGNORE INTO order_products SELECT json_extract(i.value, '$.product_id'), o.created_us, o.id "
+    "FROM orders o, json_each(o.body, '$.items') i "
+    "WHERE NOT EXISTS (SELECT 1 FROM order_products)"
+)
+
+_BATCH = 500
+_FETCH = 1000
+
+def _micros(ts: datetime) -> int:
+    return int(ts.timestamp() * 1_000_000)
+
+def _row(o: Order, version: int) -> tuple:
+    d = _order_to_dict(o)
+    d["version"] = version
+    return (str(o.id), str(o.customer_id), _micros(o.created_at), int(o.is_submitted()), version,
+            o.total().amount, json.dumps(d, separators=(",", ":")))
+
+def _filter_sql(filter: OrderFilter, sql: list, params: list, table: str = "") -> None:
+    if filter.status is not None:
+        sql.append(f"AND {table}is_submitted = ?")
+        params.append(int(filter.status == "submitted"))
+    if filter.min_total_pence is not None:
+        sql.append(f"AND {table}total_pence >= ?")
+        params.append(filter.min_total_pence)
+    if filter.max_total_pence is not None:
+        sql.append(f"AND {table}total_pence <= ?")
+        params.append(filter.max_total_pence)
+
+_UPSERT = (
+    "INSERT INTO orders (id, customer_id, created_us, is_submitted, version, total_pence, body) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT(id) DO UPDATE SET "
+    "is_submitted=excluded.is_submitted, version=excluded.version, "
+    "total_pence=excluded.total_pence, body=excluded.body"
+)
+
+class SqliteOrderRepository(OrderRepositoryPort):
+    """Orders as JSON documents, with the columns listings filter and sort on pulled out and indexed."""
+    def __init__(self, path: str):
+        self.db = SqliteDatabase(path, SCHEMA)
+        with self.db.transaction() as conn:
+            conn.execute(_BACKFILL)
+
+    def _check_versions(self, conn, orders: List[Order]) -> None:
+        for i in range(0, len(orders), _BATCH):
+            chunk = orders[i:i + _BATCH]
+            marks = ",".join("?" * len(chunk))
+            stored = dict(conn.execute(
+                f"SELECT id, version FROM orders WHERE id IN ({marks})", [str(o.id) for o in chunk]))
+            for o in chunk:
+                v = stored.get(str(o.id))
+                if v is not None and v != o.version:
+                    raise ConcurrencyError("Order was modified concurrently")
+
+    def save(self, order: Order) -> None:
+        self.save_many([order])
+
+    def save_many(self, orders: Iterable[Order]) -> None:
+        orders = list(orders)
+        with self.db.transaction() as conn:
+            self._check_versions(conn, orders)
+            conn.executemany(_UPSERT, [_row(o, o.version + 1) for o in orders])
+            conn.executemany("DELETE FROM order_products WHERE order_id = ?", [(str(o.id),) for o in orders])
+            conn.executemany("INSERT OR IGNORE INTO order_products VALUES (?, ?, ?)", [
+                (p, _micros(o.created_at), str(o.id)) for o in orders for p in {it.product_id.value for it in o.iter_items()}])
+        for o in orders:
+            o.version += 1
+
+    def get(self, order_id: uuid.UUID) -> Optional[Order]:
+        row = self.db.connection().execute("SELECT body FROM orders WHERE id = ?", (str(order_id),)).fetchone()
+        return _order_from_dict(json.loads(row[0])) if row else None
+
+    def version_of(self, order_id: uuid.UUID) -> Optional[int]:
+        row = self.db.connection().execute("SELECT version FROM orders WHERE id = ?", (str(order_id),)).fetchone()
+        return row[0] if row else None
+
+    def by_customer(self, customer_id: uuid.UUID) -> List[Order]:
+        rows = self.db.connection().execute(
+            "SELECT body FROM orders WHERE customer_id = ? ORDER BY created_us, id", (str(customer_id),))
+        return [_order_from_dict(json.loads(r[0])) for r in rows]
+
+    def list_for_customer(
+        self, customer_id: uuid.UUID, filter: OrderFilter = OrderFilter(),
+        after: Optional[OrderKey] = None, limit: int = 50,
+    ) -> OrderPage:
+        sql = ["SELECT created_us, id, body FROM orders WHERE customer_id = ?"]
+        params: list = [str(customer_id)]
+        if after is not None:
+            us = _micros(after[0])
+            sql.append("AND (created_us < ? OR (created_us = ? AND id < ?))")
+            params += [us, us, str(after[1])]
+        _filter_sql(filter, sql, params)
+        sql.append("ORDER BY created_us DESC, id DESC LIMIT ?")
+        params.append(limit + 1)
+        rows = self.db.connection().execute(" ".join(sql), params).fetchall()
+        orders = [_order_from_dict(json.loads(r[2])) for r in rows[:limit]]
+        next_key = (orders[-1].created_at, orders[-1].id) if len(rows) > limit else None
+        return OrderPage(orders, next_key)
+
+    def list_for_product(
+        self, product_id: ProductId, filter: OrderFilter = OrderFilter(),
+        after: Optional[OrderKey] = None, limit: int = 50,
+    ) -> OrderPage:
+        sql = ["SELECT o.body FROM order_products p JOIN orders o ON o.id = p.order_id WHERE p.product_id = ?"]
+        params: list = [product_id.value]
+        if after is not None:
+            us = _micros(after[0])
+            sql.append("AND (p.created_us < ? OR (p.created_us = ? AND p.order_id < ?))")
+            params += [us, us, str(after[1])]
+        _filter_sql(filter, sql, params, "o.")
+        sql.append("ORDER BY p.created_us DESC, p.order_id DESC LIMIT ?")
+        params.append(limit + 1)
+        rows = self.db.connection().execute(" ".join(sql), params).fetchall()
+        orders = [_order_from_dict(json.loads(r[0])) for r in rows[:limit]]
+        next_key = (orders[-1].created_at, orders[-1].id) if len(rows) > limit else None
+        return OrderPage(orders, next_key)
+
+    def list_created_between(
+        self, start: datetime, end: datetime, filter: OrderFilter = OrderFilter(),
+        after: Optional[OrderKey] = None, limit: int = 50,
+    ) -> OrderPage:
+        sql = ["SELECT body FROM orders WHERE created_us >= ? AND created_us < ?"]
+        params: list = [_micros(start), _micros(end)]
+        if after is not None:
+            us = _micros(after[0])
+            sql.append("AND (created_us < ? OR (created_us = ? AND id < ?))")
+            params += [us, us, str(after[1])]
+        _filter_sql(filter, sql, params)
+        sql.append("ORDER BY created_us DESC, id DESC LIMIT ?")
+        params.append(limit + 1)
+        rows = self.db.connection().execute(" ".join(sql), params).fetchall()
+        orders = [_order_from_dict(json.loads(r[0])) for r in rows[:limit]]
+        next_key = (orders[-1].created_at, orders[-1].id) if len(rows) > limit else None
+        return OrderPage(orders, next_key)
+
+    def iter_all(self) -> Iterator[Order]:
+        return (_order_from_dict(d) for d in self.iter_records())
+
+    def iter_records(self) -> Iterator[dict]:
+        cursor = self.db.connection().execute("SELECT body FROM orders ORDER BY rowid")
+        while True:
+            rows = cursor.fetchmany(_FETCH)
+            if not rows:
+                return
+            for r in rows:
+                yield json.loads(r[0])
@@ -0,0 +1,39 @@
+from __future__ import annotations
+from typing import Dict, Iterable, List, Mapping
+from ...domain.catalog.ports import ProductCatalogPort
+from ...domain.value_objects import Money, ProductId
+from .sqlite import SqliteDatabase
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    product_id TEXT PRIMARY KEY,
+    amount INTEGER NOT NULL,
+    currency TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+# stay under SQLite's default bound-parameter limit
+_BATCH = 500
+
+class SqliteProductCatalog(ProductCatalogPort):
+    def __init__(self, path: str):
+        self.db = SqliteDatabase(path, SCHEMA)
+
+    def get_prices(self, product_ids: Iterable[ProductId]) -> Dict[ProductId, Money]:
+        ids: List[str] = list({p.value for p in product_ids})
+        out: Dict[ProductId, Money] = {}
+        conn = self.db.connection()
+        for i in range(0, len(ids), _BATCH):
+            chunk = ids[i:i + _BATCH]
+            marks = ",".join("?" * len(chunk))
+            for product_id, amount, currency in conn.execute(
+                    f"SELECT product_id, amount, currency FROM products WHERE product_id IN ({marks})", chunk):
+                out[ProductId(product_id)] = Money(amount, currency)
+        return out
+
+    def set_prices(self, prices: Mapping[ProductId, Money]) -> None:
+        with self.db.transaction() as conn:
+            conn.executemany(
+                "INSERT INTO products (product_id, amount, currency) VALUES (?, ?, ?) "
+                "ON CONFLICT(product_id) DO UPDATE SET amount=excluded.amount, currency=excluded.currency",
+                [(p.value, m.amount, m.currency) for p, m in prices.items()])
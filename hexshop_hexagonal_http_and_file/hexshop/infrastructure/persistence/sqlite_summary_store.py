@@ -0,0 +1,125 @@
+from __future__ import annotations
+from datetime import datetime
+from itertools import islice
+from typing import Iterable, Optional
+import uuid
+from ...application.projections import (
+    STATUSES, Dashboard, OrderSummary, OrderSummaryStorePort, StatusTotals, SummaryPage,
+)
+from ...domain.orders.ports import OrderFilter, OrderKey
+from .sqlite import SqliteDatabase
+
+# Triggers keep summary_totals in step with order_summaries, so the dashboard is one small read.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS order_summaries (
+    id TEXT PRIMARY KEY,
+    customer_id TEXT NOT NULL,
+    created_us INTEGER NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    is_submitted INTEGER NOT NULL,
+    line_count INTEGER NOT NULL,
+    total_pence INTEGER NOT NULL,
+    version INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS order_summaries_by_customer ON order_summaries (customer_id, created_us, id);
+CREATE TABLE IF NOT EXISTS summary_totals (
+    is_submitted INTEGER PRIMARY KEY,
+    orders INTEGER NOT NULL,
+    lines INTEGER NOT NULL,
+    total_pence INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO summary_totals VALUES (0, 0, 0, 0), (1, 0, 0, 0);
+CREATE TRIGGER IF NOT EXISTS order_summaries_ins AFTER INSERT ON order_summaries BEGIN
+    UPDATE summary_totals SET orders = orders + 1, lines = lines + NEW.line_count,
+        total_pence = total_pence + NEW.total_pence WHERE is_submitted = NEW.is_submitted;
+END;
+CREATE TRIGGER IF NOT EXISTS order_summaries_upd AFTER UPDATE ON order_summaries BEGIN
+    UPDATE summary_totals SET orders = orders - 1, lines = lines - OLD.line_count,
+        total_pence = total_pence - OLD.total_pence WHERE is_submitted = OLD.is_submitted;
+    UPDATE summary_totals SET orders = orders + 1, lines = lines + NEW.line_count,
+        total_pence = total_pence + NEW.total_pence WHERE is_submitted = NEW.is_submitted;
+END;
+CREATE TRIGGER IF NOT EXISTS order_summaries_del AFTER DELETE ON order_summaries BEGIN
+    UPDATE summary_totals SET orders = orders - 1, lines = lines - OLD.line_count,
+        total_pence = total_pence - OLD.total_pence WHERE is_submitted = OLD.is_submitted;
+END;
+"""
+
+_COLUMNS = "id, customer_id, created_at, updated_at, is_submitted, line_count, total_pence, version"
+_UPSERT = (
+    "INSERT INTO order_summaries (created_us, " + _COLUMNS + ") VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT(id) DO UPDATE SET updated_at=excluded.updated_at, is_submitted=excluded.is_submitted, "
+    "line_count=excluded.line_count, total_pence=excluded.total_pence, version=excluded.version "
+    "WHERE excluded.version > order_summaries.version"
+)
+_BATCH = 1000
+
+def _micros(ts: datetime) -> int:
+    return int(ts.timestamp() * 1_000_000)
+
+def _params(s: OrderSummary) -> tuple:
+    return (_micros(s.created_at), str(s.id), str(s.customer_id), s.created_at.isoformat(), s.updated_at.isoformat(),
+            int(s.is_submitted), s.line_count, s.total_pence, s.version)
+
+def _summary(row) -> OrderSummary:
+    id_, customer_id, created_at, updated_at, is_submitted, lines, total, version = row
+    return OrderSummary(uuid.UUID(id_), uuid.UUID(customer_id), bool(is_submitted), lines, total,
+                        datetime.fromisoformat(created_at), datetime.fromisoformat(updated_at), version)
+
+class SqliteOrderSummaryStore(OrderSummaryStorePort):
+    """Summaries shared by every worker process pointed at the same database file."""
+    def __init__(self, path: str):
+        self.db = SqliteDatabase(path, SCHEMA)
+
+    def upsert(self, summary: OrderSummary) -> None:
+        self.db.connection().execute(_UPSERT, _params(summary))
+
+    def get(self, order_id: uuid.UUID) -> Optional[OrderSummary]:
+        row = self.db.connection().execute(
+            f"SELECT {_COLUMNS} FROM order_summaries WHERE id = ?", (str(order_id),)).fetchone()
+        return _summary(row) if row else None
+
+    def list_for_customer(
+        self, customer_id: uuid.UUID, filter: OrderFilter = OrderFilter(),
+        after: Optional[OrderKey] = None, limit: int = 50,
+    ) -> SummaryPage:
+        sql = [f"SELECT {_COLUMNS} FROM order_summaries WHERE customer_id = ?"]
+        params: list = [str(customer_id)]
+        if after is not None:
+            us = _micros(after[0])
+            sql.append("AND (created_us < ? OR (created_us = ? AND id < ?))")
+            params += [us, us, str(after[1])]
+        if filter.status is not None:
+            sql.append("AND is_submitted = ?")
+            params.append(int(filter.status == "submitted"))
+        if filter.min_total_pence is not None:
+            sql.append("AND total_pence >= ?")
+            params.append(filter.min_total_pence)
+        if filter.max_total_pence is not None:
+            sql.append("AND total_pence <= ?")
+            params.append(filter.max_total_pence)
+        sql.append("ORDER BY created_us DESC, id DESC LIMIT ?")
+        params.append(limit + 1)
+        rows = self.db.connection().execute(" ".join(sql), params).fetchall()
+        summaries = [_summary(r) for r in rows[:limit]]
+        return SummaryPage(summaries, summaries[-1].key if len(rows) > limit else None)
+
+    def dashboard(self) -> Dashboard:
+        rows = self.db.connection().execute("SELECT is_submitted, orders, lines, total_pence FROM summary_totals")
+        return {STATUSES[flag]: StatusTotals(orders, lines, total) for flag, orders, lines, total in rows}
+
+    def remove(self, order_ids: Iterable[uuid.UUID]) -> None:
+        with self.db.transaction() as conn:
+            conn.executemany("DELETE FROM order_summaries WHERE id = ?", [(str(i),) for i in order_ids])
+
+    def replace_all(self, summaries: Iterable[OrderSummary]) -> int:
+        it, count = iter(summaries), 0
+        with self.db.transaction() as conn:
+            conn.execute("DELETE FROM order_summaries")
+            while True:
+                batch = [_params(s) for s in islice(it, _BATCH)]
+                if not batch:
+                    return count
+                conn.executemany(_UPSERT, batch)
+                count += len(batch)
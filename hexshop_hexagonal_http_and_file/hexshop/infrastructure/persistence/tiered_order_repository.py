@@ -0,0 +1,181 @@
+from __future__ import annotations
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+import threading, uuid
+from ...domain.orders.models import Order
+from ...domain.orders.ports import OrderRepositoryPort, ConcurrencyError, OrderFilter, OrderKey, OrderPage
+from ...domain.value_objects import ProductId
+from ..observability.metrics import Registry
+from .in_memory_order_repository import _copy
+
+TIERS = ("memory", "durable", "miss")
+
+def approx_size(o: Order) -> int:
+    """Rough resident size of an order in bytes: object headers, ids and timestamps, plus each line."""
+    return 600 + 200 * len(o._items)
+
+class TieredOrderRepository(OrderRepositoryPort):
+    """An in-memory LRU tier in front of a durable repository.
+
+    Writes go through to the durable tier first, then refresh the memory tier.
+    Reads are served from memory when possible. A cold read comes from the
+    durable tier and promotes the order back into memory. Once the memory tier
+    is over ``max_orders`` or roughly ``max_bytes``, it evicts the least
+    recently used submitted orders first, and open orders only when no
+    submitted ones are left.
+
+    Listings and full scans go straight to the durable tier, which owns the
+    indexes. The memory tier only sees writes made through this adapter. An
+    order that another writer changes stays stale here until it is evicted or
+    a save of it fails the durable tier's version check, so use this only
+    where it is the store's sole writer.
+    """
+    def __init__(
+        self, durable: OrderRepositoryPort, max_orders: Optional[int] = 10_000, max_bytes: Optional[int] = None,
+        metrics: Optional[Registry] = None,
+    ):
+        if max_orders is None and max_bytes is None:
+            raise ValueError("Bound the memory tier by max_orders and/or max_bytes")
+        self.durable = durable
+        self.max_orders = max_orders
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._open: "OrderedDict[uuid.UUID, Order]" = OrderedDict()
+        self._submitted: "OrderedDict[uuid.UUID, Order]" = OrderedDict()
+        self._bytes = 0
+        self._reads: Dict[str, int] = dict.fromkeys(TIERS, 0)
+        self._evictions = 0
+        self._m_reads = self._m_evictions = self._m_resident = None
+        if metrics is not None:
+            self._m_reads = metrics.counter("hexshop_tiered_reads_total", "Order reads by the tier that served them", ["tier"])
+            self._m_evictions = metrics.counter("hexshop_tiered_evictions_total", "Orders evicted from the memory tier")
+            self._m_resident = metrics.gauge("hexshop_tiered_resident", "Memory tier occupancy", ["unit"])
+
+    # --- memory tier ---
+
+    def _lookup(self, order_id: uuid.UUID) -> Optional[Order]:
+        for tier in (self._open, self._submitted):
+            o = tier.get(order_id)
+            if o is not None:
+                tier.move_to_end(order_id)
+                return o
+        return None
+
+    def _discard(self, order_id: uuid.UUID) -> None:
+        o = self._open.pop(order_id, None) or self._submitted.pop(order_id, None)
+        if o is not None:
+            self._bytes -= approx_size(o)
+
+    def _admit(self, o: Order) -> None:
+        resident = self._open.get(o.id) or self._submitted.get(o.id)
+        if resident is not None and resident.version > o.version:
+            return  # a slower read or save finished after a newer save
+        self._discard(o.id)
+        (self._submitted if o.is_submitted() else self._open)[o.id] = o
+        self._bytes += approx_size(o)
+        while self._over_limit():
+            tier = self._submitted or self._open
+            _, evicted = tier.popitem(last=False)
+            self._bytes -= approx_size(evicted)
+            self._evictions += 1
+            if self._m_evictions is not None:
+                self._m_evictions.inc()
+        if self._m_resident is not None:
+            self._m_resident.set(len(self._open) + len(self._submitted), unit="orders")
+            self._m_resident.set(self._bytes, unit="bytes")
+
+    def _over_limit(self) -> bool:
+        count = len(self._open) + len(self._submitted)
+        return count > 0 and (
+            (self.max_orders is not None and count > self.max_orders)
+            or (self.max_bytes is not None and self._bytes > self.max_bytes))
+
+    def _count(self, tier: str) -> None:
+        self._reads[tier] += 1
+        if self._m_reads is not None:
+            self._m_reads.inc(tier=tier)
+
+    # --- port ---
+
+    def save(self, order: Order) -> None:
+        self.save_many([order])
+
+    def save_many(self, orders: Iterable[Order]) -> None:
+        orders = list(orders)
+        try:
+            self.durable.save_many(orders)
+        except ConcurrencyError:
+            # someone else won; whatever we hold for these orders may be stale
+            with self._lock:
+                for o in orders:
+                    self._discard(o.id)
+            raise
+        with self._lock:
+            for o in orders:
+                self._admit(_copy(o))
+
+    def get(self, order_id: uuid.UUID) -> Optional[Order]:
+        with self._lock:
+            o = self._lookup(order_id)
+            if o is not None:
+                self._count("memory")
+                return _copy(o)
+        o = self.durable.get(order_id)
+        with self._lock:
+            self._count("durable" if o is not None else "miss")
+            if o is not None:
+                self._admit(_copy(o))
+                # a save through this tier may have landed while we read; serve the newer copy
+                newer = self._lookup(order_id)
+                if newer is not None and newer.version > o.version:
+                    return _copy(newer)
+        return o
+
+    def version_of(self, order_id: uuid.UUID) -> Optional[int]:
+        with self._lock:
+            o = self._lookup(order_id)
+            if o is not None:
+                return o.version
+        return self.durable.version_of(order_id)
+
+    def by_customer(self, customer_id: uuid.UUID) -> List[Order]:
+        return self.durable.by_customer(customer_id)
+
+    def list_for_customer(
+        self, customer_id: uuid.UUID, filter: OrderFilter = OrderFilter(),
+        after: Optional[OrderKey] = None, limit: int = 50,
+    ) -> OrderPage:
+        return self.durable.list_for_customer(customer_id, filter, after, limit)
+
+    def list_for_product(
+        self, product_id: ProductId, filter: OrderFilter = OrderFilter(),
+        after: Optional[OrderKey] = None, limit: int = 50,
+    ) -> OrderPage:
+        return self.durable.list_for_product(product_id, filter, after, limit)
+
+    def list_created_between(
+        self, start: datetime, end: datetime, filter: OrderFilter = OrderFilter(),
+        after: Optional[OrderKey] = None, limit: int = 50,
+    ) -> OrderPage:
+        return self.durable.list_created_between(start, end, filter, after, limit)
+
+    def iter_all(self) -> Iterator[Order]:
+        return self.durable.iter_all()
+
+    def stats(self) -> dict:
+        """Reads served per tier, hit rate of the memory tier and its current occupancy."""
+        with self._lock:
+            reads = dict(self._reads)
+            total = sum(reads.values())
+            return {
+                "reads": reads,
+                "memory_hit_rate": reads["memory"] / total if total else 0.0,
+                "evictions": self._evictions,
+                "resident_orders": {"open": len(self._open), "submitted": len(self._submitted)},
+                "resident_bytes": self._bytes,
+            }
+
+    def __getattr__(self, name: str):
+        # durable-tier extras (flush, close, iter_records, ...)
+        return getattr(self.durable, name)
@@ -0,0 +1,39 @@
+import asyncio
+from hexshop.infrastructure.http.admission import AdmissionControlMiddleware, AdmissionLimit
+from hexshop.infrastructure.observability.metrics import Registry
+
+def test_full_queue_is_shed_with_retry_after():
+    release = asyncio.Event()
+
+    async def slow_app(scope, receive, send):
+        await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    async def scenario():
+        registry = Registry()
+        mw = AdmissionControlMiddleware(
+            slow_app, read=AdmissionLimit("read", 1, 1), write=AdmissionLimit("write", 1, 0),
+            retry_after=3, registry=registry,
+        )
+        statuses = []
+
+        async def request(method):
+            sent = []
+            async def send(message):
+                sent.append(message)
+            await mw({"type": "http", "method": method, "path": "/orders/x"}, None, send)
+            statuses.append((method, sent[0]["status"], dict(sent[0]["headers"]).get(b"retry-after")))
+
+        tasks = [asyncio.create_task(request("GET")) for _ in range(3)]
+        tasks.append(asyncio.create_task(request("POST")))
+        await asyncio.sleep(0.01)
+        release.set()
+        await asyncio.gather(*tasks)
+        return statuses, registry
+
+    statuses, registry = asyncio.run(scenario())
+    assert sorted(s[1] for s in statuses if s[0] == "GET") == [200, 200, 503]
+    assert ("POST", 200, None) in statuses
+    assert ("GET", 503, b"3") in statuses
+    assert 'hexshop_admission_rejected_total{route_class="read",reason="queue_full"} 1' in registry.render()
@@ -0,0 +1,46 @@
+import uuid
+import pytest
+from hexshop.domain.orders.models import Order
+from hexshop.domain.value_objects import Money, ProductId
+from hexshop.infrastructure.analytics.readers import partitions, read_partition
+from hexshop.infrastructure.analytics.sales import sales_report
+from hexshop.infrastructure.cli import bulk
+from hexshop.infrastructure.persistence.file_order_repository import FileOrderRepository
+from hexshop.infrastructure.persistence.sqlite_order_repository import SqliteOrderRepository
+
+@pytest.fixture
+def stores(tmp_path):
+    customers = [uuid.uuid4() for _ in range(3)]
+    orders = []
+    for i in range(40):
+        o = Order.new(customers[i % 3])
+        o.add_item(ProductId("TEA"), Money(250), 1 + i % 2)
+        if i % 4 == 0:
+            o.add_item(ProductId("MUG"), Money(800), 1)
+        if i % 5:
+            o.submit()
+        orders.append(o)
+    file_path, db_path = str(tmp_path / "orders.json"), str(tmp_path / "orders.db")
+    FileOrderRepository(file_path).save_many(orders)
+    SqliteOrderRepository(db_path).save_many(orders)
+    ndjson_path = str(tmp_path / "orders.ndjson")
+    bulk.main(["export", "--from", f"file:{file_path}", "--out", ndjson_path])
+    return orders, {"file": file_path, "sqlite": db_path, "ndjson": ndjson_path}
+
+@pytest.mark.parametrize("kind", ["file", "sqlite", "ndjson"])
+def test_partitions_cover_every_record_once(stores, kind):
+    orders, paths = stores
+    ids = [d["id"] for p in partitions(kind, paths[kind], 7) for d in read_partition(p)]
+    assert sorted(ids) == sorted(str(o.id) for o in orders)
+
+@pytest.mark.parametrize("kind", ["file", "sqlite", "ndjson"])
+def test_report_matches_totals_of_hydrated_orders(stores, kind):
+    orders, paths = stores
+    report = sales_report(kind, paths[kind], workers=2 if kind == "file" else 0)
+    submitted = [o for o in orders if o.is_submitted()]
+    by_status = {r["key"]: r for r in report.rows("status")}
+    assert by_status["submitted"]["revenue_pence"] == sum(o.total().amount for o in submitted)
+    assert by_status["open"]["orders"] == len(orders) - len(submitted)
+    assert sum(r["revenue_pence"] for r in report.rows("customer")) == by_status["submitted"]["revenue_pence"]
+    mug = next(r for r in report.rows("product") if r["key"] == "MUG")
+    assert mug["orders"] == sum(1 for o in submitted if any(it.product_id.value == "MUG" for it in o.items()))
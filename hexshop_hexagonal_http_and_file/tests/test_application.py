@@ -1,3 +1,4 @@
+import pytest
 from hexshop.domain.entities import Customer
 from hexshop.domain.services.discounts import DiscountService
 from hexshop.infrastructure.persistence.in_memory_order_repository import InMemoryOrderRepository
@@ -22,3 +23,111 @@ def test_checkout_with_bonus_and_discount():
 
     total = checkout.submit(third)
     assert total.amount >= preview.amount
+
+def test_stale_version_is_rejected():
+    import pytest
+    from hexshop.domain.orders.ports import ConcurrencyError
+
+    checkout = CheckoutService(InMemoryOrderRepository(), DiscountService())
+    alice = Customer.new("Alice", "alice@example.com")
+    oid = checkout.start_order_with_item(alice, "TEA-BAG", _pence(2.50), 2)
+
+    version = checkout.add_item(oid, "MUG-RED", _pence(8.00), 1, expected_version=1)
+    assert version == 2
+    with pytest.raises(ConcurrencyError):
+        checkout.submit(oid, expected_version=1)
+
+def test_customer_orders_are_listed_newest_first_by_keyset():
+    repo = InMemoryOrderRepository()
+    checkout = CheckoutService(repo, DiscountService())
+    alice = Customer.new("Alice", "alice@example.com")
+    ids = [checkout.start_order_with_item(alice, "TEA-BAG", _pence(1.00) * (n + 1), 1) for n in range(5)]
+    checkout.submit(ids[1])
+
+    from hexshop.domain.orders.ports import OrderFilter
+    first = repo.list_for_customer(alice.id, limit=2)
+    second = repo.list_for_customer(alice.id, after=first.next_key, limit=2)
+    assert [o.id for o in first.orders + second.orders] == ids[::-1][:4]
+
+    open_only = repo.list_for_customer(alice.id, OrderFilter(status="open", min_total_pence=_pence(3.00)))
+    assert [o.id for o in open_only.orders] == [ids[4], ids[3], ids[2]]
+    assert open_only.next_key is None
+
+@pytest.fixture(params=["memory", "durable", "sqlite", "file", "sharded"])
+def any_repo(request, tmp_path):
+    from hexshop.infrastructure.persistence.durable_order_repository import DurableInMemoryOrderRepository
+    from hexshop.infrastructure.persistence.file_order_repository import FileOrderRepository
+    from hexshop.infrastructure.persistence.sqlite_order_repository import SqliteOrderRepository
+    from hexshop.infrastructure.persistence.factory import open_order_repository
+    if request.param == "durable":
+        repo = DurableInMemoryOrderRepository(str(tmp_path / "data"), snapshot_interval=0)
+        yield repo
+        repo.close()
+        return
+    yield {
+        "memory": InMemoryOrderRepository,
+        "sqlite": lambda: SqliteOrderRepository(str(tmp_path / "orders.db")),
+        "file": lambda: FileOrderRepository(str(tmp_path / "orders.json")),
+        "sharded": lambda: open_order_repository(f"sharded:3:file:{tmp_path}/orders-{{}}.json"),
+    }[request.param]()
+
+def test_orders_are_listed_by_product_and_follow_line_removals(any_repo):
+    from hexshop.domain.orders.ports import OrderFilter
+    from hexshop.domain.value_objects import ProductId
+    checkout = CheckoutService(any_repo, DiscountService())
+    alice, bob = Customer.new("Alice", "alice@example.com"), Customer.new("Bob", "bob@example.com")
+    ids = [checkout.start_order_with_item(c, "KETTLE", _pence(24.00), 1) for c in (alice, bob, alice, bob)]
+    checkout.start_order_with_item(alice, "MUG-RED", _pence(8.00), 1)
+    checkout.add_item(ids[0], "TEA-BAG", _pence(2.50), 1)
+    checkout.submit(ids[0])
+    checkout.add_item(ids[3], "TEA-BAG", _pence(2.50), 1)
+    checkout.remove_item(ids[3], "KETTLE")
+
+    kettle = ProductId("KETTLE")
+    first = any_repo.list_for_product(kettle, limit=2)
+    rest = any_repo.list_for_product(kettle, after=first.next_key, limit=2)
+    assert [o.id for o in first.orders + rest.orders] == [ids[2], ids[1], ids[0]]
+    assert rest.next_key is None
+    assert [o.id for o in any_repo.list_for_product(kettle, OrderFilter(status="open")).orders] == [ids[2], ids[1]]
+    assert [o.id for o in any_repo.list_for_product(ProductId("TEA-BAG")).orders] == [ids[3], ids[0]]
+    assert any_repo.list_for_product(ProductId("NOPE")).orders == []
+
+def test_orders_created_in_a_window_are_range_scanned(any_repo):
+    from datetime import timedelta
+    from hexshop.domain.orders.models import Order
+    from hexshop.domain.orders.ports import OrderFilter
+    from hexshop.domain.value_objects import Money, ProductId
+    alice = Customer.new("Alice", "alice@example.com")
+    orders = [Order.new(alice.id) for _ in range(6)]
+    base = orders[0].created_at
+    for n, o in enumerate(orders):
+        o.created_at = base + timedelta(minutes=n)
+        o.add_item(ProductId("TEA-BAG"), Money(_pence(2.50)), 1)
+    orders[3].submit()
+    any_repo.save_many(orders)
+
+    start, end = base + timedelta(minutes=1), base + timedelta(minutes=5)
+    first = any_repo.list_created_between(start, end, limit=2)
+    rest = any_repo.list_created_between(start, end, after=first.next_key, limit=2)
+    assert [o.id for o in first.orders + rest.orders] == [o.id for o in orders[4:0:-1]]
+    assert rest.next_key is None
+    submitted = any_repo.list_created_between(base, base + timedelta(hours=1), OrderFilter(status="submitted"))
+    assert [o.id for o in submitted.orders] == [orders[3].id]
+
+def test_a_stale_copy_cannot_overwrite_a_newer_save(any_repo):
+    import pytest
+    from hexshop.domain.orders.models import Order
+    from hexshop.domain.orders.ports import ConcurrencyError
+    from hexshop.domain.value_objects import Money, ProductId
+    order = Order.new(Customer.new("Alice", "alice@example.com").id)
+    order.add_item(ProductId("TEA-BAG"), Money(_pence(2.50)), 1)
+    any_repo.save(order)
+
+    first, second = any_repo.get(order.id), any_repo.get(order.id)
+    first.add_item(ProductId("MUG-RED"), Money(_pence(8.00)), 1)
+    any_repo.save(first)
+    second.add_item(ProductId("KETTLE"), Money(_pence(24.00)), 1)
+    with pytest.raises(ConcurrencyError):
+        any_repo.save(second)
+    stored = any_repo.get(order.id)
+    assert stored.version == 2 and [it.product_id.value for it in stored.items()] == ["TEA-BAG", "MUG-RED"]
@@ -0,0 +1,54 @@
+import json, uuid
+from hexshop.domain.orders.models import Order
+from hexshop.domain.orders.ports import OrderFilter
+from hexshop.domain.value_objects import Money, ProductId
+from hexshop.infrastructure.cli import bulk
+from hexshop.infrastructure.persistence.file_order_repository import FileOrderRepository, _order_to_dict
+from hexshop.infrastructure.persistence.sqlite_order_repository import SqliteOrderRepository
+
+def _orders(n):
+    customer = uuid.uuid4()
+    out = []
+    for i in range(n):
+        o = Order.new(customer)
+        o.add_item(ProductId(f"SKU-{i}"), Money(100 * (i + 1)), 2)
+        if i % 2:
+            o.submit()
+        out.append(o)
+    return customer, out
+
+def test_migrate_file_to_sqlite_and_round_trip_through_csv_and_ndjson(tmp_path, capsys):
+    source = FileOrderRepository(str(tmp_path / "orders.json"))
+    customer, orders = _orders(25)
+    source.save_many(orders)
+
+    assert bulk.main(["migrate", "--from", f"file:{tmp_path / 'orders.json'}",
+                      "--to", f"sqlite:{tmp_path / 'orders.db'}", "--workers", "2", "--chunk-size", "7", "--json"]) == 0
+    assert json.loads(capsys.readouterr().out)["written"] == 25
+    target = SqliteOrderRepository(str(tmp_path / "orders.db"))
+    page = target.list_for_customer(customer, OrderFilter(status="submitted"), limit=5)
+    assert [o.id for o in page.orders] == [o.id for o in sorted(orders, key=lambda o: (o.created_at, o.id), reverse=True)
+                                           if o.is_submitted()][:5]
+    assert target.get(orders[3].id).total() == orders[3].total()
+
+    for fmt in ("csv", "ndjson"):
+        out = tmp_path / f"orders.{fmt}"
+        assert bulk.main(["export", "--from", f"sqlite:{tmp_path / 'orders.db'}", "--out", str(out)]) == 0
+        assert bulk.main(["import", str(out), "--to", f"sqlite:{tmp_path / fmt}.db", "--workers", "0"]) == 0
+        copy = SqliteOrderRepository(str(tmp_path / f"{fmt}.db"))
+        assert sorted(o.id for o in copy.by_customer(customer)) == sorted(o.id for o in orders)
+
+def test_import_reports_invalid_records_and_conflicts(tmp_path, capsys):
+    _, orders = _orders(3)
+    lines = [json.dumps(_order_to_dict(o)) for o in orders]
+    lines.insert(1, '{"id": "not-a-uuid"}')
+    path = tmp_path / "orders.ndjson"
+    path.write_text("\n".join(lines) + "\n")
+    spec = f"sqlite:{tmp_path / 'orders.db'}"
+
+    assert bulk.main(["import", str(path), "--to", spec, "--workers", "0", "--json"]) == 1
+    first = json.loads(capsys.readouterr().out)
+    assert (first["written"], first["invalid"]) == (3, 1)
+    # importing the same file again would overwrite newer versions
+    assert bulk.main(["import", str(path), "--to", spec, "--workers", "0", "--json"]) == 1
+    assert json.loads(capsys.readouterr().out)["conflicts"] == 3
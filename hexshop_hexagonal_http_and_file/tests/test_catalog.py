@@ -0,0 +1,72 @@
+import pytest
+from hexshop.application.use_cases import CheckoutService
+from hexshop.domain.catalog.ports import UnknownProductError
+from hexshop.domain.entities import Customer
+from hexshop.domain.services.discounts import DiscountService
+from hexshop.domain.value_objects import Money, ProductId
+from hexshop.infrastructure.observability.metrics import Registry
+from hexshop.infrastructure.persistence.cached_product_catalog import CachedProductCatalog
+from hexshop.infrastructure.persistence.file_product_catalog import FileProductCatalog
+from hexshop.infrastructure.persistence.in_memory_order_repository import InMemoryOrderRepository
+from hexshop.infrastructure.persistence.sqlite_product_catalog import SqliteProductCatalog
+
+TEA, MUG, NOPE = ProductId("TEA-BAG"), ProductId("MUG-RED"), ProductId("NOPE")
+
+class Counting(SqliteProductCatalog):
+    calls = 0
+
+    def get_prices(self, product_ids):
+        self.calls += 1
+        return super().get_prices(product_ids)
+
+class Clock:
+    now = 0.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.mark.parametrize("adapter", [SqliteProductCatalog, FileProductCatalog])
+def test_catalog_adapters_round_trip(adapter, tmp_path):
+    catalog = adapter(str(tmp_path / "catalog"))
+    catalog.set_prices({TEA: Money(250), MUG: Money(800)})
+    catalog.set_prices({MUG: Money(900)})
+    assert catalog.get_prices([TEA, MUG, NOPE]) == {TEA: Money(250), MUG: Money(900)}
+    assert catalog.get_price(NOPE) is None
+
+def test_cache_batches_misses_and_expires_entries(tmp_path):
+    inner, clock, metrics = Counting(str(tmp_path / "catalog.db")), Clock(), Registry()
+    inner.set_prices({TEA: Money(250), MUG: Money(800)})
+    cache = CachedProductCatalog(inner, max_entries=2, ttl=60, metrics=metrics, clock=clock)
+
+    assert cache.get_prices([TEA, NOPE]) == {TEA: Money(250)}
+    assert cache.get_prices([TEA, NOPE]) == {TEA: Money(250)}  # unknown products are cached too
+    assert inner.calls == 1
+    inner.set_prices({TEA: Money(300)})
+    assert cache.get_price(TEA) == Money(250)
+    clock.now = 61
+    assert cache.get_price(TEA) == Money(300)
+    assert cache.get_prices([MUG, NOPE]) == {MUG: Money(800)}  # NOPE expired; TEA is evicted for MUG
+    assert inner.calls == 3
+    cache.get_price(TEA)
+    assert inner.calls == 4
+    assert 'hexshop_catalog_lookups_total{result="hit"} 3' in metrics.render()
+
+def test_checkout_prices_lines_from_the_catalog(tmp_path):
+    catalog = Counting(str(tmp_path / "catalog.db"))
+    catalog.set_prices({TEA: Money(250), MUG: Money(800)})
+    repo = InMemoryOrderRepository()
+    checkout = CheckoutService(repo, DiscountService(), catalog=CachedProductCatalog(catalog))
+    alice = Customer.new("Alice", "alice@example.com")
+
+    oid = checkout.start_order_with_item(alice, "TEA-BAG", 1, 2)  # the client's price is ignored
+    checkout.add_items(oid, [("MUG-RED", None, 1), ("TEA-BAG", None, 1)])
+    assert repo.get(oid).total() == Money(3 * 250 + 800)
+    assert catalog.calls == 2
+    with pytest.raises(UnknownProductError):
+        checkout.add_items(oid, [("TEA-BAG", None, 1), ("NOPE", None, 1)])
+    assert repo.get(oid).version == 2
+
+def test_without_a_catalog_the_price_is_required():
+    checkout = CheckoutService(InMemoryOrderRepository(), DiscountService())
+    with pytest.raises(ValueError):
+        checkout.start_order_with_item(Customer.new("Alice", "alice@example.com"), "TEA-BAG", None, 1)
@@ -0,0 +1,26 @@
+import pytest
+from hexshop.domain.entities import Customer
+from hexshop.domain.customers.ports import DuplicateEmailError
+from hexshop.infrastructure.persistence.in_memory_customer_repository import InMemoryCustomerRepository
+from hexshop.infrastructure.persistence.file_customer_repository import FileCustomerRepository
+from hexshop.infrastructure.persistence.sqlite_customer_repository import SqliteCustomerRepository
+
+@pytest.fixture(params=["memory", "file", "sqlite"])
+def customers(request, tmp_path):
+    if request.param == "file":
+        return FileCustomerRepository(str(tmp_path / "customers.json"))
+    if request.param == "sqlite":
+        return SqliteCustomerRepository(str(tmp_path / "customers.db"))
+    return InMemoryCustomerRepository()
+
+def test_email_index_lookup_and_uniqueness(customers):
+    alice = Customer.new("Alice", "alice@example.com")
+    bob = Customer.new("Bob", "bob@example.com")
+    customers.save(alice)
+    customers.save(bob)
+
+    assert customers.get(alice.id) == alice
+    assert customers.get_by_email("ALICE@example.com") == alice
+    assert customers.get_many([alice.id, bob.id]) == {alice.id: alice, bob.id: bob}
+    with pytest.raises(DuplicateEmailError):
+        customers.save(Customer.new("Impostor", "Alice@Example.com"))
@@ -17,3 +17,15 @@ def test_order_total_and_submit():
     import pytest
     with pytest.raises(ValueError):
         order.add_item(ProductId("P3"), Money(_pence(1.00)), 1)
+
+def test_time_ordered_ids():
+    from hexshop.domain.entities import Customer
+    from hexshop.domain.ids import use_id_generator
+    use_id_generator("uuid7")
+    try:
+        ids = [Order.new(uuid.uuid4()).id for _ in range(1000)]
+        customer = Customer.new("Alice", "alice@example.com")
+    finally:
+        use_id_generator("uuid4")
+    assert ids == sorted(ids) and {i.version for i in ids} == {7} and customer.id.version == 7
+    assert Order.new(uuid.uuid4()).id.version == 4
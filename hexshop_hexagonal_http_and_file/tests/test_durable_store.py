@@ -0,0 +1,43 @@
+import os, uuid
+import pytest
+from hexshop.application.use_cases import CheckoutService
+from hexshop.domain.entities import Customer
+from hexshop.domain.orders.ports import ConcurrencyError, OrderFilter
+from hexshop.domain.services.discounts import DiscountService
+from hexshop.infrastructure.persistence.durable_order_repository import DurableInMemoryOrderRepository, WAL_PREFIX
+
+def _state(repo, customer_id):
+    return [(o.id, o.version, o.is_submitted(), o.total().amount, o.updated_at) for o in repo.by_customer(customer_id)]
+
+def test_restart_restores_snapshot_and_replays_log(tmp_path):
+    repo = DurableInMemoryOrderRepository(str(tmp_path), snapshot_interval=0)
+    checkout = CheckoutService(repo, DiscountService())
+    alice = Customer.new("Alice", "alice@example.com")
+    ids = [checkout.start_order_with_item(alice, "TEA-BAG", 250, n + 1) for n in range(3)]
+    assert repo.snapshot() == 3
+    checkout.add_item(ids[0], "MUG-RED", 800, 1)
+    checkout.submit(ids[0])
+    ids.append(checkout.start_order_with_item(alice, "TEA-BAG", 250, 1))
+    before = _state(repo, alice.id)
+    repo.close(snapshot=False)  # as after a crash: the last three writes only exist in the log
+    with open(tmp_path / f"{WAL_PREFIX}00000002", "ab") as wal:
+        wal.write(b"\x00\x00\x01\x00torn")
+
+    again = DurableInMemoryOrderRepository(str(tmp_path), snapshot_interval=0)
+    assert _state(again, alice.id) == before
+    page = again.list_for_customer(alice.id, OrderFilter(status="open"), limit=10)
+    assert [o.id for o in page.orders] == [ids[3], ids[2], ids[1]]
+    assert again.version_of(ids[0]) == 3 and again.get(uuid.uuid4()) is None
+    stale = again.get(ids[1])
+    stale.version -= 1
+    with pytest.raises(ConcurrencyError):
+        again.save(stale)
+    again.close()
+    assert [n for n in os.listdir(tmp_path) if n.startswith(WAL_PREFIX)] == [f"{WAL_PREFIX}00000003"]
+    assert _state(DurableInMemoryOrderRepository(str(tmp_path), snapshot_interval=0), alice.id) == before
+
+def test_directory_is_owned_by_one_store(tmp_path):
+    repo = DurableInMemoryOrderRepository(str(tmp_path), snapshot_interval=0)
+    with pytest.raises(RuntimeError):
+        DurableInMemoryOrderRepository(str(tmp_path), snapshot_interval=0)
+    repo.close()
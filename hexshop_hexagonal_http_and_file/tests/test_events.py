@@ -0,0 +1,33 @@
+import asyncio
+from hexshop.domain.entities import Customer
+from hexshop.domain.orders.events import ItemAdded, ItemRemoved, OrderSubmitted
+from hexshop.domain.services.discounts import DiscountService
+from hexshop.application.use_cases import CheckoutService
+from hexshop.infrastructure.messaging.in_process_bus import InProcessEventBus
+from hexshop.infrastructure.persistence.in_memory_order_repository import InMemoryOrderRepository
+
+def test_committed_changes_reach_subscribers():
+    async def scenario():
+        bus = InProcessEventBus()
+        checkout = CheckoutService(InMemoryOrderRepository(), DiscountService(), bus)
+        alice = Customer.new("Alice", "alice@example.com")
+        by_customer = bus.subscribe(customer_id=alice.id)
+
+        oid = checkout.start_order_with_item(alice, "TEA-BAG", 250, 2)
+        by_order = bus.subscribe(order_id=oid, maxsize=1)
+        checkout.add_item(oid, "MUG-RED", 800, 1)
+        checkout.remove_item(oid, "TEA-BAG")
+        checkout.submit(oid)
+
+        seen = []
+        while (e := await by_customer.next(timeout=0.01)) is not None:
+            seen.append(type(e))
+        newest = await by_order.next(timeout=0.01)
+        by_customer.close()
+        by_order.close()
+        return seen, newest, by_order.dropped
+
+    seen, newest, dropped = asyncio.run(scenario())
+    assert seen == [ItemAdded, ItemAdded, ItemRemoved, OrderSubmitted]
+    assert isinstance(newest, OrderSubmitted) and newest.total.amount == 800
+    assert dropped == 2
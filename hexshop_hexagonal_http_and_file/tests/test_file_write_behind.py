@@ -0,0 +1,56 @@
+import json, uuid
+import pytest
+from hexshop.domain.orders.models import Order
+from hexshop.domain.orders.ports import ConcurrencyError
+from hexshop.domain.value_objects import Money, ProductId
+from hexshop.infrastructure.observability.metrics import Registry
+from hexshop.infrastructure.persistence.file_order_repository import FileOrderRepository
+
+def _order():
+    o = Order.new(uuid.uuid4())
+    o.add_item(ProductId("TEA-BAG"), Money(250), 2)
+    return o
+
+def test_saves_are_visible_at_once_and_durable_after_flush(tmp_path):
+    path = str(tmp_path / "orders.json")
+    metrics = Registry()
+    repo = FileOrderRepository(path, metrics=metrics, write_behind=60, batch_size=1000)
+    orders = [_order() for _ in range(20)]
+    for o in orders:
+        repo.save(o)
+    assert repo.get(orders[5].id).total().amount == 500 and repo.version_of(orders[5].id) == 1
+    assert json.load(open(path)) == {}  # nothing written yet: the interval is a minute
+
+    stale = repo.get(orders[0].id)
+    repo.save(repo.get(orders[0].id))
+    with pytest.raises(ConcurrencyError):
+        repo.save(stale)
+
+    repo.flush()
+    on_disk = FileOrderRepository(path)
+    assert len(list(on_disk.iter_records())) == 20 and on_disk.version_of(orders[0].id) == 2
+    assert "hexshop_file_repository_flush_saves_count 1" in metrics.render()
+    repo.close()
+
+def test_batch_size_triggers_a_group_write(tmp_path):
+    path = str(tmp_path / "orders.json")
+    repo = FileOrderRepository(path, write_behind=60, batch_size=5, max_unflushed=5)
+    for _ in range(12):
+        repo.save(_order())  # the 11th save waits for the first batch to reach disk
+    assert len(json.load(open(path))) >= 5
+    repo.close()
+    assert len(json.load(open(path))) == 12
+
+def test_the_write_behind_writer_owns_the_file_until_it_closes(tmp_path):
+    path = str(tmp_path / "orders.json")
+    repo = FileOrderRepository(path, write_behind=60)
+    repo.save(_order())
+    with pytest.raises(RuntimeError):
+        FileOrderRepository(path, write_behind=60)
+    plain = FileOrderRepository(path)
+    with pytest.raises(RuntimeError):
+        plain.save(_order())  # the next flush would have written over it
+    assert plain.get(uuid.uuid4()) is None  # reading is fine
+    repo.close()
+    plain.save(_order())
+    assert len(json.load(open(path))) == 2
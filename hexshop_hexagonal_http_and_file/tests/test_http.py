@@ -0,0 +1,38 @@
+import uuid
+import pytest
+
+pytest.importorskip("httpx")
+from fastapi.testclient import TestClient
+from hexshop.infrastructure.http.fastapi_app import app
+
+client = TestClient(app)
+
+def _start_order() -> str:
+    email = f"alice-{uuid.uuid4().hex[:8]}@example.com"
+    cid = client.post("/customers", json={"name": "Alice", "email": email}).json()["customer_id"]
+    body = {"customer_id": cid, "product_id": "TEA-BAG", "unit_price_pence": 250, "quantity": 2}
+    return client.post("/orders", json=body).json()["order_id"]
+
+def test_conditional_get_and_if_match():
+    oid = _start_order()
+    first = client.get(f"/orders/{oid}")
+    etag = first.headers["ETag"]
+    assert client.get(f"/orders/{oid}", headers={"If-None-Match": etag}).status_code == 304
+
+    item = {"product_id": "MUG-RED", "unit_price_pence": 800, "quantity": 1}
+    r = client.post(f"/orders/{oid}/items", json=item, headers={"If-Match": etag})
+    assert r.status_code == 200 and r.headers["ETag"] != etag
+    assert client.post(f"/orders/{oid}/items", json=item, headers={"If-Match": etag}).status_code == 412
+    assert client.get(f"/orders/{oid}", headers={"If-None-Match": etag}).status_code == 200
+
+def test_summary_and_dashboard_follow_commits():
+    before = client.get("/dashboard").json()
+    oid = _start_order()
+    assert client.post(f"/orders/{oid}/submit").status_code == 200
+
+    summary = client.get(f"/orders/{oid}/summary")
+    assert summary.headers["ETag"] == client.get(f"/orders/{oid}").headers["ETag"]
+    assert summary.json()["is_submitted"] is True and summary.json()["total_pence"] == 500
+    after = client.get("/dashboard").json()
+    assert after["submitted"]["orders"] == before["submitted"]["orders"] + 1
+    assert after["submitted"]["total_pence"] == before["submitted"]["total_pence"] + 500
@@ -0,0 +1,111 @@
+import threading, uuid
+import pytest
+from hexshop.application.use_cases import CheckoutService
+from hexshop.domain.entities import Customer
+from hexshop.domain.inventory.ports import InsufficientStockError
+from hexshop.domain.services.discounts import DiscountService
+from hexshop.domain.services.inventory import InventoryService
+from hexshop.domain.value_objects import ProductId
+from hexshop.infrastructure.persistence.in_memory_inventory import InMemoryInventory
+from hexshop.infrastructure.persistence.in_memory_order_repository import InMemoryOrderRepository
+from hexshop.infrastructure.persistence.sqlite_inventory import SqliteInventory
+
+TEA, MUG = ProductId("TEA-BAG"), ProductId("MUG-RED")
+
+@pytest.fixture(params=["memory", "sqlite"])
+def stock(request, tmp_path):
+    if request.param == "memory":
+        yield InMemoryInventory(shards=4)
+        return
+    inventory = SqliteInventory(str(tmp_path / "inventory.db"))
+    yield inventory
+    inventory.close()
+
+def test_reservations_are_all_or_nothing_and_released_or_committed(stock):
+    stock.restock({TEA: 10, MUG: 2})
+    a, b = uuid.uuid4(), uuid.uuid4()
+    stock.reserve(a, {TEA: 3, MUG: 1, ProductId("UNTRACKED"): 99})
+    with pytest.raises(InsufficientStockError):
+        stock.reserve(b, {TEA: 5, MUG: 2})
+    assert (stock.available(TEA), stock.available(MUG)) == (7, 1)
+    assert stock.available(ProductId("UNTRACKED")) is None
+
+    stock.release(a, {TEA: 1, MUG: 5})  # can't give back more than the order holds
+    assert (stock.available(TEA), stock.available(MUG)) == (8, 2)
+    stock.commit(a)
+    stock.cancel(a)  # nothing left to give back once committed
+    assert stock.available(TEA) == 8
+    stock.reserve(b, {TEA: 8})
+    stock.cancel(b)
+    assert stock.available(TEA) == 8
+
+def test_concurrent_reservations_never_oversell(stock):
+    stock.restock({TEA: 20})
+    won = []
+
+    def buy():
+        try:
+            stock.reserve(uuid.uuid4(), {TEA: 1})
+            won.append(1)
+        except InsufficientStockError:
+            pass
+    threads = [threading.Thread(target=buy) for _ in range(50)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(won) == 20 and stock.available(TEA) == 0
+
+def test_checkout_reserves_releases_and_commits_stock():
+    stock = InMemoryInventory()
+    stock.restock({TEA: 5})
+    repo = InMemoryOrderRepository()
+    checkout = CheckoutService(repo, DiscountService(), inventory=InventoryService(stock))
+    alice = Customer.new("Alice", "alice@example.com")
+
+    oid = checkout.start_order_with_item(alice, "TEA-BAG", 250, 2)
+    checkout.add_items(oid, [("TEA-BAG", 250, 1), ("MUG-RED", 800, 1)])
+    assert stock.available(TEA) == 2
+    with pytest.raises(InsufficientStockError):
+        checkout.start_order_with_item(alice, "TEA-BAG", 250, 3)
+    assert len(repo.by_customer(alice.id)) == 1
+
+    checkout.remove_item(oid, "TEA-BAG")
+    assert stock.available(TEA) == 5
+    checkout.add_item(oid, "TEA-BAG", 250, 4)
+    checkout.submit(oid)
+    stock.cancel(oid)  # already sold
+    assert stock.available(TEA) == 1
+
+def test_a_bad_line_leaves_the_order_and_its_stock_untouched():
+    stock = InMemoryInventory()
+    stock.restock({TEA: 10, MUG: 10})
+    repo = InMemoryOrderRepository()
+    checkout = CheckoutService(repo, DiscountService(), inventory=InventoryService(stock))
+    oid = checkout.start_order_with_item(Customer.new("Alice", "alice@example.com"), "TEA-BAG", 250, 1)
+
+    with pytest.raises(ValueError):
+        checkout.add_items(oid, [("MUG-RED", 800, 2), ("TEA-BAG", 250, 0)])
+    order = repo.get(oid)
+    assert [(it.product_id, it.quantity) for it in order.items()] == [(TEA, 1)] and order.version == 1
+    assert (stock.available(TEA), stock.available(MUG)) == (9, 10)
+
+def test_stock_is_released_only_when_the_lines_were_not_saved():
+    class FailingProjection:
+        def apply(self, order):
+            raise RuntimeError("summary store down")
+
+    stock = InMemoryInventory()
+    stock.restock({TEA: 10})
+    repo = InMemoryOrderRepository()
+    checkout = CheckoutService(repo, DiscountService(), inventory=InventoryService(stock))
+    oid = checkout.start_order_with_item(Customer.new("Alice", "alice@example.com"), "TEA-BAG", 250, 1)
+
+    with pytest.raises(ValueError):  # stale version: nothing saved, so the new hold goes back
+        checkout.add_item(oid, "TEA-BAG", 250, 2, expected_version=0)
+    assert stock.available(TEA) == 9
+
+    checkout.projection = FailingProjection()
+    with pytest.raises(RuntimeError):  # saved, then the projection failed: the order keeps its stock
+        checkout.add_item(oid, "TEA-BAG", 250, 2)
+    assert repo.get(oid).version == 2 and stock.available(TEA) == 7
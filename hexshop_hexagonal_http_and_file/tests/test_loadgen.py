@@ -0,0 +1,19 @@
+import json
+from hexshop.infrastructure.cli import loadgen
+
+def _report(capsys, *argv):
+    loadgen.main(["--customers", "5", "--seed", "7", "--json", *argv])
+    return json.loads(capsys.readouterr().out)
+
+def test_closed_loop_runs_every_session(capsys):
+    report = _report(capsys, "--sessions", "30", "--concurrency", "2")
+    assert report["operations"]["start"]["count"] == 30
+    assert "arrivals" not in report
+
+def test_open_loop_counts_queueing_from_the_scheduled_arrival(capsys):
+    # far more arrivals than one worker can keep up with: sessions queue behind each other
+    report = _report(capsys, "--rate", "20000", "--duration", "0.1", "--concurrency", "1")
+    arrivals, start = report["arrivals"], report["operations"]["start"]
+    assert arrivals["scheduled"] == start["count"] > 100
+    assert arrivals["late"] > 0
+    assert start["p99_ms"] > 1  # the wait for the worker is in the latency
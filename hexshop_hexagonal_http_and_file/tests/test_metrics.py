@@ -0,0 +1,24 @@
+import uuid
+from hexshop.domain.orders.models import Order
+from hexshop.domain.value_objects import Money, ProductId
+from hexshop.infrastructure.observability.metrics import Registry
+from hexshop.infrastructure.observability.instrumented import instrument_repository
+from hexshop.infrastructure.persistence.file_order_repository import FileOrderRepository
+
+def test_repository_calls_and_file_io_are_reported(tmp_path):
+    registry = Registry()
+    repo = instrument_repository(FileOrderRepository(str(tmp_path / "orders.json"), metrics=registry), registry)
+
+    order = Order.new(uuid.uuid4())
+    order.add_item(ProductId("P1"), Money(250), 2)
+    repo.save(order)
+    assert repo.get(order.id) is not None
+
+    text = registry.render()
+    assert 'hexshop_repository_call_seconds_count{method="save"} 1' in text
+    assert 'hexshop_order_hydrations_total 1' in text
+    assert 'hexshop_file_repository_bytes_total{direction="written"}' in text
+
+def test_instrumentation_is_not_wired_when_disabled(tmp_path):
+    repo = FileOrderRepository(str(tmp_path / "orders.json"))
+    assert instrument_repository(repo, None) is repo
@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta, timezone
+import json, uuid
+import pytest
+from hexshop.domain.orders.models import Order
+from hexshop.domain.value_objects import Money, ProductId
+from hexshop.infrastructure.analytics.sales import sales_report
+from hexshop.infrastructure.cli import archive as archive_cli
+from hexshop.infrastructure.persistence.file_order_repository import FileOrderRepository
+
+def _orders(n, customer):
+    out = []
+    for i in range(n):
+        o = Order.new(customer)
+        o.add_item(ProductId(f"SKU-{i}"), Money(100), 1)
+        if i % 4:
+            o.submit()
+            o.updated_at -= timedelta(days=60 if i % 2 else 1)
+        out.append(o)
+    return out
+
+@pytest.mark.parametrize("codec", ["gzip", "lzma"])
+def test_old_submitted_orders_move_to_the_archive_and_stay_readable(tmp_path, codec):
+    path = str(tmp_path / "orders.json")
+    customer = uuid.uuid4()
+    orders = _orders(40, customer)
+    FileOrderRepository(path).save_many(orders)
+
+    assert archive_cli.main([path, "--older-than-days", "30", "--codec", codec, "--block-records", "4"]) == 0
+    old = [o for o in orders if o.is_submitted() and o.updated_at < datetime.now(timezone.utc) - timedelta(days=30)]
+    live = json.load(open(path))
+    assert len(live) == 40 - len(old) and not any(str(o.id) in live for o in old)
+
+    repo = FileOrderRepository(path)  # finds <path>.archive by itself
+    for o in old:
+        assert repo.get(o.id).total().amount == 100 and repo.version_of(o.id) == 1
+    assert repo.get(uuid.uuid4()) is None
+    assert sorted(d["id"] for d in repo.iter_records()) == sorted(str(o.id) for o in orders)
+    assert {o.id for o in repo.by_customer(customer)} == {o.id for o in orders} - {o.id for o in old}
+    assert sales_report("file", path).records == 40
+
+    # a second pass with nothing left to move writes no new segment
+    assert repo.archive_submitted(datetime.now(timezone.utc) - timedelta(days=30)) == 0
+    assert len(repo.archive.segment_paths()) == 1
+
+def test_product_and_date_listings_cover_the_archive_and_rebuild_only_the_page(tmp_path):
+    from hexshop.infrastructure.observability.metrics import Registry
+    path = str(tmp_path / "orders.json")
+    orders = []
+    for i in range(40):
+        o = Order.new(uuid.uuid4())
+        o.add_item(ProductId("KETTLE"), Money(2400), 1)
+        if i % 2:
+            o.submit()
+            o.updated_at -= timedelta(days=60)
+        orders.append(o)
+    FileOrderRepository(path).save_many(orders)
+    assert archive_cli.main([path, "--older-than-days", "30"]) == 0
+
+    registry = Registry()
+    repo = FileOrderRepository(path, metrics=registry)
+    seen, after = [], None
+    while True:
+        page = repo.list_for_product(ProductId("KETTLE"), after=after, limit=15)
+        seen += [o.id for o in page.orders]
+        if page.next_key is None:
+            break
+        after = page.next_key
+    assert sorted(seen) == sorted(o.id for o in orders)
+    assert registry.counter("hexshop_order_hydrations_total", "").value() == 40
+
+    start = min(o.created_at for o in orders)
+    window = repo.list_created_between(start, start + timedelta(hours=1), limit=100)
+    assert len(window.orders) == 40 and registry.counter("hexshop_order_hydrations_total", "").value() == 80
+
+def test_a_running_repository_sees_an_archive_created_after_it_started(tmp_path):
+    path = str(tmp_path / "orders.json")
+    orders = _orders(12, uuid.uuid4())
+    server = FileOrderRepository(path)  # no archive yet
+    server.save_many(orders)
+    assert server.archive is None
+
+    cutoff = datetime.now(timezone.utc) - timedelta(days=30)
+    assert FileOrderRepository(path).archive_submitted(cutoff) > 0  # another process, e.g. `bulk archive`
+    for o in orders:
+        assert server.get(o.id).id == o.id and server.version_of(o.id) == 1
+
+    later = Order.new(uuid.uuid4())
+    later.add_item(ProductId("KETTLE"), Money(2400), 1)
+    later.submit()
+    later.updated_at -= timedelta(days=60)
+    server.save(later)
+    assert FileOrderRepository(path).archive_submitted(cutoff) == 1  # a second segment
+    assert server.get(later.id).id == later.id
+    assert len(list(server.iter_records())) == 13
@@ -0,0 +1,85 @@
+import time, uuid
+import pytest
+from hexshop.application.projections import OrderSummaryProjection
+from hexshop.domain.orders.models import Order
+from hexshop.domain.orders.ports import ConcurrencyError
+from hexshop.domain.value_objects import Money, ProductId
+from hexshop.infrastructure.persistence.in_memory_order_repository import InMemoryOrderRepository
+from hexshop.infrastructure.persistence.in_memory_summary_store import InMemoryOrderSummaryStore
+
+class Clock:
+    now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def _order(customer):
+    o = Order.new(customer)
+    o.add_item(ProductId("TEA-BAG"), Money(250), 1)
+    return o
+
+def test_idle_open_orders_expire_and_touched_or_submitted_ones_stay():
+    clock, expired = Clock(), []
+    repo = InMemoryOrderRepository(open_ttl=60, on_expire=expired.extend, expiry_tick=0, clock=clock)
+    projection = OrderSummaryProjection(InMemoryOrderSummaryStore())
+    customer = uuid.uuid4()
+    idle, read, done = _order(customer), _order(customer), _order(customer)
+    done.submit()
+    for o in (idle, read, done):
+        repo.save(o)
+        projection.apply(o)
+
+    clock.now = 50
+    repo.get(read.id)
+    clock.now = 61
+    assert repo.expire_idle() == [idle]
+    assert expired == [idle] and repo.get(idle.id) is None
+    assert {o.id for o in repo.by_customer(customer)} == {read.id, done.id}
+    assert [o.id for o in repo.list_for_customer(customer).orders] == [done.id, read.id]
+
+    projection.forget(expired)
+    assert projection.store.get(idle.id) is None
+    assert projection.store.dashboard()["open"].orders == 1
+
+    clock.now = 1000
+    assert repo.expire_idle() == [read]
+    assert repo.by_customer(customer) == [done]
+
+def test_a_failed_expiry_keeps_the_orders_and_an_expired_order_cannot_be_saved_back():
+    clock = Clock()
+    calls = []
+
+    def archive_full(orders):
+        calls.append(orders)
+        if len(calls) == 1:
+            raise OSError("No space left on device")
+    repo = InMemoryOrderRepository(open_ttl=60, on_expire=archive_full, expiry_tick=0, clock=clock)
+    o = _order(uuid.uuid4())
+    repo.save(o)
+    clock.now = 61
+    with pytest.raises(OSError):
+        repo.expire_idle()
+    assert repo.get(o.id) is not None
+
+    editing = repo.get(o.id)
+    clock.now = 200  # the read above touched it
+    assert repo.expire_idle() == [editing]
+    editing.add_item(ProductId("MUG"), Money(800), 1)
+    with pytest.raises(ConcurrencyError):
+        repo.save(editing)
+    assert repo.get(o.id) is None
+
+def test_the_expiry_thread_survives_a_failing_callback():
+    failures = []
+
+    def on_expire(orders):
+        failures.append(orders)
+        if len(failures) < 3:
+            raise OSError("No space left on device")
+    repo = InMemoryOrderRepository(open_ttl=0.01, on_expire=on_expire, expiry_tick=0.01)
+    o = _order(uuid.uuid4())
+    repo.save(o)
+    deadline = time.monotonic() + 5
+    while repo.version_of(o.id) is not None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert repo.version_of(o.id) is None and len(failures) == 3
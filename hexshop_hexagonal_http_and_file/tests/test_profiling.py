@@ -0,0 +1,36 @@
+import pytest
+
+pytest.importorskip("httpx")
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from hexshop.infrastructure.http.profiling import install_profiling
+
+def _app(monkeypatch, **env):
+    for k, v in env.items():
+        monkeypatch.setenv(k, v)
+    app = FastAPI()
+    store = install_profiling(app)
+
+    @app.get("/work")
+    def work():
+        return {"n": sum(len(str(i)) for i in range(2000))}
+    return app, store
+
+def test_header_triggers_profile_and_admin_endpoint_returns_it(monkeypatch):
+    app, store = _app(monkeypatch, HEXSHOP_PROFILING="1", HEXSHOP_PROFILE_BUFFER="2")
+    client = TestClient(app)
+    assert "x-profile-id" not in client.get("/work").headers
+
+    for _ in range(3):
+        r = client.get("/work", headers={"X-Profile": "cpu,alloc"})
+    pid = int(r.headers["x-profile-id"])
+    assert [p["id"] for p in client.get("/admin/profiles").json()] == [pid, pid - 1]
+    detail = client.get(f"/admin/profiles/{pid}").json()
+    assert "work" in detail["cpu"] and detail["allocations"]
+
+def test_nothing_is_installed_when_disabled(monkeypatch):
+    monkeypatch.delenv("HEXSHOP_PROFILING", raising=False)
+    monkeypatch.delenv("HEXSHOP_PROFILE_SAMPLE_RATE", raising=False)
+    app, store = _app(monkeypatch)
+    assert store is None
+    assert TestClient(app).get("/admin/profiles").status_code == 404
@@ -0,0 +1,81 @@
+from datetime import datetime
+import uuid
+import pytest
+from hexshop.application.projections import OrderSummary, OrderSummaryProjection
+from hexshop.application.use_cases import CheckoutService
+from hexshop.domain.entities import Customer
+from hexshop.domain.orders.ports import OrderFilter
+from hexshop.domain.services.discounts import DiscountService
+from hexshop.infrastructure.cli import projections as projections_cli
+from hexshop.infrastructure.observability.metrics import Registry
+from hexshop.infrastructure.persistence.file_order_repository import FileOrderRepository
+from hexshop.infrastructure.persistence.in_memory_summary_store import InMemoryOrderSummaryStore
+from hexshop.infrastructure.persistence.sqlite_summary_store import SqliteOrderSummaryStore
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return InMemoryOrderSummaryStore()
+    return SqliteOrderSummaryStore(str(tmp_path / "summaries.db"))
+
+def test_summaries_follow_commits_and_match_a_rebuild(store, tmp_path):
+    repo = FileOrderRepository(str(tmp_path / "orders.json"))
+    projection = OrderSummaryProjection(store)
+    checkout = CheckoutService(repo, DiscountService(), projection=projection)
+    alice = Customer.new("Alice", "alice@example.com")
+    ids = [checkout.start_order_with_item(alice, "TEA-BAG", 250, n + 1) for n in range(5)]
+    checkout.add_item(ids[0], "MUG-RED", 800, 1)
+    checkout.submit(ids[0])
+    checkout.remove_item(ids[1], "TEA-BAG")
+
+    s = store.get(ids[0])
+    assert (s.is_submitted, s.line_count, s.total_pence, s.version) == (True, 2, 1050, 3)
+    assert s.updated_at > s.created_at
+    page = store.list_for_customer(alice.id, OrderFilter(status="open"), limit=2)
+    assert [x.id for x in page.summaries] == [ids[4], ids[3]]
+    rest = store.list_for_customer(alice.id, OrderFilter(status="open"), after=page.next_key, limit=2)
+    assert [x.id for x in rest.summaries] == [ids[2], ids[1]] and rest.next_key is None
+    dash = store.dashboard()
+    assert (dash["submitted"].orders, dash["submitted"].total_pence) == (1, 1050)
+    # the 4th and 5th orders also got the free bulk-bonus sticker line
+    assert (dash["open"].orders, dash["open"].lines) == (4, 5)
+
+    incremental = {i: store.get(i) for i in ids}
+    assert store.replace_all(()) == 0 and store.dashboard()["open"].orders == 0
+    assert projection.rebuild(repo) == 5
+    assert {i: store.get(i) for i in ids} == incremental
+    assert store.dashboard() == dash
+
+def test_older_summary_never_replaces_a_newer_one(store):
+    now = OrderSummary(uuid.uuid4(), uuid.uuid4(), True, 1, 500, datetime.now(), datetime.now(), 4)
+    store.upsert(now)
+    store.upsert(OrderSummary(now.id, now.customer_id, False, 0, 0, now.created_at, now.updated_at, 3))
+    assert store.get(now.id) == now
+    assert store.dashboard()["submitted"].orders == 1
+
+def test_rebuild_command(tmp_path, capsys):
+    repo = FileOrderRepository(str(tmp_path / "orders.json"))
+    CheckoutService(repo, DiscountService()).start_order_with_item(Customer.new("Bo", "bo@example.com"), "TEA", 100, 1)
+    db = str(tmp_path / "summaries.db")
+    assert projections_cli.main(["rebuild", "--from", f"file:{tmp_path / 'orders.json'}", "--to", db]) == 0
+    assert SqliteOrderSummaryStore(db).dashboard()["open"].orders == 1
+
+def test_without_a_shared_store_every_worker_reads_the_repository(tmp_path):
+    from hexshop.infrastructure.persistence.repository_summary_store import RepositorySummaryStore
+    path = str(tmp_path / "orders.json")
+    writer = CheckoutService(FileOrderRepository(path), DiscountService())
+    metrics = Registry()
+    reader = RepositorySummaryStore(FileOrderRepository(path, metrics=metrics))  # another worker on the same file
+    alice = Customer.new("Alice", "alice@example.com")
+    oid = writer.start_order_with_item(alice, "TEA-BAG", 250, 2)
+    writer.submit(oid)
+
+    assert reader.get(oid).version == 2 and reader.get(oid).is_submitted
+    assert [s.id for s in reader.list_for_customer(alice.id).summaries] == [oid]
+    hydrated = metrics.counter("hexshop_order_hydrations_total", "").value()
+    dash = reader.dashboard()
+    assert (dash["submitted"].orders, dash["submitted"].lines, dash["submitted"].total_pence) == (1, 1, 500)
+    assert dash["open"].orders == 0
+    assert metrics.counter("hexshop_order_hydrations_total", "").value() == hydrated  # totalled from the raw records; no order was rebuilt
+    with pytest.raises(RuntimeError):
+        reader.replace_all(iter([]))
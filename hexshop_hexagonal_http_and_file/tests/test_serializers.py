@@ -0,0 +1,21 @@
+import json, uuid
+from hexshop.domain.orders.models import Order
+from hexshop.domain.value_objects import Money, ProductId
+from hexshop.infrastructure.http import serializers
+from hexshop.infrastructure.http.serializers import order_view_bytes
+
+def test_order_view_bytes_matches_with_and_without_orjson(monkeypatch):
+    o = Order.new(uuid.uuid4())
+    o.add_item(ProductId("TÉ"), Money(250), 2)
+    o.add_item(ProductId("MUG"), Money(800), 1)
+    expected = {
+        "id": str(o.id), "customer_id": str(o.customer_id), "is_submitted": False,
+        "items": [
+            {"product_id": "TÉ", "unit_price_pence": 250, "qty": 2},
+            {"product_id": "MUG", "unit_price_pence": 800, "qty": 1},
+        ],
+        "total_pence": 1300,
+    }
+    assert json.loads(order_view_bytes(o)) == expected
+    monkeypatch.setattr(serializers, "orjson", None)
+    assert json.loads(order_view_bytes(o)) == expected
@@ -0,0 +1,55 @@
+import threading
+from hexshop.application.single_flight import SingleFlight
+
+def _run_concurrently(flight, key, fn, callers=8):
+    results, errors = [], []
+    def call():
+        try:
+            results.append(flight.do(key, fn))
+        except Exception as e:
+            errors.append(e)
+    threads = [threading.Thread(target=call) for _ in range(callers)]
+    for t in threads:
+        t.start()
+    return threads, results, errors
+
+def test_concurrent_calls_share_one_execution():
+    gate, runs = threading.Event(), []
+    def slow():
+        runs.append(1)
+        gate.wait(5)
+        return object()
+    coalesced = []
+    flight = SingleFlight(on_coalesced=lambda: coalesced.append(1))
+    threads, results, _ = _run_concurrently(flight, "k", slow)
+    while flight.coalesced < 7:
+        threading.Event().wait(0.001)
+    gate.set()
+    for t in threads:
+        t.join()
+    assert len(runs) == 1 and len(coalesced) == 7
+    assert len(results) == 8 and all(r is results[0] for r in results)
+    assert flight.do("k", lambda: "fresh") == "fresh"  # nothing kept once done
+
+def test_followers_get_the_leaders_exception_and_it_is_not_kept():
+    gate = threading.Event()
+    def boom():
+        gate.wait(5)
+        raise ValueError("Order not found")
+    flight = SingleFlight(ttl=60)
+    threads, _, errors = _run_concurrently(flight, "k", boom, callers=3)
+    while flight.coalesced < 2:
+        threading.Event().wait(0.001)
+    gate.set()
+    for t in threads:
+        t.join()
+    assert len(errors) == 3 and all(e is errors[0] for e in errors)
+    assert flight.do("k", lambda: 1) == 1
+
+def test_ttl_reuses_a_finished_result_until_it_expires():
+    now = [0.0]
+    flight = SingleFlight(ttl=2, clock=lambda: now[0])
+    assert flight.do("k", lambda: 1) == 1
+    assert flight.do("k", lambda: 2) == 1
+    now[0] = 2.5
+    assert flight.do("k", lambda: 3) == 3
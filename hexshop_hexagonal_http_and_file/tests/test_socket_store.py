@@ -0,0 +1,28 @@
+import threading
+import pytest
+from hexshop.domain.orders.ports import ConcurrencyError
+from hexshop.domain.services.discounts import DiscountService
+from hexshop.domain.entities import Customer
+from hexshop.application.use_cases import CheckoutService
+from hexshop.infrastructure.persistence.socket_order_repository import OrderStoreServer, SocketOrderRepository
+
+def test_workers_share_one_store(tmp_path):
+    path = str(tmp_path / "orders.sock")
+    server = OrderStoreServer(path)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        worker_a = CheckoutService(SocketOrderRepository(path), DiscountService())
+        worker_b = CheckoutService(SocketOrderRepository(path), DiscountService())
+
+        alice = Customer.new("Alice", "alice@example.com")
+        oid = worker_a.start_order_with_item(alice, "TEA-BAG", 250, 2)
+        assert worker_b.add_item(oid, "MUG-RED", 800, 1) == 2
+        assert worker_a.submit(oid).amount == 1300
+
+        stale = worker_a.repo.by_customer(alice.id)[0]
+        stale.version = 1
+        with pytest.raises(ConcurrencyError):
+            worker_b.repo.save(stale)
+    finally:
+        server.shutdown()
+        server.server_close()
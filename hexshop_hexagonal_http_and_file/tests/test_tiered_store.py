@@ -0,0 +1,70 @@
+import uuid
+import pytest
+from hexshop.domain.orders.models import Order
+from hexshop.domain.orders.ports import ConcurrencyError
+from hexshop.domain.value_objects import Money, ProductId
+from hexshop.infrastructure.observability.metrics import Registry
+from hexshop.infrastructure.persistence.sqlite_order_repository import SqliteOrderRepository
+from hexshop.infrastructure.persistence.tiered_order_repository import TieredOrderRepository, approx_size
+
+def _order(customer, submitted=False):
+    o = Order.new(customer)
+    o.add_item(ProductId("TEA-BAG"), Money(250), 1)
+    if submitted:
+        o.submit()
+    return o
+
+def test_evicts_submitted_orders_first_and_promotes_cold_reads(tmp_path):
+    durable = SqliteOrderRepository(str(tmp_path / "orders.db"))
+    metrics = Registry()
+    repo = TieredOrderRepository(durable, max_orders=3, metrics=metrics)
+    customer = uuid.uuid4()
+    open_orders = [_order(customer) for _ in range(2)]
+    done = [_order(customer, submitted=True) for _ in range(3)]
+    for o in open_orders + done:
+        repo.save(o)
+    assert repo.stats()["resident_orders"] == {"open": 2, "submitted": 1}
+
+    assert repo.get(open_orders[0].id).total().amount == 250
+    assert repo.get(done[0].id).is_submitted()  # cold: read from SQLite and promoted
+    assert repo.get(done[0].id) is not repo.get(done[0].id)
+    assert repo.get(uuid.uuid4()) is None
+    stats = repo.stats()
+    assert stats["reads"] == {"memory": 3, "durable": 1, "miss": 1}
+    assert stats["evictions"] == 3 and stats["resident_orders"] == {"open": 2, "submitted": 1}
+    assert 'hexshop_tiered_reads_total{tier="durable"} 1' in metrics.render()
+
+def test_writes_go_through_and_caller_edits_stay_private(tmp_path):
+    durable = SqliteOrderRepository(str(tmp_path / "orders.db"))
+    repo = TieredOrderRepository(durable, max_orders=None, max_bytes=10 * approx_size(_order(uuid.uuid4())))
+    o = _order(uuid.uuid4())
+    repo.save(o)
+    mine = repo.get(o.id)
+    mine.add_item(ProductId("MUG"), Money(800), 1)  # not saved
+    assert repo.get(o.id).total().amount == 250
+    repo.save(mine)
+    assert durable.get(o.id).total().amount == 1050 and repo.version_of(o.id) == 2
+
+    stale = durable.get(o.id)
+    durable.save(durable.get(o.id))  # another writer bumps the version
+    with pytest.raises(ConcurrencyError):
+        repo.save(stale)
+    assert repo.get(o.id).version == 3  # the stale copy was dropped and re-read
+
+def test_a_cold_read_does_not_replace_a_newer_save(tmp_path):
+    durable = SqliteOrderRepository(str(tmp_path / "orders.db"))
+    repo = TieredOrderRepository(durable, max_orders=1)
+    o, other = _order(uuid.uuid4()), _order(uuid.uuid4())
+    repo.save(o)
+    repo.save(other)  # evicts o
+    read = durable.get
+
+    def slow_get(order_id):
+        found = read(order_id)
+        if order_id == o.id:
+            durable.get = read
+            repo.save(repo.get(o.id))  # a save through the tier lands meanwhile
+        return found
+    durable.get = slow_get
+    assert repo.get(o.id).version == 2
+    assert repo.get(o.id).version == 2 and durable.version_of(o.id) == 2